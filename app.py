@@ -6,21 +6,20 @@
 # ==========================================================
 
 import streamlit as st
-import sqlite3
-import os, time
-import hashlib
-import binascii
-import hmac
-from datetime import datetime
-from crewai import Crew, Process
-from biz_components import BizAgents, BizTasks
-from biz_utils import load_markdown, save_markdown, convert_md_to_pdf, file_exists
+import os
+from biz_auth import authenticate_user, create_session, init_db, resolve_session, revoke_session
+from biz_files import read_pages, read_report_pages, read_text
 from biz_tools import safe_float
-import shutil
+from biz_artifacts import read_bytes
+from biz_cache import get_llm_cache
+from biz_jobs import get_job_runner
+from biz_pipeline import EXPECTED_FILES, TASK_ORDER, TASK_LABELS, downstream
 
 from streamlit_option_menu import option_menu
 
 # Importa renderizadores de página
+from page.historico import render_historico
+from page.metricas import render_metricas
 from page.projeto import render_projeto
 from page.sobre import render_sobre
 
@@ -34,64 +33,11 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 st.set_page_config(page_title="AgentAI Biz", page_icon="💼", layout="wide")
 
 # Style: CSS para esconder o menu hamburger (☰) e o footer
-if os.path.exists('style.css'):
-    with open('style.css') as f:
-        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+st.markdown(f"<style>{read_text('style.css')}</style>", unsafe_allow_html=True)
 
 # ==========================================================
 # BANCO DE DADOS / LOGIN
 # ==========================================================
-def get_conn():
-    return sqlite3.connect(DB_PATH, check_same_thread=False)
-
-def init_db():
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            salt TEXT NOT NULL,
-            role TEXT NOT NULL DEFAULT 'user',
-            created_at TEXT NOT NULL
-        )
-    """)
-    conn.commit()
-
-    cur.execute("SELECT id FROM users WHERE username='admin'")
-    if not cur.fetchone():
-        pwd_hash, salt = hash_password('admin123')
-        cur.execute(
-            "INSERT INTO users (username, password_hash, salt, role, created_at) VALUES (?, ?, ?, ?, ?)",
-            ('admin', pwd_hash, salt, 'admin', datetime.utcnow().isoformat())
-        )
-        conn.commit()
-    conn.close()
-
-def hash_password(password: str, salt: bytes = None):
-    if salt is None:
-        salt = os.urandom(16)
-    dk = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, 200000)
-    return binascii.hexlify(dk).decode(), binascii.hexlify(salt).decode()
-
-def verify_password(stored_hash_hex, stored_salt_hex, password_attempt):
-    salt = binascii.unhexlify(stored_salt_hex)
-    attempt_hash_hex, _ = hash_password(password_attempt, salt)
-    return hmac.compare_digest(attempt_hash_hex, stored_hash_hex)
-
-def authenticate_user(username, password):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT password_hash, salt, role FROM users WHERE username=?", (username,))
-    row = cur.fetchone()
-    conn.close()
-    if not row:
-        return False, "Usuário não encontrado", None
-    stored_hash, stored_salt, role = row
-    ok = verify_password(stored_hash, stored_salt, password)
-    return (True, "Autenticado", role) if ok else (False, "Senha incorreta", None)
-
 init_db()
 
 # ==========================================================
@@ -102,6 +48,18 @@ if 'authenticated' not in st.session_state:
 if 'login_flag' not in st.session_state:
     st.session_state['login_flag'] = False
 
+# Um refresh do navegador zera o session_state: a sessão volta pelo token ?sid= da URL
+# (o Streamlit não grava cookies, então a URL é o único lugar onde o token sobrevive)
+if not st.session_state['authenticated']:
+    session_token = st.query_params.get("sid")
+    restored = resolve_session(session_token)
+    if restored:
+        st.session_state['authenticated'] = True
+        st.session_state['username'], st.session_state['role'] = restored
+        st.session_state['session_token'] = session_token
+    elif "sid" in st.query_params:
+        st.query_params.pop("sid")
+
 # ==========================================================
 # TELA DE LOGIN
 # ==========================================================
@@ -117,12 +75,13 @@ if not st.session_state['authenticated']:
             if not st.session_state.get('login_flag', False):
                with st.spinner("🔄 Verificando credenciais, aguarde..."): 
                     ok, msg, role = authenticate_user(username.strip(), password)
-                    time.sleep(1.2)  # pequena pausa visual (~1 segundo)
                     if ok:
                         st.session_state['authenticated'] = True
                         st.session_state['username'] = username
                         st.session_state['role'] = role
                         st.session_state['login_flag'] = True
+                        st.session_state['session_token'] = create_session(username, role)
+                        st.query_params["sid"] = st.session_state['session_token']
                         st.rerun()
                     else:
                         st.error(msg)
@@ -138,14 +97,23 @@ if not st.session_state['authenticated']:
 st.sidebar.image("Img/logoAI.png", width=160)
 st.sidebar.markdown(f"👋 Olá, **{st.session_state.username}**!")
 if st.sidebar.button("🚪 Sair"):
+    revoke_session(st.session_state.pop('session_token', None))
+    st.query_params.clear()
     for key in ["authenticated", "username", "role", "login_flag"]:
         st.session_state[key] = False if key == "authenticated" else ""
     st.rerun()
 
+# Métricas de execução só aparecem para administradores
+menu_options = ["Aplicativo", "Histórico", "Projeto", "Sobre"]
+menu_icons = ["briefcase", "clock-history", "book", "info-circle"]
+if st.session_state.get("role") == "admin":
+    menu_options.append("Métricas")
+    menu_icons.append("bar-chart")
+
 selected = option_menu(
     menu_title=None,
-    options=["Aplicativo", "Projeto", "Sobre"],
-    icons=["briefcase", "book", "info-circle"],
+    options=menu_options,
+    icons=menu_icons,
     orientation="horizontal",
     styles={
         "container": {"background-color": "#0b5cff", "border-radius": "8px"},
@@ -159,12 +127,18 @@ selected = option_menu(
 # ==========================================================
 # ROTEAMENTO SIMPLES
 # ==========================================================
-if selected == "Projeto":
+if selected == "Histórico":
+    render_historico()
+    gerar = False
+elif selected == "Projeto":
     render_projeto()
     gerar = False
 elif selected == "Sobre":
     render_sobre()
     gerar = False
+elif selected == "Métricas":
+    render_metricas(get_job_runner(OUTPUT_DIR).queue_metrics())
+    gerar = False
 else:
 # ==========================================================
 # APLICATIVO PRINCIPAL
@@ -269,142 +243,257 @@ else:
     # ==========================================================
     # LIMPAR ARQUIVOS E CAMPOS
     # ==========================================================
+    runner = get_job_runner(OUTPUT_DIR)
+
     def clear_output_dir():
-        for file in os.listdir(OUTPUT_DIR):
-            path = os.path.join(OUTPUT_DIR, file)
-            if os.path.isfile(path) and file.lower().endswith(('.md', '.pdf')):
-                os.remove(path)
+        # Remove só as execuções do usuário logado (exceto jobs na fila ou rodando)
+        runner.artifacts.delete_runs(st.session_state["username"])
 
     if limpar:
         clear_output_dir()
+        # Um job ainda na fila ou rodando não é apagado e continua acompanhado
+        current = runner.get(st.session_state["job_id"]) if st.session_state.get("job_id") else None
+        if not current or current["status"] not in ("queued", "running"):
+            st.session_state.pop("job_id", None)
+            st.query_params.pop("job", None)
         for k in ["nome_empresa","segmento","publico_alvo","modelo_receita","ticket_medio","custo_medio_mensal","meta_12m"]:
             st.session_state[k] = "" if isinstance(st.session_state.get(k,""), str) else 0.0
         st.success("🧼 Relatórios e formulário limpos.")
         st.rerun()
 
     # ==========================================================
-    # EXECUÇÃO DOS AGENTES
+    # EXECUÇÃO DOS AGENTES (em segundo plano)
     # ==========================================================
-    expected_files = {
-        "plano_negocios.md": "plano_negocios.pdf",
-        "resumo_executivo.md": "resumo_executivo.pdf",
-        "pitch_deck.md": "pitch_deck.pdf",
-    }
+    expected_files = EXPECTED_FILES
 
     gerar = gerar if "gerar" in locals() else False
 
     if gerar:
-        with st.spinner("🤖 Gerando plano de negócios..."):
-            agents = BizAgents()
-            tasks = BizTasks()
-
-            market_agent = agents.market_agent()
-            finance_agent = agents.finance_agent()
-            brand_agent = agents.brand_agent()
-            pitch_agent = agents.pitch_agent()
-
-            profile_data = {
-                "nome_empresa": nome_empresa,
-                "segmento": segmento,
-                "publico_alvo": publico_alvo,
-                "modelo_receita": modelo_receita,
-                "ticket_medio": ticket_medio,
-                "custo_medio_mensal": custo_medio_mensal,
-                "meta_12m": meta_12m
-            }
-
-            market_task = tasks.market_task(market_agent, profile_data)
-            finance_task = tasks.finance_task([market_task], finance_agent, profile_data)
-            brand_task = tasks.brand_task([finance_task], brand_agent, profile_data)
-            pitch_task = tasks.pitch_task([brand_task], pitch_agent, profile_data)
-
-            crew = Crew(
-                agents=[market_agent, finance_agent, brand_agent, pitch_agent],
-                tasks=[market_task, finance_task, brand_task, pitch_task],
-                process=Process.sequential,
-                full_output=True,
-                verbose=True
+        profile_data = {
+            "nome_empresa": nome_empresa,
+            "segmento": segmento,
+            "publico_alvo": publico_alvo,
+            "modelo_receita": modelo_receita,
+            "ticket_medio": ticket_medio,
+            "custo_medio_mensal": custo_medio_mensal,
+            "meta_12m": meta_12m
+        }
+        job_id = runner.submit(st.session_state["username"], profile_data)
+        st.session_state["job_id"] = job_id
+        st.query_params["job"] = job_id
+
+    def render_progress(job):
+        done = sum(1 for p in job["progress"].values() if p["status"] == "done")
+        st.progress(done / len(TASK_ORDER), text=f"🤖 Gerando plano de negócios... ({done}/{len(TASK_ORDER)} etapas)")
+        icons = {"queued": "⏳", "running": "🔄", "done": "✅", "failed": "❌"}
+        for name in TASK_ORDER:
+            info = job["progress"].get(name, {})
+            tempo = f" — {info['seconds']:.1f}s (pronto em {info['done_at']:.1f}s)" if "done_at" in info else ""
+            st.markdown(f"{icons.get(info.get('status'), '⏳')} {TASK_LABELS[name]}{tempo}")
+
+    def live_text(text):
+        # Enquanto o agente raciocina, mostra só a resposta final quando ela começa
+        if "Final Answer:" in text:
+            return text.split("Final Answer:", 1)[1].strip()
+        return text
+
+    def render_stream(job, stream):
+        # Um espaço por tarefa, preenchido à medida que o agente escreve
+        for name in TASK_ORDER:
+            text = stream.get(name)
+            if not text:
+                continue
+            info = job["progress"].get(name, {})
+            status = "✅" if info.get("status") == "done" else "✍️"
+            with st.expander(f"{status} {TASK_LABELS[name]}", expanded=True):
+                st.markdown(live_text(text), unsafe_allow_html=True)
+
+    # Acompanha o job sem bloquear o script: só o fragmento é reexecutado
+    @st.fragment(run_every=2)
+    def poll_job(job_id):
+        job = runner.get(job_id)
+        if job and job["status"] in ("queued", "running"):
+            if job["status"] == "queued":
+                fila = runner.queue_position(job_id)
+                if fila:
+                    posicao, total, espera = fila
+                    estimativa = f" — início estimado em ~{espera:.0f}s" if espera is not None else ""
+                    st.info(f"⏳ Na fila: posição {posicao} de {total}{estimativa}")
+                else:
+                    st.info("⏳ Na fila, aguardando um worker livre...")
+            render_progress(job)
+            render_stream(job, runner.stream(job_id))
+        else:
+            st.rerun(scope="app")
+
+    def render_regenerate(job_id):
+        # Refaz só a seção escolhida (e as que dependem dela); o resto da execução é reaproveitado
+        with st.expander("🔁 Regenerar uma seção"):
+            alvo = st.selectbox("Seção", TASK_ORDER, format_func=TASK_LABELS.get, key="regen_task")
+            refeitas = downstream([alvo])
+            st.caption("Serão refeitas: " + ", ".join(TASK_LABELS[n] for n in refeitas)
+                       + ". As demais saídas desta execução são reaproveitadas.")
+            if st.button("🔁 Regenerar"):
+                if runner.regenerate(job_id, alvo):
+                    st.rerun()
+                st.warning("Esta execução ainda está em andamento.")
+
+    job_id = st.session_state.get("job_id") or st.query_params.get("job")
+    job = runner.get(job_id) if job_id else None
+    if job and job["username"] == st.session_state["username"]:
+        st.session_state["job_id"] = job_id
+        if job["status"] in ("queued", "running"):
+            poll_job(job_id)
+        elif job["status"] == "failed":
+            st.error(f"Erro ao executar agentes: {job['error']}")
+            prontas = [n for n in TASK_ORDER if job["progress"][n]["status"] == "done"]
+            if prontas:
+                st.caption("💾 Etapas concluídas guardadas: " + ", ".join(TASK_LABELS[n] for n in prontas)
+                           + ". A retomada começa pelas que faltam.")
+            if st.button("▶️ Retomar"):
+                if runner.resume(job_id):
+                    st.rerun()
+                st.warning("Esta execução já foi retomada.")
+            render_regenerate(job_id)
+        else:
+            for w in job["warnings"]:
+                st.warning(w)
+            st.success("✅ Plano de Negócios e Pitch Deck gerados!")
+
+            timings = job["timings"]
+            if timings:
+                ganho = timings["saved"] / timings["sequential"] * 100 if timings["sequential"] else 0.0
+                st.caption(
+                    f"⏱️ Tempo total: {timings['wall']:.1f}s ({timings['mode']}) — "
+                    f"economia de {timings['saved']:.1f}s ({ganho:.0f}%) sobre a execução sequencial "
+                    f"({timings['sequential']:.1f}s)"
+                )
+                if timings.get("ttfb") is not None:
+                    prontos = ", ".join(
+                        f"{TASK_LABELS[n]} {t:.1f}s" for n, t in sorted(timings["done_at"].items(), key=lambda i: i[1])
+                    )
+                    st.caption(f"✍️ Primeiro conteúdo em {timings['ttfb']:.1f}s — tarefas prontas em: {prontos}")
+                context = timings.get("context", {})
+                if context:
+                    antes = sum(t["before"] for t in context.values())
+                    depois = sum(t["after"] for t in context.values())
+                    st.caption(f"🗜️ Contexto entre tarefas: {antes} → {depois} tokens após a compactação")
+                referencia = timings.get("market_reference")
+                if referencia:
+                    uso = "reaproveitada" if referencia["mode"] == "reuse" else "usada como ponto de partida"
+                    st.caption(f"♻️ Análise de mercado de um perfil semelhante {uso} "
+                               f"(similaridade {referencia['score']:.2f})")
+                if timings.get("regenerated"):
+                    st.caption("🔁 Regeneradas nesta rodada: " + ", ".join(
+                        f"{TASK_LABELS[n]} ({timings['tasks'].get(n, 0):.1f}s)" for n in timings["regenerated"]
+                    ))
+                if timings.get("resumed"):
+                    st.caption("▶️ Retomada após falha: " + ", ".join(
+                        f"{TASK_LABELS[n]} ({timings['tasks'].get(n, 0):.1f}s)" for n in timings["resumed"]
+                    ) + " — as demais etapas foram reaproveitadas")
+                if timings.get("repaired"):
+                    st.caption("🩹 Seções completadas sem refazer a etapa: " + "; ".join(
+                        f"{TASK_LABELS[n]} ({', '.join(s)})" for n, s in timings["repaired"].items()
+                    ))
+                pdf = timings.get("pdf", {})
+                if pdf:
+                    reaproveitados = sum(1 for e in pdf.values() if e["status"] == "reused")
+                    st.caption(
+                        f"📄 PDFs: {len(pdf) - reaproveitados} convertidos, {reaproveitados} reaproveitados "
+                        f"em {sum(e['seconds'] for e in pdf.values()):.2f}s"
+                    )
+
+            cache_stats = get_llm_cache().stats()
+            st.caption(
+                f"⚡ Cache LLM: {cache_stats['hits']} acertos / {cache_stats['misses']} faltas "
+                f"({cache_stats['entries']} respostas armazenadas)"
             )
-
-            try:
-                crew.kickoff()
-            except Exception as e:
-                st.error(f"Erro ao executar agentes: {e}")
-
-        for md_name, pdf_name in expected_files.items():
-            md_path = os.path.join(OUTPUT_DIR, md_name)
-            pdf_path = os.path.join(OUTPUT_DIR, pdf_name)
-            if os.path.exists(md_path):
-                convert_md_to_pdf(md_path, pdf_path)
-        st.success("✅ Plano de Negócios e Pitch Deck gerados!")
-
-        # mover MD gerados para OUTPUT_DIR
-        moved_any = False
-        for md_name, pdf_name in expected_files.items():
-            src_cwd = os.path.join(os.getcwd(), md_name)
-            dest_md = os.path.join(OUTPUT_DIR, md_name)
-            if os.path.exists(src_cwd):
-                try:
-                    shutil.move(src_cwd, dest_md)
-                    moved_any = True
-                except Exception as e:
-                    st.warning(f"Não foi possível mover {md_name} para {OUTPUT_DIR}: {e}")
-            elif os.path.exists(dest_md):
-                moved_any = True
-
-        # converter MD -> PDF somente quando MD existir em OUTPUT_DIR
-        for md_name, pdf_name in expected_files.items():
-            md_path = os.path.join(OUTPUT_DIR, md_name)
-            pdf_path = os.path.join(OUTPUT_DIR, pdf_name)
-            if os.path.exists(md_path):
-                ok = convert_md_to_pdf(md_path, pdf_path)
-                if not ok:
-                    st.warning(f"Falha ao converter {md_name} para PDF.")
-            else:
-                st.info(f"Atenção: {md_name} não foi gerado pelos agentes.")
-
-        st.success("✅ Planos e relatórios processados (movidos/convertidos).")
+            render_regenerate(job_id)
 
 # ==========================================================
 # EXIBIÇÃO E DOWNLOADS
 # ==========================================================
 if selected == "Aplicativo":
+    # Execução exibida: a do job atual ou, na falta dela, a última do usuário
+    run_id = st.session_state.get("job_id")
+    artifacts = runner.artifacts.list_artifacts(run_id) if run_id else {}
+    if not artifacts:
+        last_run = runner.artifacts.latest_run(st.session_state["username"])
+        artifacts = runner.artifacts.list_artifacts(last_run["id"]) if last_run else {}
+
+    def table_frame(block):
+        import pandas as pd
+        from biz_report import plain_text
+
+        # Nomes de coluna únicos e não vazios (exigência da tabela de dados)
+        columns = []
+        for i, column in enumerate(plain_text(c) for c in block.header):
+            column = column or f"Coluna {i + 1}"
+            columns.append(f"{column} ({i + 1})" if column in columns else column)
+        return pd.DataFrame([[plain_text(c) for c in row] for row in block.rows], columns=columns)
+
+    def render_sections(sections):
+        # Texto e listas em Markdown; tabelas (ex.: projeção financeira) como tabela de dados
+        from biz_report import Table, block_to_markdown
+
+        for section in sections:
+            if section.title:
+                st.markdown(f"{'#' * max(section.level, 1)} {section.title}")
+            text = []
+            for block in section.blocks:
+                if isinstance(block, Table):
+                    if text:
+                        st.markdown("\n\n".join(text), unsafe_allow_html=True)
+                        text = []
+                    st.dataframe(table_frame(block), hide_index=True)
+                else:
+                    text.append(block_to_markdown(block))
+            if text:
+                st.markdown("\n\n".join(text), unsafe_allow_html=True)
+
+    def render_report(name, empty_message):
+        # Estrutura validada (.json) vinda do cache de arquivos, paginada por seção;
+        # execuções anteriores a ela mostram o Markdown
+        structure = os.path.splitext(name)[0] + ".json"
+        if structure in artifacts:
+            pages = read_report_pages(artifacts[structure]["path"])
+        else:
+            pages = read_pages(artifacts[name]["path"]) if name in artifacts else []
+        if not pages:
+            st.info(empty_message)
+            return
+        page = 0
+        if len(pages) > 1:
+            page = st.selectbox(
+                "Seção", range(len(pages)), key=f"page_{name}",
+                format_func=lambda i: f"{i + 1}/{len(pages)} — {pages[i][0]}",
+            )
+        if isinstance(pages[page][1], str):
+            st.markdown(pages[page][1], unsafe_allow_html=True)
+        else:
+            render_sections(pages[page][1])
+
     # Verifica se há relatórios gerados (MDs)
-    if any(os.path.exists(os.path.join(OUTPUT_DIR, md)) for md in expected_files.keys()):
+    if any(md in artifacts for md in expected_files.keys()):
         tabs = st.tabs(["📝 Plano de Negócios", "📄 Resumo Executivo", "📊 Pitch Deck", "📥 Downloads"])
 
         # ==============================
         # 📝 Plano de Negócios
         # ==============================
         with tabs[0]:
-            md_path = os.path.join(OUTPUT_DIR, "plano_negocios.md")
-            content = load_markdown(md_path) 
-            if content:
-                st.markdown(content, unsafe_allow_html=True)
-            else:
-                st.info("Nenhum plano de negócios gerado ainda.")
+            render_report("plano_negocios.md", "Nenhum plano de negócios gerado ainda.")
 
         # ==============================
         # 📄 Resumo Executivo
         # ==============================
         with tabs[1]:
-            md_path = os.path.join(OUTPUT_DIR, "resumo_executivo.md")
-            content = load_markdown(md_path) 
-            if content:
-                st.markdown(content, unsafe_allow_html=True)
-            else:
-                st.info("Nenhum resumo executivo gerado ainda.")
+            render_report("resumo_executivo.md", "Nenhum resumo executivo gerado ainda.")
 
         # ==============================
         # 📊 Pitch Deck
         # ==============================
         with tabs[2]:
-            md_path = os.path.join(OUTPUT_DIR, "pitch_deck.md")
-            content = load_markdown(md_path) 
-            if content:
-                st.markdown(content, unsafe_allow_html=True)
-            else:
-                st.info("Nenhum pitch deck gerado ainda.")
+            render_report("pitch_deck.md", "Nenhum pitch deck gerado ainda.")
 
         # ==============================
         # 📥 Downloads
@@ -412,27 +501,42 @@ if selected == "Aplicativo":
         with tabs[3]:
             st.subheader("📥 Relatórios disponíveis para download")
 
-            # Lista de arquivos PDF disponíveis
-            pdfs = [f for f in os.listdir(OUTPUT_DIR) if f.lower().endswith(".pdf")]
-
-            if pdfs:
-                for file in pdfs:
-                    path = os.path.join(OUTPUT_DIR, file)
-                    if os.path.exists(path):
-                        # Lê o PDF em memória
-                        with open(path, "rb") as f:
-                            pdf_bytes = f.read()
-
-                        # Botão de download individual
+            # PDFs da execução, direto do índice (sem listar diretórios)
+            pdfs = [a for name, a in artifacts.items() if name.lower().endswith(".pdf")]
+
+            # Fragmento: preparar um download reexecuta só esta aba. Os bytes só são
+            # lidos no clique em "Preparar" e saem da memória na interação seguinte.
+            @st.fragment
+            def downloads_panel(pdfs):
+                for artifact in pdfs:
+                    path = artifact["path"]
+                    file = artifact["name"]
+                    if not os.path.exists(path):
+                        st.warning(f"⚠️ Arquivo esperado não encontrado: {file}")
+                        continue
+                    if st.button(f"📄 Preparar {file} ({artifact['size'] / 1024:.0f} KB)",
+                                 key=f"prep_{artifact['run_id']}_{file}"):
                         st.download_button(
                             label=f"📄 Baixar {file}",
-                            data=pdf_bytes,
+                            data=read_bytes(path),
                             file_name=file,
                             mime="application/pdf",
-                            use_container_width=False
+                            on_click="ignore",
                         )
-                    else:
-                        st.warning(f"⚠️ Arquivo esperado não encontrado: {file}")
+
+                run_id = pdfs[0]["run_id"]
+                if st.button("📦 Preparar pacote com todos os relatórios (.zip)", key=f"prep_zip_{run_id}"):
+                    bundle = runner.artifacts.bundle(run_id)
+                    st.download_button(
+                        label="📦 Baixar pacote .zip",
+                        data=read_bytes(bundle),
+                        file_name=os.path.basename(bundle),
+                        mime="application/zip",
+                        on_click="ignore",
+                    )
+
+            if pdfs:
+                downloads_panel(pdfs)
             else:
                 st.info("Nenhum PDF disponível para download ainda.")
 
@@ -0,0 +1,215 @@
+# benchmarks/bench_e2e.py
+# ==========================================================
+# ⏱️ Benchmark ponta a ponta offline: crew completa, PDF e login contra um LLM falso
+# ==========================================================
+# Uso:
+#   python benchmarks/bench_e2e.py --latency 0.3 --tokens 600 --repeat 3 --json atual.json
+#   python benchmarks/bench_e2e.py --json novo.json --compare atual.json
+#
+# Sobe o benchmarks/stub_llm_server.py em outro processo (sem rede nem custo
+# de API) e aponta o BizAgents para ele via BIZ_LLM_BASE_URL. Mede:
+#   - crew: tempo da execução completa com exportação dos PDFs (por modo) e por tarefa;
+#   - pdf: conversões/s e MB/s do convert_md_to_pdf com os relatórios gerados;
+#   - auth: latência do authenticate_user (PBKDF2).
+# O JSON leva o commit atual; --compare imprime a razão novo/antigo por métrica.
+# ==========================================================
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PROFILE = {
+    "nome_empresa": "Café Aurora",
+    "segmento": "Alimentação",
+    "publico_alvo": "Profissionais de 25 a 40 anos no centro da cidade",
+    "modelo_receita": "Venda direta + assinatura mensal de café",
+    "ticket_medio": 32.0,
+    "custo_medio_mensal": 18000.0,
+    "meta_12m": "Atingir 1.500 clientes recorrentes",
+}
+
+
+def _stats(values):
+    ordered = sorted(values)
+    p95 = ordered[min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))]
+    return {"median": round(statistics.median(ordered), 4), "min": round(ordered[0], 4), "p95": round(p95, 4)}
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def start_stub(latency, token_delay, tokens):
+    """Stub em um processo separado (não disputa o GIL com a crew); devolve (processo, base_url)."""
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "benchmarks", "stub_llm_server.py"), "--port", "0",
+         "--latency", str(latency), "--token-delay", str(token_delay), "--tokens", str(tokens)],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    )
+    port = int(proc.stdout.readline())
+    return proc, f"http://127.0.0.1:{port}/v1"
+
+
+# ==========================================================
+# Casos
+# ==========================================================
+def bench_crew(modes, repeat, workdir):
+    from biz_components import BizAgents
+    from biz_pipeline import run_pipeline
+
+    # Execução de aquecimento (imports do crewai, fontes do PDF) fora da medição
+    warmup_dir = os.path.join(workdir, "runs", "warmup")
+    os.makedirs(warmup_dir, exist_ok=True)
+    run_pipeline(PROFILE, warmup_dir, mode=modes[0], agents=BizAgents(use_cache=False))
+
+    results, last_run_dir = {}, None
+    for mode in modes:
+        walls, tasks, calls = [], {}, 0
+        for i in range(repeat):
+            run_dir = os.path.join(workdir, "runs", f"{mode}_{i}")
+            os.makedirs(run_dir, exist_ok=True)
+            started = time.perf_counter()
+            warnings, timings = run_pipeline(PROFILE, run_dir, mode=mode, agents=BizAgents(use_cache=False))
+            walls.append(time.perf_counter() - started)
+            for name, seconds in timings["tasks"].items():
+                tasks.setdefault(name, []).append(seconds)
+            calls += sum(m["calls"] for m in timings["llm"].values())
+            last_run_dir = run_dir
+        results[mode] = {
+            "seconds": _stats(walls),
+            "tasks": {name: _stats(values) for name, values in tasks.items()},
+            "llm_calls_per_run": calls / repeat,
+            "warnings": warnings,
+        }
+        print(f"crew {mode:<10} {results[mode]['seconds']['median']:8.2f}s (mediana de {repeat})  "
+              f"{calls / repeat:.0f} chamadas ao LLM por execução")
+    return results, last_run_dir
+
+
+def bench_pdf(run_dir, repeat, workdir):
+    from biz_pipeline import EXPECTED_FILES
+    from biz_utils import convert_md_to_pdf
+
+    md_paths = [os.path.join(run_dir, md) for md in EXPECTED_FILES if os.path.exists(os.path.join(run_dir, md))]
+    total_bytes = sum(os.path.getsize(p) for p in md_paths)
+    convert_md_to_pdf(md_paths[0], os.path.join(workdir, "warmup.pdf"))  # fontes e imports fora da medição
+
+    per_round = []
+    for i in range(repeat):
+        started = time.perf_counter()
+        for n, md_path in enumerate(md_paths):
+            convert_md_to_pdf(md_path, os.path.join(workdir, f"pdf_{i}_{n}.pdf"))
+        per_round.append(time.perf_counter() - started)
+    seconds = statistics.median(per_round)
+    result = {
+        "files": len(md_paths),
+        "md_bytes": total_bytes,
+        "seconds_per_round": _stats(per_round),
+        "files_per_sec": round(len(md_paths) / seconds, 2),
+        "md_mb_per_sec": round(total_bytes / 2 ** 20 / seconds, 3),
+    }
+    print(f"pdf  {result['files_per_sec']:8.2f} arquivos/s  {result['md_mb_per_sec']:.3f} MB/s de Markdown")
+    return result
+
+
+def bench_auth(samples, workdir):
+    from biz_auth import authenticate_user, init_db
+
+    db_path = os.path.join(workdir, "auth.db")
+    init_db(db_path)
+    latencies = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        ok, _, _ = authenticate_user("admin", "admin123", db_path=db_path)
+        latencies.append(time.perf_counter() - started)
+        assert ok, "autenticação falhou"
+    result = {"samples": samples, "ms": {k: round(v * 1000, 3) for k, v in _stats(latencies).items()}}
+    print(f"auth {result['ms']['median']:8.2f} ms por login (p95 {result['ms']['p95']:.2f} ms)")
+    return result
+
+
+# ==========================================================
+# Comparação entre commits
+# ==========================================================
+def _flatten(data, prefix=""):
+    for key, value in data.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from _flatten(value, path)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield path, value
+
+
+def compare(old, new):
+    old_values = dict(_flatten(old["results"]))
+    print(f"\ncomparação {old.get('commit')} -> {new.get('commit')} (razão novo/antigo)")
+    for path, value in _flatten(new["results"]):
+        before = old_values.get(path)
+        if before:
+            print(f"  {path:<45} {before:>12,.4f} -> {value:>12,.4f}  {value / before:6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ponta a ponta com LLM falso local")
+    parser.add_argument("--latency", type=float, default=0.3, help="segundos até o primeiro token do stub")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="segundos entre trechos do streaming")
+    parser.add_argument("--tokens", type=int, default=600, help="tamanho aproximado de cada resposta")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--modes", nargs="+", default=["parallel", "sequential"],
+                        choices=["parallel", "sequential"])
+    parser.add_argument("--auth-samples", type=int, default=20)
+    parser.add_argument("--json", help="grava os resultados neste arquivo")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparar")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_e2e_")
+    proc, base_url = start_stub(args.latency, args.token_delay, args.tokens)
+    os.environ.update({
+        "BIZ_LLM_BASE_URL": base_url,
+        "OPENAI_API_KEY": "stub",
+        "CREWAI_DISABLE_TELEMETRY": "true",
+        "CREWAI_TRACING_ENABLED": "false",
+        "OTEL_SDK_DISABLED": "true",
+        # Sem o índice de similaridade: o aquecimento não pode servir a análise de mercado às medições
+        "BIZ_SIMILARITY": "0",
+    })
+    os.chdir(workdir)  # saídas, cache de PDF e banco ficam no diretório temporário
+    try:
+        crew, run_dir = bench_crew(args.modes, args.repeat, workdir)
+        results = {
+            "crew": crew,
+            "pdf": bench_pdf(run_dir, args.repeat, workdir),
+            "auth": bench_auth(args.auth_samples, workdir),
+        }
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    report = {
+        "commit": _commit(),
+        "python": sys.version.split()[0],
+        "cpus": os.cpu_count(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("json", "compare")},
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# benchmarks/bench_history.py
+# ==========================================================
+# ⏱️ Benchmark: histórico de planos comprimido + busca FTS5 (biz_history)
+# ==========================================================
+# Uso:
+#   python benchmarks/bench_history.py --plans 100000 --users 500 --json resultado.json
+#
+# Arquiva `--plans` planos sintéticos (três Markdown por plano, ~17 KB de
+# texto gerado a partir de um vocabulário de negócios) num banco temporário
+# e mede: inserções/s do archive_plan, tamanho do banco (após checkpoint do
+# WAL) contra o texto original e latência p50/p95 de search_plans, por
+# usuário, para termos exatos e um prefixo. O vocabulário é pequeno: quase
+# todo termo aparece em quase todo plano (pior caso para o FTS).
+# ==========================================================
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from biz_db import connection
+from biz_history import archive_plan, history_stats, search_plans
+
+SEGMENTOS = ["Alimentação saudável", "SaaS B2B", "E-commerce de moda", "Consultoria financeira",
+             "Marketing digital", "Educação online", "Pet shop", "Academia", "Delivery de refeições",
+             "Turismo rural", "Cafeteria", "Logística urbana"]
+VOCABULARIO = (
+    "mercado cliente receita custo margem breakeven assinatura recorrente ticket médio canal "
+    "aquisição retenção churn concorrência diferencial posicionamento marca proposta valor "
+    "investimento capital giro fluxo caixa projeção cenário otimista pessimista crescimento "
+    "marketing digital redes sociais parceria fornecedor logística entrega delivery estoque "
+    "equipe contratação operação tecnologia plataforma aplicativo escala público persona "
+    "pesquisa tendência regulação risco mitigação indicador meta trimestre expansão franquia "
+    "preço precificação desconto fidelidade comunidade conteúdo influenciador sazonalidade"
+).split()
+QUERIES = ["breakeven", "SaaS breakeven", "delivery", "assinatura churn", "franquia expansão", "pet", "franq*"]
+
+
+def synthetic_plan(rng, words_per_doc):
+    segmento = rng.choice(SEGMENTOS)
+    profile = {
+        "nome_empresa": f"Empresa {rng.randrange(10 ** 6)}",
+        "segmento": segmento,
+        "publico_alvo": rng.choice(["Profissionais urbanos", "PMEs", "Famílias", "Estudantes"]),
+        "modelo_receita": rng.choice(["Assinatura", "Venda direta", "Marketplace", "Freemium"]),
+    }
+    documents = {}
+    for name in ("plano_negocios.md", "resumo_executivo.md", "pitch_deck.md"):
+        parts = [f"# {profile['nome_empresa']} — {segmento}\n"]
+        for section in range(6):
+            parts.append(f"\n## Seção {section + 1}\n")
+            parts.append(" ".join(rng.choices(VOCABULARIO, k=words_per_doc // 6)))
+        documents[name] = "".join(parts)
+    return profile, documents
+
+
+def db_size(db_path):
+    with connection(db_path) as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return sum(os.path.getsize(p) for p in (db_path, db_path + "-wal") if os.path.exists(p))
+
+
+def fts_bytes(db_path):
+    """Bytes das tabelas internas do FTS5 (None se o SQLite não tiver a tabela virtual dbstat)."""
+    import sqlite3
+
+    with connection(db_path) as conn:
+        try:
+            return conn.execute("SELECT coalesce(sum(pgsize), 0) FROM dbstat WHERE name LIKE 'plans_fts%'") \
+                .fetchone()[0]
+        except sqlite3.OperationalError:
+            return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do histórico de planos (zlib + FTS5)")
+    parser.add_argument("--plans", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--words", type=int, default=600, help="palavras por documento")
+    parser.add_argument("--queries", type=int, default=200, help="consultas por termo")
+    parser.add_argument("--json", help="grava os resultados neste arquivo")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bench_history_"), "history.db")
+
+    started = time.perf_counter()
+    for i in range(args.plans):
+        profile, documents = synthetic_plan(rng, args.words)
+        archive_plan(f"run{i}", f"user{i % args.users}", profile, documents, db_path=db_path)
+        if (i + 1) % 10000 == 0:
+            print(f"  {i + 1} planos arquivados ({(i + 1) / (time.perf_counter() - started):.0f}/s)")
+    insert_seconds = time.perf_counter() - started
+
+    stats = history_stats(db_path=db_path)
+    size = db_size(db_path)
+    fts_size = fts_bytes(db_path)
+
+    search_plans("user0", "", db_path=db_path)  # aquece cache de páginas
+    latencies = {}
+    for query in QUERIES:
+        samples = []
+        for n in range(args.queries):
+            t0 = time.perf_counter()
+            search_plans(f"user{n % args.users}", query, db_path=db_path)
+            samples.append(time.perf_counter() - t0)
+        samples.sort()
+        latencies[query] = {
+            "p50_ms": round(statistics.median(samples) * 1000, 3),
+            "p95_ms": round(samples[int(0.95 * (len(samples) - 1))] * 1000, 3),
+        }
+        print(f"busca {query!r:<22} p50 {latencies[query]['p50_ms']:8.3f} ms  p95 {latencies[query]['p95_ms']:8.3f} ms")
+
+    results = {
+        "plans": stats["plans"],
+        "users": args.users,
+        "inserts_per_sec": round(args.plans / insert_seconds, 1),
+        "raw_mb": round(stats["raw"] / 2 ** 20, 1),
+        "compressed_mb": round(stats["stored"] / 2 ** 20, 1),
+        "fts_mb": round(fts_size / 2 ** 20, 1) if fts_size is not None else None,
+        "db_mb": round(size / 2 ** 20, 1),
+        "bytes_per_plan": {"raw": stats["raw"] // max(stats["plans"], 1),
+                           "stored": stats["stored"] // max(stats["plans"], 1),
+                           "db": size // max(stats["plans"], 1)},
+        "search": latencies,
+    }
+    print(f"{results['plans']} planos: texto {results['raw_mb']} MB -> comprimido {results['compressed_mb']} MB; "
+          f"banco {results['db_mb']} MB (FTS {results['fts_mb']} MB); {results['inserts_per_sec']} inserções/s")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/bench_login.py
+# ==========================================================
+# ⏱️ Benchmark: logins/s com senha (PBKDF2) x retomada por token de sessão
+# ==========================================================
+# Uso:
+#   python benchmarks/bench_login.py --threads 1 4 8 --seconds 3 --json resultado.json
+# ==========================================================
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from biz_auth import authenticate_user, create_session, init_db, resolve_session
+
+
+def _throughput(fn, threads, seconds):
+    """Chama `fn` em `threads` threads por `seconds` segundos; devolve (ops/s, latência média)."""
+    deadline = time.perf_counter() + seconds
+
+    def worker():
+        count, busy = 0, 0.0
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            fn()
+            busy += time.perf_counter() - t0
+            count += 1
+        return count, busy
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(lambda _: worker(), range(threads)))
+    wall = time.perf_counter() - started
+    total = sum(c for c, _ in results)
+    busy = sum(b for _, b in results)
+    return total / wall, (busy / total if total else 0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de login (senha x token de sessão)")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--json", help="grava os resultados neste arquivo")
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bench_login_"), "users.db")
+    init_db(db_path)  # cria o admin padrão (admin / admin123)
+    token = create_session("admin", "admin", db_path=db_path)
+
+    cases = {
+        "password": lambda: authenticate_user("admin", "admin123", db_path=db_path),
+        "session_token": lambda: resolve_session(token, db_path=db_path),
+    }
+    results = {"cpus": os.cpu_count()}
+    for name, fn in cases.items():
+        assert fn()[0], f"{name}: autenticação falhou"
+        for threads in args.threads:
+            ops, latency = _throughput(fn, threads, args.seconds)
+            results[f"{name}_t{threads}"] = {"logins_per_sec": round(ops, 1), "latency_ms": round(latency * 1000, 3)}
+            print(f"{name:<14} threads={threads:<3} {ops:10,.1f} logins/s  {latency * 1000:9.3f} ms/login")
+
+    for threads in args.threads:
+        speedup = results[f"session_token_t{threads}"]["logins_per_sec"] / results[f"password_t{threads}"]["logins_per_sec"]
+        results[f"speedup_t{threads}"] = round(speedup, 1)
+        print(f"threads={threads}: token {speedup:,.0f}x mais rápido que a senha")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# benchmarks/bench_md_pdf.py
+# ==========================================================
+# ⏱️ Benchmark: Markdown -> PDF (tokenizador atual x implementação anterior)
+# ==========================================================
+# Uso:
+#   python benchmarks/bench_md_pdf.py --lines 10000 --repeat 3 --json resultado.json
+# ==========================================================
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+import biz_utils
+from biz_pdf import _header_footer, _pdf_styles, convert_md_to_pdf, markdown_to_flowables
+from biz_utils import format_inline, tokenize_markdown
+
+
+# ==========================================================
+# Implementação anterior (regex por linha), mantida só para comparação
+# ==========================================================
+def legacy_story(lines, styles, Paragraph=Paragraph, Spacer=Spacer):
+    normal, h1, h2, h3 = styles["normal"], styles["h1"], styles["h2"], styles["h3"]
+    bullet, subbullet = styles["bullet"], styles["subbullet"]
+    story = []
+    for raw_line in lines:
+        line = raw_line.rstrip()
+        line = re.sub(r"\*\*(.*?)\*\*", r"<b>\1</b>", line)
+        line = re.sub(r"_(.*?)_", r"<i>\1</i>", line)
+        if not line:
+            story.append(Spacer(1, 8))
+            continue
+        if line.startswith("# "):
+            story.append(Paragraph(line[2:], h1))
+        elif line.startswith("## "):
+            story.append(Paragraph(line[3:], h2))
+        elif line.startswith("### "):
+            story.append(Paragraph(line[4:], h3))
+        elif re.match(r"^\s*-\s+", line) or re.match(r"^\s*\*\s+", line):
+            indent_level = len(line) - len(line.lstrip())
+            content = line.strip("-* ").strip()
+            style = bullet if indent_level < 4 else subbullet
+            story.append(Paragraph(f"• {content}", style))
+        else:
+            line = re.sub(r"\\\\\[|\\\\\]", "", line)
+            line = re.sub(r"\\\\\(|\\\\\)", "", line)
+            line = re.sub(r"\\\\text\{(.*?)\}", r"\1", line)
+            line = re.sub(r"\\times", "×", line)
+            line = re.sub(r"\\frac\{(.*?)\}\{(.*?)\}", r"(\1 / \2)", line)
+            line = re.sub(r"\\", "", line)
+            story.append(Paragraph(line, normal))
+    return story
+
+
+def legacy_convert(md_path, pdf_path):
+    with open(md_path, "r", encoding="utf-8") as f:
+        story = legacy_story(f.readlines(), _pdf_styles())
+    doc = SimpleDocTemplate(pdf_path, pagesize=A4, rightMargin=50, leftMargin=50, topMargin=80, bottomMargin=60)
+    doc.build(story, onFirstPage=_header_footer, onLaterPages=_header_footer)
+    return True
+
+
+# ==========================================================
+# Plano sintético
+# ==========================================================
+def generate_plan(n_lines, seed=42):
+    rnd = random.Random(seed)
+    # Sem "_" dentro de palavras: a implementação anterior quebra com snake_case
+    words = ("mercado receita cliente margem churn ticket crescimento canal "
+             "marca proposta valor breakeven investimento equipe produto").split()
+    lines = []
+    section = 0
+    while len(lines) < n_lines:
+        section += 1
+        lines += [f"## {section}. Seção de análise", ""]
+        lines.append(" ".join(rnd.choice(words) for _ in range(25)) + " com **destaque** e _ênfase_.")
+        lines.append("")
+        for i in range(rnd.randint(3, 8)):
+            lines.append(f"- Item {i} sobre **{rnd.choice(words)}** e {rnd.choice(words)}")
+            if rnd.random() < 0.4:
+                lines.append(f"  - Detalhe {i}: receita \\times margem = R$ {rnd.randint(1, 99)}.000")
+        lines.append("")
+        if section % 4 == 0:
+            lines += ["| Mês | Receita | Margem |", "|---|---|---|"]
+            lines += [f"| {m} | R$ {rnd.randint(1, 90)}.000 | {rnd.randint(-20, 40)}% |" for m in range(1, 13)]
+            lines.append("")
+    return lines[:n_lines]
+
+
+def tokenizer_markdown_only(lines):
+    """Só a etapa de Markdown do conversor atual (tokens + formatação inline)."""
+    out = []
+    for token in tokenize_markdown(lines):
+        if token[0] == "table":
+            out.append([format_inline(c) for row in [token[1], *token[2]] for c in row])
+        elif len(token) > 1 and isinstance(token[-1], str) and token[0] != "code":
+            out.append(format_inline(token[-1]))
+    return out
+
+
+def _best(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da conversão Markdown -> PDF")
+    parser.add_argument("--lines", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="grava os resultados neste arquivo")
+    args = parser.parse_args()
+
+    lines = generate_plan(args.lines)
+    styles = _pdf_styles()
+    tmp = tempfile.mkdtemp(prefix="bench_md_pdf_")
+    md_path = os.path.join(tmp, "plano.md")
+    with open(md_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+
+    results = {"lines": len(lines), "template_version": biz_utils.TEMPLATE_VERSION}
+    # markdown_*: só o processamento do texto (sem criar Paragraphs do reportlab)
+    # flowables_*: até a lista de flowables; pdf_*: conversão completa
+    cases = {
+        "markdown_legacy": lambda: legacy_story(lines, styles, Paragraph=lambda t, s: t, Spacer=lambda w, h: None),
+        "markdown_tokenizer": lambda: tokenizer_markdown_only(lines),
+        "flowables_legacy": lambda: legacy_story(lines, styles),
+        "flowables_tokenizer": lambda: markdown_to_flowables(lines, styles),
+        "pdf_legacy": lambda: legacy_convert(md_path, os.path.join(tmp, "legacy.pdf")),
+        "pdf_tokenizer": lambda: convert_md_to_pdf(md_path, os.path.join(tmp, "novo.pdf")),
+    }
+    for name, fn in cases.items():
+        seconds = _best(fn, args.repeat)
+        results[name] = {"seconds": round(seconds, 4), "lines_per_sec": round(len(lines) / seconds)}
+        print(f"{name:<20} {seconds:8.3f}s  {len(lines) / seconds:12,.0f} linhas/s")
+
+    for kind in ("markdown", "flowables", "pdf"):
+        speedup = results[f"{kind}_legacy"]["seconds"] / results[f"{kind}_tokenizer"]["seconds"]
+        results[f"{kind}_speedup"] = round(speedup, 2)
+        print(f"{kind}: {speedup:.2f}x em relação à implementação anterior")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
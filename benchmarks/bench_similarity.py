@@ -0,0 +1,115 @@
+# benchmarks/bench_similarity.py
+# ==========================================================
+# ⏱️ Benchmark: busca no índice de similaridade de perfis (biz_similarity)
+# ==========================================================
+# Uso:
+#   python benchmarks/bench_similarity.py --sizes 1000 10000 50000 --queries 2000 --json resultado.json
+#
+# Preenche um banco temporário com execuções sintéticas (combinações de
+# segmentos, públicos e modelos de receita, nomes de empresa aleatórios) e
+# mede a latência de `nearest` (vetorização + produto matriz×vetor) e a carga
+# do índice. Perfis repetidos viram uma linha só; --unique força um perfil
+# distinto por execução (pior caso: uma linha por execução).
+# ==========================================================
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from biz_db import connection
+from biz_similarity import SimilarityIndex, profile_text, vectorize
+
+SEGMENTOS = ["Alimentação saudável", "SaaS B2B", "E-commerce de moda", "Consultoria financeira",
+             "Marketing digital", "Educação online", "Pet shop", "Academia", "Clínica odontológica",
+             "Turismo rural", "Cafeteria", "Logística urbana"]
+PUBLICOS = ["Profissionais urbanos", "PMEs de tecnologia", "Consumidores locais", "Estudantes universitários",
+            "Famílias com crianças", "Empresas médias e startups", "Idosos", "Donos de pets"]
+MODELOS = ["Assinatura", "Venda direta", "Marketplace", "Freemium", "Prestação de serviços"]
+EXTRAS = ["", " de classe média", " da capital", " no interior", " com alta renda", " conectados"]
+
+
+def synthetic_profile(rng, unique=None):
+    profile = {
+        "nome_empresa": f"Empresa {rng.randrange(10 ** 6)}",
+        "segmento": rng.choice(SEGMENTOS),
+        "publico_alvo": rng.choice(PUBLICOS) + rng.choice(EXTRAS),
+        "modelo_receita": rng.choice(MODELOS),
+    }
+    if unique is not None:
+        profile["publico_alvo"] += f" região {unique}"
+    return profile
+
+
+def fill(db_path, size, rng, unique):
+    """Insere `size` execuções direto no SQLite (sem passar pelo índice em memória)."""
+    rows = []
+    for i in range(size):
+        profile = synthetic_profile(rng, i if unique else None)
+        text = profile_text(profile)
+        rows.append((f"/tmp/bench/{i}/market.md", f"user{i % 50}", profile["nome_empresa"], text,
+                     vectorize(text).tobytes(), f"{i:012d}"))
+    with connection(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO market_index (output_path, username, nome_empresa, profile_text, vector, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do índice de similaridade de perfis")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--unique", action="store_true", help="um perfil distinto por execução")
+    parser.add_argument("--json", help="grava os resultados neste arquivo")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    queries = [synthetic_profile(rng) for _ in range(args.queries)]
+    results = {}
+    for size in args.sizes:
+        db_path = os.path.join(tempfile.mkdtemp(prefix="bench_similarity_"), "index.db")
+        fill(db_path, size, rng, args.unique)
+
+        started = time.perf_counter()
+        index = SimilarityIndex(db_path, per_user=False)
+        load = time.perf_counter() - started
+
+        # Os caminhos sintéticos não existem: min_score acima de 1 mede só a busca
+        latencies = []
+        for profile in queries:
+            t0 = time.perf_counter()
+            index.nearest(profile, min_score=1.01)
+            latencies.append(time.perf_counter() - t0)
+        latencies.sort()
+        vec_t0 = time.perf_counter()
+        for profile in queries:
+            vectorize(profile_text(profile))
+        vec = (time.perf_counter() - vec_t0) / len(queries)
+
+        results[str(size)] = {
+            "load_seconds": round(load, 3),
+            "rows": len(index),
+            "matrix_mb": round(len(index) * index.dim * np.dtype(np.float32).itemsize / 2 ** 20, 1),
+            "lookup_ms_p50": round(statistics.median(latencies) * 1000, 4),
+            "lookup_ms_p99": round(latencies[int(0.99 * (len(latencies) - 1))] * 1000, 4),
+            "vectorize_ms": round(vec * 1000, 4),
+        }
+        r = results[str(size)]
+        print(f"{size:>7} execuções ({r['rows']:>6} linhas)  carga {r['load_seconds']:6.2f}s  "
+              f"busca p50 {r['lookup_ms_p50']:7.3f} ms  p99 {r['lookup_ms_p99']:7.3f} ms  "
+              f"(vetorização {r['vectorize_ms']:.3f} ms)  matriz {r['matrix_mb']} MB")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# benchmarks/bench_startup.py
+# ==========================================================
+# ⏱️ Benchmark: processo frio até a tela de login renderizada (+ pico de RSS)
+# ==========================================================
+# Uso:
+#   python benchmarks/bench_startup.py --repeat 5 --json resultado.json
+#
+# Cada medição é um processo Python novo que roda o app.py com o AppTest do
+# Streamlit (sessão sem login) em um diretório temporário. O modo "eager"
+# importa crewai/reportlab/numpy antes, como o app fazia antes dos imports
+# preguiçosos; o modo "lazy" é o app como está.
+# ==========================================================
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("crewai", "reportlab", "numpy", "openai")
+
+CHILD = r"""
+import json, os, resource, sys, time
+root, workdir, eager = sys.argv[1], sys.argv[2], sys.argv[3] == "1"
+sys.path.insert(0, root)
+os.chdir(workdir)
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+if eager:
+    import crewai, reportlab.platypus, numpy  # noqa: F401
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(os.path.join(root, "app.py"), default_timeout=120)
+at.run()
+rendered = time.time()
+assert not at.exception, at.exception
+assert any("Acesso" in t.value for t in at.title), "tela de login não renderizada"
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform != "darwin":
+    rss *= 1024  # Linux informa em KiB
+print(json.dumps({
+    "rendered": rendered,
+    "peak_rss": rss,
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def measure(eager):
+    # Banco e saídas em um diretório novo; o app lê style.css pelo caminho relativo
+    workdir = tempfile.mkdtemp(prefix="bench_startup_")
+    shutil.copy(os.path.join(ROOT, "style.css"), workdir)
+    started = time.time()
+    proc = subprocess.run(
+        [sys.executable, "-c", CHILD, ROOT, workdir, "1" if eager else "0"],
+        capture_output=True, text=True, check=True,
+    )
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["seconds"] = result.pop("rendered") - started
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de inicialização até a tela de login")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="grava os resultados neste arquivo")
+    args = parser.parse_args()
+
+    results = {}
+    for mode, eager in (("eager", True), ("lazy", False)):
+        runs = [measure(eager) for _ in range(args.repeat)]
+        seconds = statistics.median(r["seconds"] for r in runs)
+        rss = statistics.median(r["peak_rss"] for r in runs)
+        results[mode] = {
+            "seconds_median": round(seconds, 3),
+            "seconds_min": round(min(r["seconds"] for r in runs), 3),
+            "peak_rss_mb": round(rss / 2 ** 20, 1),
+            "heavy_modules_loaded": runs[-1]["loaded"],
+        }
+        print(f"{mode:<6} {seconds:7.2f}s até o login  pico RSS {rss / 2 ** 20:7.1f} MB  "
+              f"módulos pesados: {', '.join(runs[-1]['loaded']) or 'nenhum'}")
+
+    results["speedup"] = round(results["eager"]["seconds_median"] / results["lazy"]["seconds_median"], 2)
+    results["rss_saved_mb"] = round(results["eager"]["peak_rss_mb"] - results["lazy"]["peak_rss_mb"], 1)
+    print(f"lazy: {results['speedup']:.2f}x mais rápido, {results['rss_saved_mb']:.1f} MB a menos de pico")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# benchmarks/stub_llm_server.py
+# ==========================================================
+# 🧪 Servidor LLM falso compatível com a API da OpenAI (/v1/chat/completions)
+# ==========================================================
+# Uso:
+#   python benchmarks/stub_llm_server.py --port 8765 --latency 0.5 --tokens 600
+#   BIZ_LLM_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=stub streamlit run app.py
+#
+# Responde no formato do CrewAI ("Thought: ... Final Answer: <markdown>") com
+# um relatório determinístico de ~`--tokens` tokens (títulos, tópicos e uma
+# tabela, para exercitar também a conversão em PDF). `--latency` atrasa o
+# primeiro token; `--token-delay` espaça os trechos no modo streaming.
+# Com --port 0 a porta escolhida é impressa na primeira linha da saída.
+# ==========================================================
+import argparse
+import hashlib
+import json
+import sys
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = ("mercado cliente receita custo margem canal marca produto serviço crescimento "
+         "concorrente segmento proposta valor risco premissa meta investimento").split()
+TOKENS_PER_CHUNK = 8
+
+
+def fake_report(seed, tokens):
+    """Markdown determinístico de ~`tokens` tokens (~0,75 palavra por token) a partir de `seed`."""
+    digest = hashlib.sha256(seed.encode("utf-8")).digest()
+    words = max(int(tokens * 0.75), 20)
+    lines, count, section = [], 0, 0
+    while count < words:
+        section += 1
+        lines += [f"## Seção {section}", ""]
+        for i in range(4):
+            w = [WORDS[(digest[(section + i + j) % len(digest)] + j) % len(WORDS)] for j in range(12)]
+            lines.append(f"- **{w[0].capitalize()}**: {' '.join(w[1:])} com R$ {(section * 1000 + i * 250):,}".replace(",", "."))
+            count += 14
+        lines += ["", "| Mês | Receita | Custos |", "|---|---|---|"]
+        for month in range(1, 4):
+            lines.append(f"| {month} | R$ {month * 1200} | R$ {month * 800} |")
+            count += 6
+        lines.append("")
+    return "Thought: I now can give a great answer\nFinal Answer: # Relatório\n\n" + "\n".join(lines)
+
+
+def _prompt_text(body):
+    parts = []
+    for message in body.get("messages", []):
+        content = message.get("content") or ""
+        parts.append(content if isinstance(content, str) else json.dumps(content))
+    return "".join(parts)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config = {"latency": 0.0, "token_delay": 0.0, "tokens": 600}
+    requests_served = 0
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "stub", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        StubHandler.requests_served += 1
+        prompt = _prompt_text(body)
+        text = fake_report(prompt[-2000:], self.config["tokens"])
+        usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(text) // 4}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        meta = {"id": f"chatcmpl-{uuid.uuid4().hex}", "created": int(time.time()), "model": body.get("model", "stub")}
+
+        time.sleep(self.config["latency"])
+        if body.get("stream"):
+            self._stream(meta, text, usage, (body.get("stream_options") or {}).get("include_usage"))
+        else:
+            self._send_json(200, {
+                **meta, "object": "chat.completion",
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": text}}],
+                "usage": usage,
+            })
+
+    def _stream(self, meta, text, usage, include_usage):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def event(choices, **extra):
+            chunk = {**meta, "object": "chat.completion.chunk", "choices": choices, **extra}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        step = TOKENS_PER_CHUNK * 4
+        for start in range(0, len(text), step):
+            delta = {"content": text[start:start + step]}
+            if start == 0:
+                delta["role"] = "assistant"
+            event([{"index": 0, "delta": delta, "finish_reason": None}])
+            if self.config["token_delay"]:
+                time.sleep(self.config["token_delay"])
+        event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if include_usage:
+            event([], usage=usage)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def make_server(port=0, latency=0.0, token_delay=0.0, tokens=600, host="127.0.0.1"):
+    """Servidor pronto para `serve_forever()`; a configuração vale para todas as requisições."""
+    handler = type("ConfiguredStubHandler", (StubHandler,), {
+        "config": {"latency": latency, "token_delay": token_delay, "tokens": tokens},
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor LLM falso compatível com a OpenAI")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.5, help="segundos até o primeiro token")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="segundos entre trechos no streaming")
+    parser.add_argument("--tokens", type=int, default=600, help="tamanho aproximado de cada resposta")
+    args = parser.parse_args()
+
+    server = make_server(args.port, args.latency, args.token_delay, args.tokens, args.host)
+    print(server.server_address[1], flush=True)
+    print(f"stub LLM em http://{args.host}:{server.server_address[1]}/v1", file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
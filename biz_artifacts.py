@@ -0,0 +1,167 @@
+# biz_artifacts.py
+# Diretório isolado por execução + índice de artefatos em SQLite
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import threading
+import zipfile
+from datetime import datetime
+
+from biz_db import DB_PATH, connection
+from biz_similarity import forget_runs
+from biz_utils import forget_cached_pdfs
+
+BUNDLE_NAME = "relatorios_agentai_biz.zip"
+
+
+def _now():
+    return datetime.utcnow().isoformat()
+
+
+def read_bytes(path):
+    """Conteúdo do arquivo via mmap: uma única cópia para `bytes`, sem buffer intermediário."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm[:]
+
+
+def profile_hash(profile_data):
+    payload = json.dumps(profile_data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ArtifactIndex:
+    """
+    Cada execução escreve em `<output_dir>/<run_id>/`. As tabelas `runs` e
+    `artifacts` registram dono, hash do perfil, tamanhos e datas, de modo que
+    abas e downloads consultam o índice em vez de listar diretórios.
+    """
+
+    def __init__(self, output_dir, db_path=DB_PATH):
+        self.output_dir = output_dir
+        self.db_path = db_path
+        os.makedirs(output_dir, exist_ok=True)
+
+    # ------------------------------------------------------
+    # Execuções
+    # ------------------------------------------------------
+    def run_dir(self, run_id):
+        return os.path.join(self.output_dir, run_id)
+
+    def create_run(self, run_id, username, profile_data):
+        path = self.run_dir(run_id)
+        os.makedirs(path, exist_ok=True)
+        now = _now()
+        with connection(self.db_path) as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO runs (id, username, profile_hash, run_dir, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, username, profile_hash(profile_data), path, now, now),
+            )
+        return path
+
+    def get_run(self, run_id):
+        with connection(self.db_path) as conn:
+            row = conn.execute("SELECT * FROM runs WHERE id=?", (run_id,)).fetchone()
+        return dict(row) if row else None
+
+    def latest_run(self, username):
+        """Última execução do usuário que já tem artefatos."""
+        with connection(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT r.* FROM runs r WHERE r.username=? "
+                "AND EXISTS (SELECT 1 FROM artifacts a WHERE a.run_id=r.id) "
+                "ORDER BY r.updated_at DESC LIMIT 1",
+                (username,),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def delete_runs(self, username):
+        """
+        Remove apenas as execuções (e arquivos) do próprio usuário, inclusive
+        as cópias dos PDFs no cache de exportação, as análises de mercado no
+        índice de similaridade e os jobs (que não podem mais ser retomados).
+        Jobs ainda na fila ou rodando ficam: o worker escreveria num diretório apagado.
+        """
+        with connection(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT id, run_dir FROM runs WHERE username=? AND id NOT IN "
+                "(SELECT id FROM jobs WHERE status IN ('queued', 'running'))",
+                (username,),
+            ).fetchall()
+            ids = [(r["id"],) for r in rows]
+            conn.executemany("DELETE FROM artifacts WHERE run_id=?", ids)
+            conn.executemany("DELETE FROM runs WHERE id=?", ids)
+            # O id da execução é o do job: sem diretório, não há o que retomar
+            conn.executemany("DELETE FROM jobs WHERE id=?", ids)
+        forget_runs(username, [r["run_dir"] for r in rows], self.db_path)
+        for r in rows:
+            forget_cached_pdfs(r["run_dir"])
+            shutil.rmtree(r["run_dir"], ignore_errors=True)
+        return len(rows)
+
+    # ------------------------------------------------------
+    # Artefatos
+    # ------------------------------------------------------
+    def register(self, run_id, path):
+        if not os.path.isfile(path):
+            return
+        now = _now()
+        with connection(self.db_path) as conn:
+            conn.execute(
+                "INSERT INTO artifacts (run_id, name, path, size, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(run_id, name) DO UPDATE SET path=excluded.path, size=excluded.size, "
+                "updated_at=excluded.updated_at",
+                (run_id, os.path.basename(path), path, os.path.getsize(path), now, now),
+            )
+            conn.execute("UPDATE runs SET updated_at=? WHERE id=?", (now, run_id))
+
+    def list_artifacts(self, run_id):
+        """{nome_do_arquivo: linha do índice} da execução."""
+        with connection(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT * FROM artifacts WHERE run_id=? ORDER BY name", (run_id,)
+            ).fetchall()
+        return {r["name"]: dict(r) for r in rows}
+
+    # ------------------------------------------------------
+    # Pacote .zip
+    # ------------------------------------------------------
+    def bundle(self, run_id):
+        """
+        Zip com todos os artefatos da execução, montado uma vez e guardado no
+        diretório da execução. A assinatura dos artefatos (nome, tamanho, data)
+        fica no comentário do zip; só se ela mudar o pacote é refeito.
+        """
+        artifacts = self.list_artifacts(run_id)
+        if not artifacts:
+            return None
+        signature = hashlib.sha256(json.dumps(
+            [(a["name"], a["size"], a["updated_at"]) for a in artifacts.values()]
+        ).encode("utf-8")).hexdigest().encode("ascii")
+
+        path = os.path.join(self.run_dir(run_id), BUNDLE_NAME)
+        if os.path.exists(path):
+            try:
+                with zipfile.ZipFile(path) as zf:
+                    if zf.comment == signature:
+                        return path
+            except zipfile.BadZipFile:
+                pass
+
+        # Arquivo temporário + replace: duas sessões montando ao mesmo tempo não se atrapalham
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for name, artifact in artifacts.items():
+                if os.path.isfile(artifact["path"]):
+                    # PDFs já são comprimidos; só os Markdown passam pelo deflate
+                    compress = zipfile.ZIP_STORED if name.endswith(".pdf") else zipfile.ZIP_DEFLATED
+                    zf.write(artifact["path"], arcname=name, compress_type=compress)
+            zf.comment = signature
+        os.replace(tmp_path, path)
+        return path
@@ -0,0 +1,99 @@
+# biz_auth.py
+# Usuários (PBKDF2) e sessões persistentes com token
+import binascii
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+from datetime import datetime, timedelta
+
+from biz_db import DB_PATH, connection
+
+PBKDF2_ITERATIONS = 200000
+SESSION_TTL_HOURS = float(os.getenv("BIZ_SESSION_TTL_HOURS", "12"))
+
+# SQL fixo: cada conexão do pool reaproveita o statement já preparado
+USER_LOOKUP_SQL = "SELECT password_hash, salt, role FROM users WHERE username=?"
+SESSION_LOOKUP_SQL = "SELECT username, role FROM sessions WHERE token_hash=? AND expires_at > ?"
+
+_initialized = set()
+_init_lock = threading.Lock()
+
+
+def init_db(db_path=DB_PATH):
+    """Esquema (via biz_db) e usuário admin padrão; só trabalha na primeira chamada do processo."""
+    with _init_lock:
+        if db_path in _initialized:
+            return
+        with connection(db_path) as conn:
+            if not conn.execute("SELECT id FROM users WHERE username='admin'").fetchone():
+                pwd_hash, salt = hash_password('admin123')
+                conn.execute(
+                    "INSERT INTO users (username, password_hash, salt, role, created_at) VALUES (?, ?, ?, ?, ?)",
+                    ('admin', pwd_hash, salt, 'admin', datetime.utcnow().isoformat())
+                )
+        _initialized.add(db_path)
+
+
+# ==========================================================
+# Senhas
+# ==========================================================
+def hash_password(password: str, salt: bytes = None):
+    if salt is None:
+        salt = os.urandom(16)
+    dk = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, PBKDF2_ITERATIONS)
+    return binascii.hexlify(dk).decode(), binascii.hexlify(salt).decode()
+
+
+def verify_password(stored_hash_hex, stored_salt_hex, password_attempt):
+    salt = binascii.unhexlify(stored_salt_hex)
+    attempt_hash_hex, _ = hash_password(password_attempt, salt)
+    return hmac.compare_digest(attempt_hash_hex, stored_hash_hex)
+
+
+def authenticate_user(username, password, db_path=DB_PATH):
+    with connection(db_path) as conn:
+        row = conn.execute(USER_LOOKUP_SQL, (username,)).fetchone()
+    if not row:
+        return False, "Usuário não encontrado", None
+    stored_hash, stored_salt, role = row
+    ok = verify_password(stored_hash, stored_salt, password)
+    return (True, "Autenticado", role) if ok else (False, "Senha incorreta", None)
+
+
+# ==========================================================
+# Sessões
+# ==========================================================
+def _token_hash(token):
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def create_session(username, role, ttl_hours=SESSION_TTL_HOURS, db_path=DB_PATH):
+    """Cria uma sessão e devolve o token em claro (só o cliente o conhece)."""
+    token = secrets.token_urlsafe(32)
+    now = datetime.utcnow()
+    with connection(db_path) as conn:
+        conn.execute("DELETE FROM sessions WHERE expires_at < ?", (now.isoformat(),))
+        conn.execute(
+            "INSERT INTO sessions (token_hash, username, role, created_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+            (_token_hash(token), username, role, now.isoformat(),
+             (now + timedelta(hours=ttl_hours)).isoformat()),
+        )
+    return token
+
+
+def resolve_session(token, db_path=DB_PATH):
+    """(usuário, papel) de um token válido e não expirado; senão None. Sem PBKDF2."""
+    if not token:
+        return None
+    with connection(db_path) as conn:
+        row = conn.execute(SESSION_LOOKUP_SQL, (_token_hash(token), datetime.utcnow().isoformat())).fetchone()
+    return (row[0], row[1]) if row else None
+
+
+def revoke_session(token, db_path=DB_PATH):
+    if not token:
+        return
+    with connection(db_path) as conn:
+        conn.execute("DELETE FROM sessions WHERE token_hash=?", (_token_hash(token),))
@@ -0,0 +1,201 @@
+# biz_batch.py
+# ==========================================================
+# 🗂️ Geração em lote (sem Streamlit)
+# ==========================================================
+# Uso:
+#   python biz_batch.py perfis.csv --workers 4 --rpm 60
+#   python biz_batch.py perfis.jsonl --out biz_output/lote --mode sequential
+#
+# Cada linha do CSV/JSONL tem os mesmos campos dos perfis rápidos do app
+# (nome_empresa, segmento, publico_alvo, modelo_receita, ticket_medio,
+# custo_medio_mensal, meta_12m) e, opcionalmente, um `id`.
+# Rodar de novo o mesmo comando retoma de onde parou: perfis já concluídos
+# no manifest.jsonl são pulados.
+# ==========================================================
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from biz_artifacts import profile_hash
+from biz_tools import safe_float
+
+PROFILE_FIELDS = ["nome_empresa", "segmento", "publico_alvo", "modelo_receita",
+                  "ticket_medio", "custo_medio_mensal", "meta_12m"]
+_RE_UNSAFE = re.compile(r"[^\w.-]")
+
+
+# ==========================================================
+# Entrada
+# ==========================================================
+def load_profiles(path):
+    """Lê perfis de um CSV ou JSONL; devolve [(id, perfil)]."""
+    if path.lower().endswith((".jsonl", ".ndjson")):
+        with open(path, "r", encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    else:
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            rows = list(csv.DictReader(f))
+
+    profiles, seen = [], set()
+    for row in rows:
+        profile = {field: row.get(field, "") or "" for field in PROFILE_FIELDS}
+        profile["ticket_medio"] = safe_float(profile["ticket_medio"])
+        profile["custo_medio_mensal"] = safe_float(profile["custo_medio_mensal"])
+        profile_id = str(row.get("id") or profile_hash(profile)[:16])
+        if profile_id in seen:
+            continue
+        seen.add(profile_id)
+        profiles.append((profile_id, profile))
+    return profiles
+
+
+def run_dir_name(profile_id):
+    """
+    Nome do diretório do perfil dentro de `--out`. O `id` vem do arquivo de
+    entrada: barras, "..", etc. viram "_" e ganham um sufixo do id original
+    (ids diferentes nunca dividem diretório). O manifesto guarda o id como veio.
+    """
+    name = _RE_UNSAFE.sub("_", profile_id)
+    if name != profile_id or name in ("", ".", ".."):
+        digest = hashlib.sha256(profile_id.encode("utf-8")).hexdigest()[:8]
+        name = f"{name.strip('.') or 'perfil'}-{digest}"
+    return name
+
+
+# ==========================================================
+# Manifesto (retomada + resumo)
+# ==========================================================
+class Manifest:
+    """Uma linha JSON por perfil processado; as linhas `done` são puladas na retomada."""
+
+    def __init__(self, out_dir):
+        self.path = os.path.join(out_dir, "manifest.jsonl")
+        self._lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries[entry["id"]] = entry
+
+    def done(self, profile_id):
+        return self.entries.get(profile_id, {}).get("status") == "done"
+
+    def record(self, entry):
+        with self._lock:
+            self.entries[entry["id"]] = entry
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = (len(values) - 1) * q
+    lo, hi = int(k), min(int(k) + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def write_summary(manifest, out_dir, wall):
+    entries = list(manifest.entries.values())
+    latencies = [e["seconds"] for e in entries if e["status"] == "done"]
+    summary = {
+        "generated_at": datetime.utcnow().isoformat(),
+        "total": len(entries),
+        "done": len(latencies),
+        "failed": sum(1 for e in entries if e["status"] == "failed"),
+        "wall_seconds": round(wall, 2),
+        "latency": {
+            "p50": round(_percentile(latencies, 0.50), 2),
+            "p95": round(_percentile(latencies, 0.95), 2),
+            "max": round(max(latencies, default=0.0), 2),
+        },
+        "profiles": sorted(entries, key=lambda e: e["id"]),
+    }
+    path = os.path.join(out_dir, "manifest.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return summary, path
+
+
+# ==========================================================
+# Execução
+# ==========================================================
+def run_one(profile_id, profile, out_dir, mode, limiter):
+    from biz_components import BizAgents
+    from biz_history import archive_run_dir
+    from biz_pipeline import EXPECTED_FILES, run_pipeline
+    from biz_telemetry import record_run
+
+    run_dir = os.path.join(out_dir, run_dir_name(profile_id))
+    os.makedirs(run_dir, exist_ok=True)
+    started = time.perf_counter()
+    entry = {"id": profile_id, "nome_empresa": profile["nome_empresa"], "run_dir": run_dir}
+    try:
+        warnings, timings = run_pipeline(profile, run_dir, mode=mode,
+                                         agents=BizAgents(rate_limiter=limiter), username="batch")
+        entry.update(status="done", warnings=warnings, timings=timings)
+        record_run(f"batch:{profile_id}", "batch", timings)
+        archive_run_dir(f"batch:{profile_id}", "batch", profile, run_dir, EXPECTED_FILES)
+    except Exception as e:
+        entry.update(status="failed", error=str(e))
+    entry["seconds"] = round(time.perf_counter() - started, 2)
+    entry["finished_at"] = datetime.utcnow().isoformat()
+    return entry
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera planos de negócio em lote a partir de perfis (CSV/JSONL).")
+    parser.add_argument("input", help="arquivo .csv ou .jsonl com os perfis")
+    parser.add_argument("--out", default=os.path.join("biz_output", "batch"),
+                        help="diretório de saída")
+    parser.add_argument("--workers", type=int, default=4, help="crews executadas ao mesmo tempo")
+    parser.add_argument("--rpm", type=float, default=0, help="limite global de chamadas ao LLM por minuto (0 = sem limite)")
+    parser.add_argument("--mode", choices=["parallel", "sequential"], default=None,
+                        help="execução das tarefas de cada perfil (padrão: BIZ_EXECUTION_MODE)")
+    parser.add_argument("--limit", type=int, default=0, help="processa no máximo N perfis pendentes")
+    args = parser.parse_args(argv)
+
+    out_dir = os.path.abspath(args.out)
+    os.makedirs(out_dir, exist_ok=True)
+
+    from biz_llm import RateLimiter
+
+    manifest = Manifest(out_dir)
+    profiles = load_profiles(args.input)
+    pending = [(pid, p) for pid, p in profiles if not manifest.done(pid)]
+    skipped = len(profiles) - len(pending)
+    if args.limit:
+        pending = pending[:args.limit]
+    print(f"[OK] {len(profiles)} perfis lidos, {skipped} já concluídos, "
+          f"{len(pending)} a processar com {args.workers} workers.")
+
+    limiter = RateLimiter(args.rpm) if args.rpm > 0 else None
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.workers), thread_name_prefix="biz-batch") as pool:
+        futures = [pool.submit(run_one, pid, p, out_dir, args.mode, limiter) for pid, p in pending]
+        for i, future in enumerate(as_completed(futures), 1):
+            entry = future.result()
+            manifest.record(entry)
+            status = "OK" if entry["status"] == "done" else "ERRO"
+            print(f"[{status}] {i}/{len(pending)} {entry['id']} ({entry['nome_empresa']}) em {entry['seconds']:.1f}s"
+                  + (f": {entry.get('error')}" if status == "ERRO" else ""))
+
+    summary, path = write_summary(manifest, out_dir, time.perf_counter() - started)
+    print(f"[OK] Resumo em {path}: {summary['done']} concluídos, {summary['failed']} com erro, "
+          f"p50 {summary['latency']['p50']}s / p95 {summary['latency']['p95']}s")
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+# biz_cache.py
+# Cache persistente de respostas do LLM (SQLite, ao lado de users_biz.db)
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from biz_db import DB_PATH, connection
+
+DEFAULT_TTL = int(os.getenv("BIZ_LLM_CACHE_TTL", str(7 * 24 * 3600)))
+DEFAULT_MAX_ENTRIES = int(os.getenv("BIZ_LLM_CACHE_MAX_ENTRIES", "5000"))
+DEFAULT_MAX_BYTES = int(os.getenv("BIZ_LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+_WS = re.compile(r"\s+")
+
+
+# ==========================================================
+# 🔑 Chave canônica
+# ==========================================================
+def canonical_prompt(messages):
+    """Normaliza mensagens (str ou lista de dicts) em uma forma estável."""
+    if isinstance(messages, str):
+        messages = [{"role": "user", "content": messages}]
+    canon = []
+    for msg in messages:
+        content = msg.get("content", "")
+        if not isinstance(content, str):
+            content = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str)
+        canon.append({"role": msg.get("role", "user"), "content": _WS.sub(" ", content).strip()})
+    return json.dumps(canon, sort_keys=True, ensure_ascii=False)
+
+
+def make_key(model, messages, task_name="", params=None):
+    """
+    `params`: o que mais na rota muda a resposta (endpoint, temperatura...):
+    o mesmo nome de modelo em outro servidor não divide entradas.
+    """
+    payload = json.dumps(
+        {"model": model, "params": params or {}, "task": task_name or "", "prompt": canonical_prompt(messages)},
+        sort_keys=True, ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ==========================================================
+# 💾 Armazenamento com TTL + LRU
+# ==========================================================
+class LLMCache:
+    """
+    Cache de respostas do LLM em uma tabela SQLite.
+    Entradas expiram após `ttl` segundos; acima de `max_entries`/`max_bytes`
+    as menos usadas recentemente (last_access) são removidas.
+    """
+
+    def __init__(self, db_path=DB_PATH, ttl=DEFAULT_TTL,
+                 max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.time()
+        with connection(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key=?", (key,)
+            ).fetchone()
+            if row and now - row[1] <= self.ttl:
+                conn.execute(
+                    "UPDATE llm_cache SET last_access=?, hit_count=hit_count+1 WHERE key=?",
+                    (now, key),
+                )
+            elif row:
+                conn.execute("DELETE FROM llm_cache WHERE key=?", (key,))
+                row = None
+        if row:
+            with self._lock:
+                self.hits += 1
+            return row[0]
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, model, task_name, response):
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with connection(self.db_path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache "
+                "(key, model, task_name, response, size, hit_count, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, 0, ?, ?)",
+                (key, model, task_name, response, size, now, now),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn, now):
+        conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl,))
+        count, total = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+        ).fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        # Remove pelo menos o excedente, dos menos acessados recentemente
+        rows = conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access ASC").fetchall()
+        doomed = []
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            count -= 1
+            total -= size
+        conn.executemany("DELETE FROM llm_cache WHERE key=?", doomed)
+
+    def clear(self):
+        with connection(self.db_path) as conn:
+            conn.execute("DELETE FROM llm_cache")
+
+    def stats(self):
+        with connection(self.db_path) as conn:
+            count, total = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": count,
+            "bytes": total,
+        }
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """Instância compartilhada pelo processo (contadores sobrevivem aos reruns)."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = LLMCache()
+        return _default_cache
@@ -2,11 +2,47 @@
 # Agents and Tasks for AgentAI Biz (CrewAI)
 from crewai import Agent, Task, LLM
 from textwrap import dedent
+from biz_context import DEFAULT_BUDGET, compact_output, profile_brief
+from biz_tools import project_financials, projection_to_markdown
+from biz_report import ReportGuardrail
+from biz_llm import (CachedLLM, ConcurrencyLimitedLLM, LLMMeter, MeteredLLM, RateLimitedLLM, ResilientLLM,
+                     StreamingLLM, route_breaker, route_latencies)
+from biz_routing import cache_params, llm_kwargs, route_for, route_semaphore
 import os
 
 class BizAgents:
-    def __init__(self):
-        self.llm = LLM(model="gpt-4o-mini", api_key=os.getenv("OPENAI_API_KEY"))
+    def __init__(self, use_cache=None, rate_limiter=None, refresh=()):
+        if use_cache is None:
+            use_cache = os.getenv("BIZ_LLM_CACHE", "1") != "0"
+        self.use_cache = use_cache
+        self.rate_limiter = rate_limiter
+        self.refresh = refresh
+        self.stream = os.getenv("BIZ_LLM_STREAM", "1") != "0"
+        # Telemetria por tarefa: só chamadas que chegam de fato ao modelo
+        self.meter = LLMMeter()
+        self._llms = {}
+
+    def llm_for(self, agent_name):
+        """LLM da rota do agente (BIZ_LLM_ROUTES); agentes na mesma rota dividem a instância."""
+        route, spec = route_for(agent_name)
+        if route not in self._llms:
+            llm = LLM(**llm_kwargs(spec, self.stream))
+            llm = MeteredLLM(llm, self.meter)
+            semaphore = route_semaphore(route, spec.get("max_concurrency"))
+            if semaphore is not None:
+                llm = ConcurrencyLimitedLLM(llm, semaphore)
+            if self.rate_limiter is not None:
+                llm = RateLimitedLLM(llm, self.rate_limiter)
+            # Cada tentativa (e a duplicata) passa pelos limites e pelo medidor acima
+            if spec.get("deadline"):
+                llm = ResilientLLM(llm, spec["deadline"], spec.get("max_retries", 0), spec.get("hedge", False),
+                                   route_breaker(route), route_latencies(route))
+            # Perfis repetidos (ex.: os perfis rápidos) são respondidos pelo cache
+            if self.use_cache:
+                llm = CachedLLM(llm, refresh=self.refresh, params=cache_params(spec))
+            # Por fora de tudo: respostas do cache também chegam ao acompanhamento ao vivo
+            self._llms[route] = StreamingLLM(llm)
+        return self._llms[route]
 
     def market_agent(self):
         return Agent(
@@ -18,7 +54,7 @@ class BizAgents:
             backstory=dedent("""
                 Sou um analista de mercado experiente que sintetiza dados e gera insights acionáveis.
             """),
-            llm=self.llm,
+            llm=self.llm_for("market"),
             verbose=True,
             max_iter=6,
             allow_delegation=False
@@ -28,12 +64,13 @@ class BizAgents:
         return Agent(
             role="FinancialModelAgent",
             goal=dedent("""
-                Gerar projeções financeiras simples (receita, custos, margem) e estimativas para 12 meses.
+                Interpretar as projeções financeiras de 12 meses (receita, custos, margem, breakeven)
+                já calculadas e explicar riscos, premissas e recomendações.
             """),
             backstory=dedent("""
                 Sou um analista financeiro que cria modelos práticos para negócios em estágio inicial.
             """),
-            llm=self.llm,
+            llm=self.llm_for("finance"),
             verbose=True,
             max_iter=8,
             allow_delegation=False
@@ -48,7 +85,7 @@ class BizAgents:
             backstory=dedent("""
                 Sou um estrategista de marca que transforma insights de mercado em posicionamento e tom de voz.
             """),
-            llm=self.llm,
+            llm=self.llm_for("brand"),
             verbose=True,
             max_iter=6,
             allow_delegation=False
@@ -63,7 +100,7 @@ class BizAgents:
             backstory=dedent("""
                 Sou um consultor de startups que cria pitch decks claros, concisos e persuasivos.
             """),
-            llm=self.llm,
+            llm=self.llm_for("pitch"),
             verbose=True,
             max_iter=6,
             allow_delegation=False
@@ -71,12 +108,28 @@ class BizAgents:
 
 
 class BizTasks:
-    def market_task(self, agent, profile_data):
-        return Task(
-            description=dedent(f"""
-                Analisar mercado e concorrência para:
-                {profile_data}
-            """),
+    # Nada de output_file: a saída passa pelo ReportGuardrail (biz_report) e os
+    # documentos são montados pelo pipeline a partir da estrutura validada
+    @staticmethod
+    def _bind(task):
+        # As chamadas de correção de seção saem em nome da própria tarefa
+        task.guardrail.__self__.task = task
+        return task
+
+    def market_task(self, agent, profile_data, reference=None):
+        description = dedent("""
+            Analisar mercado e concorrência para:
+        """) + profile_brief(profile_data)
+        if reference:
+            # Análise de um perfil parecido (biz_similarity): ponto de partida, não resposta pronta
+            description += dedent("""
+
+                Análise recente de um perfil semelhante, para usar como ponto de partida
+                (confirme o que vale para este perfil e ajuste o que for diferente):
+            """) + compact_output(reference, DEFAULT_BUDGET)
+        return self._bind(Task(
+            name="market",
+            description=description,
             expected_output=dedent("""
                 Relatório de análise de mercado em markdown:
                 - Sumário do mercado
@@ -84,32 +137,43 @@ class BizTasks:
                 - Tendências e oportunidades
             """),
             agent=agent,
-            output_file="plano_negocios.md"
-        )
+            guardrail=ReportGuardrail("market", agent.llm).check
+        ))
 
     def finance_task(self, context, agent, profile_data):
-        return Task(
-            description=dedent(f"""
-                Gerar projeções financeiras simples com base nos dados:
-                {profile_data}
-            """),
+        # Os números vêm da projeção determinística; o LLM só escreve a narrativa
+        projection = project_financials(
+            profile_data.get("ticket_medio"), profile_data.get("custo_medio_mensal")
+        )
+        tables = projection_to_markdown(projection)
+        return self._bind(Task(
+            name="finance",
+            description=dedent("""
+                Escrever a análise financeira com base nos dados:
+            """) + profile_brief(profile_data) + dedent("""
+
+                As tabelas abaixo já foram calculadas. Use exatamente esses números,
+                não refaça os cálculos e inclua as tabelas no relatório:
+            """) + "\n" + tables,
             expected_output=dedent("""
                 Seção de projeção financeira em markdown:
                 - Receita estimada (12 meses)
                 - Custos estimados e margem
                 - Ponto de equilíbrio (breakeven) aproximado
+                - Leitura dos cenários e recomendações
             """),
             context=context,
             agent=agent,
-            output_file="resumo_executivo.md"
-        )
+            # Tabelas esquecidas pelo agente entram direto, sem nova chamada ao LLM
+            guardrail=ReportGuardrail("finance", agent.llm, tables=tables).check
+        ))
 
     def brand_task(self, context, agent, profile_data):
-        return Task(
-            description=dedent(f"""
+        return self._bind(Task(
+            name="brand",
+            description=dedent("""
                 Criar proposta de valor e estratégia de marca para:
-                {profile_data}
-            """),
+            """) + profile_brief(profile_data),
             expected_output=dedent("""
                 Seção de brand e positioning em markdown:
                 - Proposta de valor
@@ -118,11 +182,12 @@ class BizTasks:
             """),
             context=context,
             agent=agent,
-            output_file="plano_negocios.md"  # pode acrescentar ao plano
-        )
+            guardrail=ReportGuardrail("brand", agent.llm).check
+        ))
 
     def pitch_task(self, context, agent, profile_data):
-        return Task(
+        return self._bind(Task(
+            name="pitch",
             description=dedent(f"""
                 Criar um pitch deck textual (slides) a partir do planejamento e projeções.
             """),
@@ -138,5 +203,5 @@ class BizTasks:
             """),
             context=context,
             agent=agent,
-            output_file="pitch_deck.md"
-        )
+            guardrail=ReportGuardrail("pitch", agent.llm).check
+        ))
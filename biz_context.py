@@ -0,0 +1,157 @@
+# biz_context.py
+# Compactação do contexto entre tarefas encadeadas (resumo estruturado com orçamento de tokens)
+import os
+import re
+from functools import lru_cache
+
+from biz_tools import format_currency, safe_float
+from biz_utils import _RE_FENCE, _RE_HEADING, _RE_LIST_ITEM, _RE_TABLE_SEP, _split_row
+
+COMPACTION_ENABLED = os.getenv("BIZ_CONTEXT_COMPACTION", "1") != "0"
+
+# Tokens de contexto por tarefa consumidora (soma de todas as dependências)
+CONTEXT_BUDGETS = {
+    "brand": int(os.getenv("BIZ_CONTEXT_BUDGET_BRAND", "700")),
+    "pitch": int(os.getenv("BIZ_CONTEXT_BUDGET_PITCH", "1500")),
+}
+DEFAULT_BUDGET = int(os.getenv("BIZ_CONTEXT_BUDGET", "1000"))
+
+PROFILE_LABELS = {
+    "nome_empresa": "Empresa",
+    "segmento": "Segmento",
+    "publico_alvo": "Público-alvo",
+    "modelo_receita": "Modelo de receita",
+    "ticket_medio": "Ticket médio",
+    "custo_medio_mensal": "Custo médio mensal",
+    "meta_12m": "Meta 12 meses",
+}
+
+_RE_FIGURE = re.compile(r"\d")
+_RE_MONEY = re.compile(r"R\$|%|\bmês\b|\bmeses\b|breakeven|payback", re.IGNORECASE)
+_RE_THOUGHT = re.compile(r"^\s*(Thought|Final Answer)\s*:\s*", re.IGNORECASE)
+_RE_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+MAX_FACT_CHARS = 240
+
+
+# ==========================================================
+# 🔢 Contagem de tokens
+# ==========================================================
+@lru_cache(maxsize=1)
+def _encoder():
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text):
+    """Tokens do texto (tiktoken se instalado; senão ~4 caracteres por token)."""
+    if not text:
+        return 0
+    encoder = _encoder()
+    if encoder is not None:
+        return len(encoder.encode(text))
+    return (len(text) + 3) // 4
+
+
+# ==========================================================
+# 🧾 Perfil compacto
+# ==========================================================
+def profile_brief(profile_data):
+    """Perfil em linhas "Campo: valor" (no lugar do repr do dicionário nas descrições)."""
+    lines = []
+    for key, label in PROFILE_LABELS.items():
+        value = profile_data.get(key)
+        if value in (None, ""):
+            continue
+        if key in ("ticket_medio", "custo_medio_mensal"):
+            value = format_currency(safe_float(value))
+        lines.append(f"- {label}: {value}")
+    return "\n".join(lines)
+
+
+# ==========================================================
+# ✂️ Compactação extrativa de uma saída Markdown
+# ==========================================================
+def _facts(text):
+    """Linhas candidatas [(pontuação, ordem, linha)]: títulos, números e tópicos primeiro."""
+    facts, in_code, header = [], False, None
+    for order, raw in enumerate(text.splitlines()):
+        line = _RE_THOUGHT.sub("", raw).rstrip()
+        if _RE_FENCE.match(line):
+            in_code = not in_code
+            continue
+        if in_code or _RE_TABLE_SEP.match(line):
+            continue
+        if not line.strip():
+            header = None  # linha em branco encerra a tabela
+            continue
+
+        heading = _RE_HEADING.match(line)
+        if heading:
+            header = None
+            facts.append((3, order, f"{'#' * min(len(heading.group(1)) + 2, 6)} {heading.group(2)}"))
+            continue
+
+        if line.lstrip().startswith("|"):
+            cells = _split_row(line)
+            if header is None:
+                header = cells
+                continue
+            # Linha de tabela vira "coluna: valor" (legível sem o cabeçalho)
+            pairs = [f"{h}: {c}" if h else c for h, c in zip(header + [""] * len(cells), cells)]
+            facts.append((2, order, "- " + "; ".join(pairs)))
+            continue
+        header = None
+
+        item = _RE_LIST_ITEM.match(line)
+        body = item.group(3) if item else line.strip()
+        if len(body) > MAX_FACT_CHARS:
+            # Parágrafo longo: fica a primeira frase
+            body = _RE_SENTENCE_END.split(body, 1)[0][:MAX_FACT_CHARS].rstrip() + " …"
+        score = 1
+        if _RE_FIGURE.search(body):
+            score += 1
+        if _RE_MONEY.search(body):
+            score += 1
+        if item:
+            score += 0.5
+        facts.append((score, order, f"- {body}"))
+    return facts
+
+
+def compact_output(text, budget_tokens):
+    """
+    Resumo extrativo de `text` dentro de `budget_tokens`: mantém títulos,
+    linhas com números/valores e tópicos (nessa prioridade), na ordem original.
+    """
+    if count_tokens(text) <= budget_tokens:
+        return text.strip()
+    chosen, seen, used = [], set(), 0
+    for score, order, line in sorted(_facts(text), key=lambda f: (-f[0], f[1])):
+        cost = count_tokens(line) + 1
+        if line in seen or used + cost > budget_tokens:
+            continue
+        seen.add(line)
+        chosen.append((order, line))
+        used += cost
+    return "\n".join(line for _, line in sorted(chosen))
+
+
+def compact_context(task_name, upstream, budget=None):
+    """
+    Contexto da tarefa a partir de [(nome, rótulo, saída)] das dependências.
+    Devolve (contexto, {"before": tokens, "after": tokens}).
+    """
+    raw = "\n\n----------\n\n".join(output for _, _, output in upstream)
+    before = count_tokens(raw)
+    budget = budget or CONTEXT_BUDGETS.get(task_name, DEFAULT_BUDGET)
+    # Dentro do orçamento o contexto segue completo (como no CrewAI)
+    if not COMPACTION_ENABLED or not upstream or before <= budget:
+        return raw, {"before": before, "after": before}
+
+    share = budget // len(upstream)
+    parts = [f"### Resumo: {label}\n{compact_output(output, share)}" for _, label, output in upstream]
+    context = "\n\n".join(parts)
+    return context, {"before": before, "after": count_tokens(context)}
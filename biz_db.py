@@ -0,0 +1,236 @@
+# biz_db.py
+# Acesso compartilhado ao SQLite: pool de conexões (WAL) + esquema/migrações uma vez por processo
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+DB_PATH = "users_biz.db"
+BUSY_TIMEOUT_MS = int(os.getenv("BIZ_DB_BUSY_TIMEOUT_MS", "10000"))
+POOL_SIZE = int(os.getenv("BIZ_DB_POOL_SIZE", "8"))
+
+
+# ==========================================================
+# 🧱 Esquema e migrações (PRAGMA user_version)
+# ==========================================================
+def _add_column(conn, table, column, ddl):
+    cols = {r["name"] for r in conn.execute(f"PRAGMA table_info({table})")}
+    if column not in cols:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+
+
+# Cada migração roda uma única vez por banco, em ordem; novas entram no fim da lista.
+# A 1 usa IF NOT EXISTS porque bancos antigos já têm parte das tabelas.
+MIGRATIONS = [
+    (1, """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            salt TEXT NOT NULL,
+            role TEXT NOT NULL DEFAULT 'user',
+            created_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS sessions (
+            token_hash TEXT PRIMARY KEY,
+            username TEXT NOT NULL,
+            role TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            expires_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions(expires_at);
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            key TEXT PRIMARY KEY,
+            model TEXT NOT NULL,
+            task_name TEXT,
+            response TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            hit_count INTEGER NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL,
+            last_access REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache(last_access);
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            username TEXT NOT NULL,
+            status TEXT NOT NULL,
+            profile_json TEXT NOT NULL,
+            progress_json TEXT NOT NULL DEFAULT '{}',
+            current_task TEXT,
+            error TEXT,
+            warnings_json TEXT NOT NULL DEFAULT '[]',
+            created_at TEXT NOT NULL,
+            started_at TEXT,
+            finished_at TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_jobs_user ON jobs(username, created_at);
+        CREATE TABLE IF NOT EXISTS runs (
+            id TEXT PRIMARY KEY,
+            username TEXT NOT NULL,
+            profile_hash TEXT NOT NULL,
+            run_dir TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_runs_user ON runs(username, created_at);
+        CREATE TABLE IF NOT EXISTS artifacts (
+            run_id TEXT NOT NULL,
+            name TEXT NOT NULL,
+            path TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (run_id, name)
+        );
+    """),
+    (2, lambda conn: _add_column(conn, "jobs", "timings_json", "TEXT NOT NULL DEFAULT '{}'")),
+    (3, """
+        CREATE TABLE IF NOT EXISTS metrics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id TEXT NOT NULL,
+            username TEXT,
+            kind TEXT NOT NULL,
+            name TEXT NOT NULL,
+            seconds REAL NOT NULL,
+            llm_calls INTEGER NOT NULL DEFAULT 0,
+            prompt_tokens INTEGER NOT NULL DEFAULT 0,
+            completion_tokens INTEGER NOT NULL DEFAULT 0,
+            retries INTEGER NOT NULL DEFAULT 0,
+            cost_usd REAL NOT NULL DEFAULT 0,
+            status TEXT,
+            created_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_metrics_kind ON metrics(kind, name, created_at);
+    """),
+    (4, """
+        CREATE TABLE IF NOT EXISTS market_index (
+            output_path TEXT PRIMARY KEY,
+            username TEXT,
+            nome_empresa TEXT,
+            profile_text TEXT NOT NULL,
+            vector BLOB NOT NULL,
+            created_at TEXT NOT NULL
+        );
+    """),
+    (5, """
+        CREATE TABLE IF NOT EXISTS plans (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id TEXT UNIQUE NOT NULL,
+            username TEXT NOT NULL,
+            nome_empresa TEXT,
+            segmento TEXT,
+            profile_json TEXT NOT NULL,
+            documents BLOB NOT NULL,
+            raw_size INTEGER NOT NULL,
+            created_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_plans_user ON plans(username, id);
+        CREATE VIRTUAL TABLE IF NOT EXISTS plans_fts USING fts5(
+            owner, nome_empresa, perfil, body,
+            content='', tokenize='unicode61 remove_diacritics 2'
+        );
+    """),
+    # Números do perfil da análise indexada: reaproveitar o texto inteiro exige os mesmos
+    (6, lambda conn: _add_column(conn, "market_index", "numbers", "TEXT NOT NULL DEFAULT ''")),
+]
+
+
+def migrate(conn):
+    """Aplica as migrações pendentes; devolve a versão final do esquema."""
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= MIGRATIONS[-1][0]:
+        return MIGRATIONS[-1][0]
+    # BEGIN IMMEDIATE: app e CLI em lote podem subir juntos; só um migra
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for target, step in MIGRATIONS:
+            if target <= version:
+                continue
+            if callable(step):
+                step(conn)
+            else:
+                for statement in step.split(";"):
+                    if statement.strip():
+                        conn.execute(statement)
+            version = target
+        conn.execute(f"PRAGMA user_version = {int(version)}")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return version
+
+
+# ==========================================================
+# 🔌 Pool de conexões
+# ==========================================================
+def _open(db_path):
+    conn = sqlite3.connect(db_path, check_same_thread=False, timeout=BUSY_TIMEOUT_MS / 1000,
+                           cached_statements=256)
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA journal_mode = WAL")  # leitores não bloqueiam o job que escreve
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
+
+class ConnectionPool:
+    """
+    Conexões reaproveitadas entre reruns e threads. Cada conexão guarda seus
+    statements preparados (cached_statements), então as consultas repetidas
+    com o mesmo SQL não são recompiladas.
+    """
+
+    def __init__(self, db_path=DB_PATH, size=POOL_SIZE):
+        self.db_path = db_path
+        self._idle = queue.LifoQueue(maxsize=size)
+        conn = _open(db_path)
+        try:
+            self.schema_version = migrate(conn)
+        finally:
+            self.release(conn)
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return _open(self.db_path)
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path=DB_PATH):
+    """Pool único por arquivo e por processo; o esquema é migrado na criação."""
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(db_path)
+        return pool
+
+
+@contextmanager
+def connection(db_path=DB_PATH):
+    """Conexão do pool; faz commit ao sair sem erro e rollback em caso de exceção."""
+    pool = get_pool(db_path)
+    conn = pool.acquire()
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        pool.release(conn)
@@ -0,0 +1,141 @@
+# biz_files.py
+# Cache de conteúdo de arquivos (relatórios .md/.json, style.css) compartilhado entre sessões
+import os
+import threading
+from collections import OrderedDict
+
+from biz_utils import _RE_FENCE, _RE_HEADING
+
+MAX_BYTES = int(os.getenv("BIZ_FILE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+PAGE_CHARS = int(os.getenv("BIZ_REPORT_PAGE_CHARS", "12000"))
+
+
+# ==========================================================
+# ✂️ Seções e páginas de um relatório
+# ==========================================================
+def split_sections(text, max_level=2):
+    """
+    Divide o Markdown em [(título, texto)] nos títulos de nível <= `max_level`
+    (fora de blocos de código). O que vem antes do primeiro título é "Introdução".
+    """
+    sections, title, lines = [], "Introdução", []
+    in_code = False
+    for line in text.splitlines(keepends=True):
+        if _RE_FENCE.match(line):
+            in_code = not in_code
+        elif not in_code:
+            m = _RE_HEADING.match(line.rstrip("\n"))
+            if m and len(m.group(1)) <= max_level:
+                if "".join(lines).strip():
+                    sections.append((title, "".join(lines)))
+                title, lines = m.group(2).strip() or title, []
+        lines.append(line)
+    if "".join(lines).strip():
+        sections.append((title, "".join(lines)))
+    return sections
+
+
+def paginate(sections, max_chars=PAGE_CHARS):
+    """Agrupa seções consecutivas em páginas de até ~`max_chars` (uma seção nunca é cortada)."""
+    pages, titles, parts, size = [], [], [], 0
+    for title, body in sections:
+        if parts and size + len(body) > max_chars:
+            pages.append((titles[0] if len(titles) == 1 else f"{titles[0]} … {titles[-1]}", "".join(parts)))
+            titles, parts, size = [], [], 0
+        titles.append(title)
+        parts.append(body)
+        size += len(body)
+    if parts:
+        pages.append((titles[0] if len(titles) == 1 else f"{titles[0]} … {titles[-1]}", "".join(parts)))
+    return pages
+
+
+# ==========================================================
+# 💾 Cache por (caminho, mtime, tamanho) com LRU em bytes
+# ==========================================================
+class FileCache:
+    """
+    Guarda o conteúdo lido (e derivados, como as páginas) por arquivo. A
+    entrada vale enquanto mtime e tamanho do arquivo não mudarem; acima de
+    `max_bytes` saem as menos usadas recentemente.
+    """
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # (tipo, caminho) -> (carimbo, valor, bytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, path, kind="text", build=None):
+        """
+        Valor em cache para `path`; na falta, lê o texto e aplica `build(texto)`.
+        Devolve None se o arquivo não existir.
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = (kind, os.path.abspath(path))
+        stamp = (st.st_mtime_ns, st.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == stamp:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        value = build(text) if build else text
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old:
+                self._bytes -= old[2]
+            if st.st_size <= self.max_bytes:
+                self._entries[key] = (stamp, value, st.st_size)
+                self._bytes += st.st_size
+                while self._bytes > self.max_bytes:
+                    _, (_, _, size) = self._entries.popitem(last=False)
+                    self._bytes -= size
+        return value
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "entries": len(self._entries), "bytes": self._bytes}
+
+
+_file_cache = FileCache()
+
+
+def get_file_cache():
+    """Instância do processo: todas as sessões do Streamlit compartilham o mesmo cache."""
+    return _file_cache
+
+
+def read_text(path, default=""):
+    text = _file_cache.get(path)
+    return default if text is None else text
+
+
+def read_pages(path, max_chars=PAGE_CHARS):
+    """Páginas [(título, texto)] do relatório, já divididas e memorizadas."""
+    return _file_cache.get(path, kind=f"pages:{max_chars}",
+                           build=lambda text: paginate(split_sections(text), max_chars)) or []
+
+
+def _report_pages(text, max_chars):
+    from biz_report import Document, paginate_sections
+
+    return paginate_sections(Document.model_validate_json(text).sections, max_chars)
+
+
+def read_report_pages(path, max_chars=PAGE_CHARS):
+    """Páginas [(título, [Section])] da estrutura validada (.json) de um documento."""
+    return _file_cache.get(path, kind=f"report:{max_chars}",
+                           build=lambda text: _report_pages(text, max_chars)) or []
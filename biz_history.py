@@ -0,0 +1,176 @@
+# biz_history.py
+# Histórico de planos: Markdown comprimido no SQLite + busca de texto completo (FTS5)
+import hashlib
+import json
+import os
+import re
+import zlib
+from datetime import datetime
+
+from biz_db import DB_PATH, connection
+
+COMPRESSION_LEVEL = 9
+SNIPPET_CHARS = 160
+
+_RE_QUERY_TOKEN = re.compile(r"(\w+)(\*?)")
+_RE_MD_NOISE = re.compile(r"[#*_`|>\-]+")
+
+
+def _owner_token(username):
+    # Um único token por usuário (nomes com ponto/hífen viram vários tokens no FTS)
+    return "u" + hashlib.sha1(username.encode("utf-8")).hexdigest()[:16]
+
+
+def _pack(documents):
+    raw = json.dumps(documents, ensure_ascii=False).encode("utf-8")
+    return zlib.compress(raw, COMPRESSION_LEVEL), len(raw)
+
+
+def _unpack(blob):
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+def _fts_values(username, profile_data, documents):
+    return (
+        _owner_token(username),
+        profile_data.get("nome_empresa", ""),
+        " ".join(str(profile_data.get(k, "")) for k in ("segmento", "publico_alvo", "modelo_receita")),
+        "\n".join(documents.values()),
+    )
+
+
+def fts_query(text):
+    """
+    Consulta do usuário -> expressão FTS5 segura: cada palavra entre aspas, em
+    AND. Prefixo só quando pedido ("franq*"): termos com prefixo não usam o
+    índice de saltos do FTS5 e ficam ~40x mais lentos com 100 mil planos.
+    """
+    return " ".join(f'"{word}"{star}' for word, star in _RE_QUERY_TOKEN.findall(text))
+
+
+# ==========================================================
+# 💾 Gravação
+# ==========================================================
+def archive_plan(run_id, username, profile_data, documents, db_path=DB_PATH):
+    """
+    Guarda (ou substitui, na regeneração) os Markdown {arquivo: texto} da
+    execução, comprimidos, e atualiza o índice FTS. Devolve o id do plano.
+    """
+    blob, raw_size = _pack(documents)
+    now = datetime.utcnow().isoformat()
+    with connection(db_path) as conn:
+        old = conn.execute(
+            "SELECT id, username, profile_json, documents FROM plans WHERE run_id=?", (run_id,)
+        ).fetchone()
+        if old:
+            # Tabela FTS sem conteúdo: a remoção precisa dos valores indexados antes
+            conn.execute(
+                "INSERT INTO plans_fts (plans_fts, rowid, owner, nome_empresa, perfil, body) "
+                "VALUES ('delete', ?, ?, ?, ?, ?)",
+                (old["id"], *_fts_values(old["username"], json.loads(old["profile_json"]),
+                                         _unpack(old["documents"]))),
+            )
+            conn.execute("DELETE FROM plans WHERE id=?", (old["id"],))
+        # Sempre um id novo: a ordem por rowid do FTS é a ordem do mais recente
+        plan_id = conn.execute(
+            "INSERT INTO plans (run_id, username, nome_empresa, segmento, profile_json, documents, raw_size, "
+            "created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (run_id, username, profile_data.get("nome_empresa", ""), profile_data.get("segmento", ""),
+             json.dumps(profile_data, ensure_ascii=False), blob, raw_size, now),
+        ).lastrowid
+        conn.execute(
+            "INSERT INTO plans_fts (rowid, owner, nome_empresa, perfil, body) VALUES (?, ?, ?, ?, ?)",
+            (plan_id, *_fts_values(username, profile_data, documents)),
+        )
+    return plan_id
+
+
+def archive_run_dir(run_id, username, profile_data, run_dir, file_names, db_path=DB_PATH):
+    """Lê os Markdown gerados em `run_dir` e arquiva; None se nenhum existir."""
+    documents = {}
+    for name in file_names:
+        path = os.path.join(run_dir, name)
+        if os.path.isfile(path):
+            with open(path, "r", encoding="utf-8") as f:
+                documents[name] = f.read()
+    if not documents:
+        return None
+    return archive_plan(run_id, username, profile_data, documents, db_path)
+
+
+# ==========================================================
+# 🔎 Consulta
+# ==========================================================
+def _snippet(text, tokens):
+    """Trecho ao redor da primeira ocorrência de um termo (o FTS sem conteúdo não gera snippet)."""
+    lowered = text.lower()
+    hits = [h for h in (lowered.find(t.lower()) for t in tokens) if h >= 0]
+    first = min(hits) if hits else 0
+    # Limpa só uma janela ao redor do termo, não o documento inteiro
+    start = max(first - SNIPPET_CHARS, 0)
+    before = " ".join(_RE_MD_NOISE.sub(" ", text[start:first]).split())
+    after = " ".join(_RE_MD_NOISE.sub(" ", text[first:first + SNIPPET_CHARS * 2]).split())
+    cut = start > 0 or len(before) > SNIPPET_CHARS // 3
+    snippet = (before[-(SNIPPET_CHARS // 3):] + " " + after).strip()[:SNIPPET_CHARS]
+    return ("…" if cut else "") + snippet + ("…" if first + SNIPPET_CHARS < len(text) else "")
+
+
+def search_plans(username, text, limit=20, db_path=DB_PATH):
+    """
+    Planos do usuário que contêm todas as palavras de `text`, do mais recente
+    ao mais antigo. Ordenar por rowid deixa o FTS5 parar nos primeiros `limit`
+    acertos; bm25 precisaria percorrer a lista inteira de cada termo.
+    """
+    query = fts_query(text or "")
+    with connection(db_path) as conn:
+        if not query:
+            rows = conn.execute(
+                "SELECT id, run_id, nome_empresa, segmento, created_at, raw_size, length(documents) AS size, "
+                "documents FROM plans WHERE username=? ORDER BY id DESC LIMIT ?",
+                (username, limit),
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                "SELECT p.id, p.run_id, p.nome_empresa, p.segmento, p.created_at, p.raw_size, "
+                "length(p.documents) AS size, p.documents "
+                "FROM plans_fts JOIN plans p ON p.id = plans_fts.rowid "
+                "WHERE plans_fts MATCH ? AND p.username=? ORDER BY plans_fts.rowid DESC LIMIT ?",
+                (f"owner:{_owner_token(username)} AND ({query})", username, limit),
+            ).fetchall()
+
+    tokens = [word for word, _ in _RE_QUERY_TOKEN.findall(text or "")]
+    results = []
+    for r in rows:
+        item = {k: r[k] for k in ("id", "run_id", "nome_empresa", "segmento", "created_at", "raw_size", "size")}
+        item["snippet"] = _snippet("\n".join(_unpack(r["documents"]).values()), tokens)
+        results.append(item)
+    return results
+
+
+def get_plan(plan_id, username, db_path=DB_PATH):
+    """Plano completo {id, run_id, profile, documents, created_at} do próprio usuário; senão None."""
+    with connection(db_path) as conn:
+        row = conn.execute(
+            "SELECT id, run_id, profile_json, documents, created_at FROM plans WHERE id=? AND username=?",
+            (plan_id, username),
+        ).fetchone()
+    if not row:
+        return None
+    return {
+        "id": row["id"],
+        "run_id": row["run_id"],
+        "profile": json.loads(row["profile_json"]),
+        "documents": _unpack(row["documents"]),
+        "created_at": row["created_at"],
+    }
+
+
+def history_stats(username=None, db_path=DB_PATH):
+    """Quantidade de planos e bytes (texto original x comprimido)."""
+    where, args = ("WHERE username=?", (username,)) if username else ("", ())
+    with connection(db_path) as conn:
+        row = conn.execute(
+            f"SELECT count(*) AS plans, coalesce(sum(raw_size), 0) AS raw, "
+            f"coalesce(sum(length(documents)), 0) AS stored FROM plans {where}", args
+        ).fetchone()
+    return dict(row)
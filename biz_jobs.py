@@ -0,0 +1,265 @@
+# biz_jobs.py
+# Execução em segundo plano das Crews (fila persistida em SQLite)
+import json
+import os
+import threading
+import time
+import traceback
+import uuid
+from datetime import datetime
+
+from biz_artifacts import ArtifactIndex
+from biz_db import DB_PATH, connection
+from biz_scheduler import MAX_RUNNING, PRIORITY_ADMIN, FairScheduler, priority_for
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+JOB_STATES = (QUEUED, RUNNING, DONE, FAILED)
+
+
+def _now():
+    return datetime.utcnow().isoformat()
+
+
+class JobRunner:
+    """
+    Fila de jobs de geração: cada job é uma linha na tabela `jobs` e roda
+    fora do script do Streamlit, admitido pelo FairScheduler (limite global de
+    crews simultâneas, fila justa por usuário, admins primeiro). O progresso por tarefa
+    fica em `progress` (JSON), então qualquer sessão pode acompanhar o job.
+    O texto parcial dos agentes fica só em memória (`stream`) enquanto o job roda.
+    """
+
+    def __init__(self, output_dir, db_path=DB_PATH, max_workers=MAX_RUNNING):
+        self.db_path = db_path
+        self.artifacts = ArtifactIndex(output_dir, db_path)
+        self.scheduler = FairScheduler(max_running=max_workers)
+        self._lock = threading.Lock()
+        self._streams = {}  # job_id -> {tarefa: [trechos]}
+        self._streams_lock = threading.Lock()
+        self._recover()
+
+    # ------------------------------------------------------
+    # Persistência
+    # ------------------------------------------------------
+    def _update(self, job_id, **fields):
+        cols = ", ".join(f"{k}=?" for k in fields)
+        with self._lock, connection(self.db_path) as conn:
+            conn.execute(f"UPDATE jobs SET {cols} WHERE id=?", (*fields.values(), job_id))
+
+    def _recover(self):
+        """Jobs interrompidos por reinício do servidor: falham os que rodavam, os da fila voltam."""
+        with connection(self.db_path) as conn:
+            conn.execute(
+                "UPDATE jobs SET status=?, error=?, finished_at=? WHERE status=?",
+                (FAILED, "Interrompido pelo reinício do servidor.", _now(), RUNNING),
+            )
+            queued = conn.execute("SELECT id, username FROM jobs WHERE status=? ORDER BY created_at",
+                                  (QUEUED,)).fetchall()
+        for row in queued:
+            self._enqueue(row["id"], row["username"])
+
+    def _enqueue(self, job_id, username):
+        # Prioridade pelo papel atual do usuário (coluna `role` da tabela users)
+        with connection(self.db_path) as conn:
+            row = conn.execute("SELECT role FROM users WHERE username=?", (username,)).fetchone()
+        priority = priority_for(row["role"] if row else None)
+        self.scheduler.submit(job_id, username, priority,
+                              lambda wait: self._run(job_id, wait, priority == PRIORITY_ADMIN))
+
+    # ------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------
+    def submit(self, username, profile_data):
+        from biz_pipeline import TASK_ORDER
+
+        job_id = uuid.uuid4().hex
+        progress = {name: {"status": QUEUED} for name in TASK_ORDER}
+        with connection(self.db_path) as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, username, status, profile_json, progress_json, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, username, QUEUED, json.dumps(profile_data, ensure_ascii=False),
+                 json.dumps(progress), _now()),
+            )
+        # O id do job também identifica a execução e seu diretório
+        self.artifacts.create_run(job_id, username, profile_data)
+        self._enqueue(job_id, username)
+        return job_id
+
+    def get(self, job_id):
+        with connection(self.db_path) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id=?", (job_id,)).fetchone()
+        if not row:
+            return None
+        job = dict(row)
+        job["profile"] = json.loads(job.pop("profile_json"))
+        job["progress"] = json.loads(job.pop("progress_json"))
+        job["warnings"] = json.loads(job.pop("warnings_json"))
+        job["timings"] = json.loads(job.pop("timings_json"))
+        return job
+
+    def queue_position(self, job_id):
+        """(posição, tamanho da fila, espera estimada em s ou None) de um job na fila; None se não está."""
+        return self.scheduler.position(job_id)
+
+    def queue_metrics(self):
+        return self.scheduler.snapshot()
+
+    def stream(self, job_id):
+        """{tarefa: texto gerado até agora} de um job em andamento."""
+        with self._streams_lock:
+            chunks = self._streams.get(job_id, {})
+            return {name: "".join(parts) for name, parts in chunks.items()}
+
+    def regenerate(self, job_id, task_name):
+        """
+        Refaz `task_name` e as tarefas que dependem dela no mesmo job (mesmo
+        diretório); as demais saídas são reaproveitadas. False se o job ainda roda.
+        """
+        from biz_pipeline import downstream
+
+        job = self.get(job_id)
+        if not job:
+            return False
+        progress = job["progress"]
+        for name in downstream([task_name]):
+            progress[name] = {"status": QUEUED, "regenerate": True}
+        return self._requeue(job_id, progress, (DONE, FAILED))
+
+    def resume(self, job_id):
+        """
+        Retoma um job que falhou a partir da tarefa que falhou: as concluídas
+        (gravadas em tasks/ do diretório da execução) não são refeitas.
+        """
+        job = self.get(job_id)
+        if not job:
+            return False
+        return self._requeue(job_id, job["progress"], (FAILED,))
+
+    def _requeue(self, job_id, progress, from_states):
+        marks = ", ".join("?" for _ in from_states)
+        username = self.get(job_id)["username"]
+        with self._lock, connection(self.db_path) as conn:
+            # Só um pedido vence se dois cliques chegarem juntos
+            claimed = conn.execute(
+                "UPDATE jobs SET status=?, progress_json=?, error=NULL, finished_at=NULL "
+                f"WHERE id=? AND status IN ({marks})",
+                (QUEUED, json.dumps(progress), job_id, *from_states),
+            ).rowcount
+        if claimed:
+            self._enqueue(job_id, username)
+        return bool(claimed)
+
+    def list_jobs(self, username, limit=10):
+        with connection(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT id FROM jobs WHERE username=? ORDER BY created_at DESC LIMIT ?",
+                (username, limit),
+            ).fetchall()
+        return [self.get(r["id"]) for r in rows]
+
+    # ------------------------------------------------------
+    # Execução
+    # ------------------------------------------------------
+    def _run(self, job_id, queue_wait=0.0, admin=False):
+        from biz_history import archive_run_dir
+        from biz_pipeline import EXPECTED_FILES, TASK_ORDER, run_pipeline
+        from biz_telemetry import record_run
+
+        job = self.get(job_id)
+        if not job or job["status"] != QUEUED:
+            return
+        progress = job["progress"]
+        queue = {"wait": round(queue_wait, 2), "priority": "admin" if admin else "user"}
+        lock = threading.Lock()  # tarefas paralelas atualizam o progresso ao mesmo tempo
+        started = time.perf_counter()
+        stream = {name: [] for name in TASK_ORDER}
+        # Tarefas já concluídas (regeneração parcial ou retomada após falha) ficam como estão
+        pending = [name for name in TASK_ORDER if progress[name]["status"] != DONE]
+        refresh = [name for name in pending if progress[name].get("regenerate")]
+        for name in pending:
+            # Retomada: estado e tempos da tentativa anterior não valem para esta
+            for key in ("ttfb", "seconds", "done_at"):
+                progress[name].pop(key, None)
+            progress[name]["status"] = QUEUED
+
+        def save_progress():
+            running = [n for n in TASK_ORDER if progress[n]["status"] == RUNNING]
+            self._update(job_id, progress_json=json.dumps(progress),
+                         current_task=",".join(running) or None)
+
+        def on_task_start(name):
+            with lock:
+                progress[name]["status"] = RUNNING
+                save_progress()
+
+        def on_chunk(name, chunk):
+            if name not in stream:
+                return
+            with self._streams_lock:
+                stream[name].append(chunk)
+            # Só o primeiro trecho de cada tarefa vai para o banco (tempo até o primeiro byte)
+            if "ttfb" not in progress[name]:
+                with lock:
+                    progress[name]["ttfb"] = round(time.perf_counter() - started, 2)
+                    save_progress()
+
+        def on_task_done(name, output, seconds):
+            # O resultado final substitui o rascunho (pensamentos do agente inclusos)
+            with self._streams_lock:
+                stream[name] = [output.raw]
+            with lock:
+                progress[name].update(status=DONE, seconds=round(seconds, 2),
+                                      done_at=round(time.perf_counter() - started, 2))
+                save_progress()
+
+        self._update(job_id, status=RUNNING, started_at=_now())
+        run_dir = self.artifacts.run_dir(job_id)
+        with self._streams_lock:
+            self._streams[job_id] = stream
+        try:
+            warnings, timings = run_pipeline(job["profile"], run_dir, on_task_start=on_task_start,
+                                             on_task_done=on_task_done, on_chunk=on_chunk,
+                                             only=pending if len(pending) < len(TASK_ORDER) else None,
+                                             username=job["username"], refresh=refresh)
+            ttfb = [progress[n]["ttfb"] for n in pending if "ttfb" in progress[n]]
+            timings["ttfb"] = min(ttfb) if ttfb else None
+            timings["done_at"] = {n: progress[n]["done_at"] for n in pending if "done_at" in progress[n]}
+            timings["queue"] = queue
+            for name in sorted(os.listdir(run_dir)):
+                if name.endswith((".md", ".json", ".pdf")):
+                    self.artifacts.register(job_id, os.path.join(run_dir, name))
+            self._update(job_id, status=DONE, finished_at=_now(),
+                         warnings_json=json.dumps(warnings, ensure_ascii=False),
+                         timings_json=json.dumps(timings))
+            record_run(job_id, job["username"], timings, db_path=self.db_path)
+            # O histórico sobrevive ao "Limpar" (que apaga só os arquivos)
+            archive_run_dir(job_id, job["username"], job["profile"], run_dir, EXPECTED_FILES,
+                            db_path=self.db_path)
+        except Exception as e:
+            traceback.print_exc()
+            with lock:
+                # As concluídas já estão gravadas: "Retomar" começa pelas que falharam
+                for name in TASK_ORDER:
+                    if progress[name]["status"] == RUNNING:
+                        progress[name]["status"] = FAILED
+            self._update(job_id, status=FAILED, error=str(e), finished_at=_now(),
+                         progress_json=json.dumps(progress), current_task=None)
+            record_run(job_id, job["username"], {"wall": round(time.perf_counter() - started, 2),
+                                                 "queue": queue}, status=FAILED, db_path=self.db_path)
+        finally:
+            with self._streams_lock:
+                self._streams.pop(job_id, None)
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_job_runner(output_dir):
+    """Pool único por processo, compartilhado por todas as sessões do Streamlit."""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner(output_dir)
+        return _runner
@@ -0,0 +1,550 @@
+# biz_llm.py
+# Camadas em volta do LLM usado pelos agentes (CrewAI)
+import contextvars
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from crewai.events import crewai_event_bus
+from crewai.events.types.llm_events import LLMStreamChunkEvent
+from crewai.llms.base_llm import BaseLLM
+
+from biz_cache import get_llm_cache, make_key
+from biz_context import count_tokens
+
+logger = logging.getLogger(__name__)
+
+
+def task_name_of(from_task, from_agent=None):
+    """Nome estável da tarefa/agente que originou a chamada."""
+    if from_task is not None:
+        return getattr(from_task, "name", None) or getattr(from_task, "description", "")[:80]
+    if from_agent is not None:
+        return getattr(from_agent, "role", "")
+    return ""
+
+
+class DelegatingLLM(BaseLLM):
+    """Repassa tudo ao LLM interno; subclasses interceptam `call`."""
+
+    def __init__(self, inner):
+        super().__init__(
+            model=inner.model,
+            temperature=inner.temperature,
+            api_key=inner.api_key,
+            base_url=inner.base_url,
+            provider=inner.provider,
+        )
+        self.inner = inner
+        self.stop = list(inner.stop)
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        # O executor do agente grava as stop words no wrapper
+        self.inner.stop = self.stop
+        return self.inner.call(
+            messages,
+            tools=tools,
+            callbacks=callbacks,
+            available_functions=available_functions,
+            from_task=from_task,
+            from_agent=from_agent,
+            response_model=response_model,
+        )
+
+    def supports_stop_words(self):
+        return self.inner.supports_stop_words()
+
+    def supports_function_calling(self):
+        return getattr(self.inner, "supports_function_calling", lambda: False)()
+
+    def get_context_window_size(self):
+        return self.inner.get_context_window_size()
+
+    def get_token_usage_summary(self):
+        return self.inner.get_token_usage_summary()
+
+
+class CachedLLM(DelegatingLLM):
+    """
+    Consulta o cache persistente antes de chamar o modelo.
+    Chave: modelo + parâmetros da rota (`params`, ver biz_routing.cache_params)
+    + prompt canônico + nome da tarefa. Tarefas em `refresh` (regeneração
+    pedida pelo usuário) ignoram a resposta guardada e a substituem.
+    """
+
+    def __init__(self, inner, cache=None, refresh=(), params=None):
+        super().__init__(inner)
+        self.cache = cache or get_llm_cache()
+        self.refresh = frozenset(refresh)
+        self.params = params or {}
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        # Chamadas com ferramentas ou saída estruturada não são cacheadas
+        if tools or available_functions or response_model:
+            return super().call(messages, tools, callbacks, available_functions,
+                                from_task, from_agent, response_model)
+
+        task_name = task_name_of(from_task, from_agent)
+        key = make_key(self.model, messages, task_name, self.params)
+        cached = None if task_name in self.refresh else self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        response = super().call(messages, tools, callbacks, available_functions,
+                                from_task, from_agent, response_model)
+        if isinstance(response, str) and response:
+            self.cache.set(key, self.model, task_name, response)
+        return response
+
+
+class LLMMeter:
+    """
+    Contadores por tarefa de uma execução: chamadas, falhas, tokens e tempo no
+    modelo. Um medidor por BizAgents, compartilhado pelas rotas (o modelo vai por tarefa).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tasks = {}
+
+    def record(self, task_name, model, prompt_tokens, completion_tokens, seconds, failed=False):
+        with self._lock:
+            m = self._tasks.setdefault(task_name, {
+                "calls": 0, "retries": 0, "prompt_tokens": 0, "completion_tokens": 0, "seconds": 0.0,
+                "model": model,
+            })
+            m["calls"] += 1
+            m["retries"] += int(failed)
+            m["prompt_tokens"] += prompt_tokens
+            m["completion_tokens"] += completion_tokens
+            m["seconds"] += seconds
+
+    def snapshot(self):
+        with self._lock:
+            return {name: {**m, "seconds": round(m["seconds"], 3)} for name, m in self._tasks.items()}
+
+
+def _prompt_tokens(messages):
+    if isinstance(messages, str):
+        return count_tokens(messages)
+    return sum(count_tokens(m.get("content") if isinstance(m.get("content"), str) else str(m.get("content", "")))
+               for m in messages)
+
+
+class MeteredLLM(DelegatingLLM):
+    """
+    Mede cada chamada real ao modelo (fica por dentro do cache e do limite de
+    RPM). Tokens são contados localmente porque o streaming não traz `usage`.
+    Chamadas que falham contam como tentativas refeitas pelo agente.
+    """
+
+    def __init__(self, inner, meter):
+        super().__init__(inner)
+        self.meter = meter
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        task_name = task_name_of(from_task, from_agent)
+        prompt_tokens = _prompt_tokens(messages)
+        started = time.perf_counter()
+        try:
+            response = super().call(messages, tools, callbacks, available_functions,
+                                    from_task, from_agent, response_model)
+        except Exception:
+            self.meter.record(task_name, self.model, prompt_tokens, 0, time.perf_counter() - started,
+                              failed=True)
+            raise
+        completion_tokens = count_tokens(response) if isinstance(response, str) else 0
+        self.meter.record(task_name, self.model, prompt_tokens, completion_tokens,
+                          time.perf_counter() - started)
+        return response
+
+
+class RateLimiter:
+    """Limite de requisições por minuto (token bucket), compartilhado entre threads."""
+
+    def __init__(self, rpm):
+        self.rate = rpm / 60.0
+        self.capacity = max(1.0, float(rpm) / 10)  # permite rajadas curtas
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class RateLimitedLLM(DelegatingLLM):
+    """Aguarda o RateLimiter antes de cada chamada real ao modelo."""
+
+    def __init__(self, inner, limiter):
+        super().__init__(inner)
+        self.limiter = limiter
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        self.limiter.acquire()
+        return super().call(messages, tools, callbacks, available_functions,
+                            from_task, from_agent, response_model)
+
+
+class _Slot:
+    """Vaga tomada de um semáforo; devolvida uma única vez, por qualquer thread."""
+
+    def __init__(self, semaphore):
+        self.semaphore = semaphore
+        self._lock = threading.Lock()
+        self._held = True
+
+    def release(self):
+        with self._lock:
+            if not self._held:
+                return
+            self._held = False
+        self.semaphore.release()
+
+
+class _AttemptSlots:
+    """
+    Vagas tomadas por uma tentativa do ResilientLLM. Quando a tentativa é
+    abandonada (prazo estourado ou duplicata vencedora), as vagas voltam à
+    rota na hora, em vez de esperar a requisição abandonada terminar.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._slots = []
+        self.abandoned = False
+
+    def hold(self, slot):
+        """Registra a vaga; False (e a devolve) se a tentativa já foi abandonada."""
+        with self._lock:
+            if not self.abandoned:
+                self._slots.append(slot)
+                return True
+        slot.release()
+        return False
+
+    def abandon(self):
+        with self._lock:
+            self.abandoned = True
+            slots, self._slots = self._slots, []
+        for slot in slots:
+            slot.release()
+
+
+# Tentativa do ResilientLLM em curso na thread (None fora dele)
+_attempt_local = threading.local()
+
+
+class ConcurrencyLimitedLLM(DelegatingLLM):
+    """No máximo N chamadas simultâneas na rota (ex.: um modelo local com poucas vagas de GPU)."""
+
+    def __init__(self, inner, semaphore):
+        super().__init__(inner)
+        self.semaphore = semaphore
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        self.semaphore.acquire()
+        slot = _Slot(self.semaphore)
+        attempt = getattr(_attempt_local, "attempt", None)
+        if attempt is not None and not attempt.hold(slot):
+            raise LLMDeadlineError("Tentativa abandonada antes de conseguir vaga na rota.")
+        try:
+            return super().call(messages, tools, callbacks, available_functions,
+                                from_task, from_agent, response_model)
+        finally:
+            slot.release()
+
+
+# ==========================================================
+# 🛡️ Resiliência: prazo por chamada, novas tentativas, duplicata e disjuntor
+# ==========================================================
+BACKOFF_BASE = 1.0   # segundos antes da 2ª tentativa (dobra a cada uma, com jitter)
+BACKOFF_CAP = 20.0
+HEDGE_MIN_SECONDS = 2.0  # nunca duplica chamadas mais curtas que isso
+BREAKER_FAILURES = int(os.getenv("BIZ_LLM_BREAKER_FAILURES", "5"))
+BREAKER_COOLDOWN = float(os.getenv("BIZ_LLM_BREAKER_COOLDOWN", "30"))
+
+
+class LLMDeadlineError(TimeoutError):
+    """A chamada passou do prazo da rota (a requisição abandonada termina sozinha)."""
+
+
+class CircuitOpenError(RuntimeError):
+    """A rota falhou seguidas vezes; chamadas são recusadas até o fim da pausa."""
+
+
+def is_retryable(error):
+    """Falhas passageiras (rede, prazo, 408/409/429/5xx) valem nova tentativa; as demais não."""
+    from openai import APIConnectionError
+
+    if isinstance(error, (ConnectionError, TimeoutError, APIConnectionError)):
+        return True
+    status = getattr(error, "status_code", None)
+    return status in (408, 409, 429) or (status is not None and status >= 500)
+
+
+class CircuitBreaker:
+    """
+    Disjuntor por rota: após `failures` falhas passageiras seguidas, recusa
+    chamadas por `cooldown` segundos; depois deixa passar uma de teste
+    (meio-aberto) e fecha de novo no primeiro sucesso.
+    """
+
+    def __init__(self, failures=BREAKER_FAILURES, cooldown=BREAKER_COOLDOWN):
+        self.failures = failures
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._consecutive = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "open" if time.monotonic() - self._opened_at < self.cooldown else "half-open"
+
+    def before_call(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self.cooldown - (time.monotonic() - self._opened_at)
+            if remaining > 0 or self._probing:
+                raise CircuitOpenError(
+                    f"Modelo indisponível após {self._consecutive} falhas seguidas; "
+                    f"nova tentativa liberada em {max(remaining, 0):.0f}s."
+                )
+            self._probing = True
+
+    def release(self):
+        """Encerra a chamada de teste sem contar o resultado (ex.: erro que não é do modelo)."""
+        with self._lock:
+            self._probing = False
+
+    def record(self, ok):
+        with self._lock:
+            self._probing = False
+            if ok:
+                self._consecutive, self._opened_at = 0, None
+                return
+            self._consecutive += 1
+            if self._consecutive >= self.failures or self._opened_at is not None:
+                self._opened_at = time.monotonic()
+
+
+class LatencyWindow:
+    """Últimas latências bem-sucedidas por tarefa, para saber quando uma chamada já está atrasada."""
+
+    def __init__(self, size=50, min_samples=10):
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._size = size
+
+    def add(self, task_name, seconds):
+        with self._lock:
+            self._samples.setdefault(task_name, deque(maxlen=self._size)).append(seconds)
+
+    def p95(self, task_name):
+        with self._lock:
+            samples = sorted(self._samples.get(task_name, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[int(0.95 * (len(samples) - 1))]
+
+
+_breakers, _latencies = {}, {}
+_resilience_lock = threading.Lock()
+
+
+def route_breaker(name):
+    """Disjuntor compartilhado por todas as crews do processo na mesma rota."""
+    with _resilience_lock:
+        return _breakers.setdefault(name, CircuitBreaker())
+
+
+def route_latencies(name):
+    with _resilience_lock:
+        return _latencies.setdefault(name, LatencyWindow())
+
+
+class ResilientLLM(DelegatingLLM):
+    """
+    Cada tentativa roda numa thread própria com prazo (`deadline`); falhas
+    passageiras são refeitas até `retries` vezes com backoff exponencial e
+    jitter. Com `hedge`, se a tentativa passar do p95 da tarefa na rota, uma
+    duplicata é disparada e vale a primeira resposta. O disjuntor da rota
+    recusa chamadas de imediato enquanto o modelo estiver fora do ar.
+    """
+
+    def __init__(self, inner, deadline, retries, hedge=False, breaker=None, latencies=None):
+        super().__init__(inner)
+        self.deadline = deadline
+        self.retries = retries
+        self.hedge = hedge
+        self.breaker = breaker or CircuitBreaker()
+        self.latencies = latencies or LatencyWindow()
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        task_name = task_name_of(from_task, from_agent)
+        args = (messages, tools, callbacks, available_functions, from_task, from_agent, response_model)
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** (attempt - 1))))
+            self.breaker.before_call()
+            outcome = None  # True/False contam no disjuntor; None só libera a chamada de teste
+            try:
+                response = self._attempt(args, task_name)
+                outcome = True
+            except Exception as e:
+                retryable = is_retryable(e)
+                if retryable:
+                    outcome = False
+                if not retryable or attempt == self.retries:
+                    raise
+                logger.debug("%s: tentativa %d falhou (%s: %s); repetindo", task_name, attempt + 1,
+                             type(e).__name__, e)
+                continue
+            finally:
+                # Qualquer desfecho encerra a chamada de teste do meio-aberto (senão a rota trava)
+                if outcome is None:
+                    self.breaker.release()
+                else:
+                    self.breaker.record(outcome)
+            return response
+
+    def _attempt(self, args, task_name):
+        results = queue.Queue()
+        sink = getattr(_stream_local, "sink", None)
+        winner = []  # vira [índice] quando uma resposta vence (ou [-1] no estouro do prazo)
+        attempts = {}  # índice -> _AttemptSlots (vagas da rota presas à tentativa)
+
+        def primary_sink(name, chunk):
+            # A duplicata corre calada; a principal para de escrever se perder
+            if not winner or winner[0] == 0:
+                sink(name, chunk)
+
+        def run(index):
+            started = time.monotonic()
+            _stream_local.streamed = False
+            _attempt_local.attempt = attempts[index]
+            try:
+                with stream_to(primary_sink if index == 0 and sink is not None else None):
+                    response = super(ResilientLLM, self).call(*args)
+                results.put((index, True, response, _stream_local.streamed, time.monotonic() - started))
+            except Exception as e:
+                results.put((index, False, e, False, 0.0))
+            finally:
+                _attempt_local.attempt = None
+
+        def abandon(keep=None):
+            # A requisição abandonada segue até o timeout do cliente, mas sem ocupar vaga na rota
+            for index, attempt in attempts.items():
+                if index != keep:
+                    attempt.abandon()
+
+        def launch(index):
+            attempts[index] = _AttemptSlots()
+            # Contexto copiado: eventos e rastreamento do CrewAI seguem a chamada original
+            threading.Thread(target=contextvars.copy_context().run, args=(run, index), daemon=True,
+                             name=f"biz-llm-{task_name}-{index}").start()
+
+        deadline = time.monotonic() + self.deadline
+        p95 = self.latencies.p95(task_name) if self.hedge else None
+        hedge_at = time.monotonic() + max(p95, HEDGE_MIN_SECONDS) if p95 else None
+        launch(0)
+        running = 1
+        while True:
+            now = time.monotonic()
+            timeout = min(deadline, hedge_at) - now if hedge_at else deadline - now
+            try:
+                index, ok, value, streamed, seconds = results.get(timeout=max(timeout, 0))
+            except queue.Empty:
+                if hedge_at and time.monotonic() < deadline:
+                    logger.debug("%s: sem resposta após o p95 (%.1fs); disparando duplicata", task_name, p95)
+                    hedge_at = None
+                    launch(1)
+                    running += 1
+                    continue
+                winner.append(-1)
+                abandon()
+                raise LLMDeadlineError(f"O modelo não respondeu em {self.deadline:g}s ({task_name}).")
+            if ok:
+                winner.append(index)
+                abandon(keep=index)
+                self.latencies.add(task_name, seconds)
+                _stream_local.streamed = streamed
+                return value
+            running -= 1
+            if not running:
+                raise value
+
+
+# ==========================================================
+# Streaming para o acompanhamento ao vivo
+# ==========================================================
+# O CrewAI emite os trechos (LLMStreamChunkEvent) de forma síncrona, na thread
+# que fez a chamada; um sink por thread basta para separar tarefas e jobs.
+_stream_local = threading.local()
+
+
+@contextmanager
+def stream_to(sink):
+    """Encaminha o texto gerado nesta thread para `sink(tarefa, trecho)`."""
+    previous = getattr(_stream_local, "sink", None)
+    _stream_local.sink = sink
+    try:
+        yield
+    finally:
+        _stream_local.sink = previous
+
+
+@crewai_event_bus.on(LLMStreamChunkEvent)
+def _forward_chunk(source, event):
+    sink = getattr(_stream_local, "sink", None)
+    if sink is not None and event.chunk:
+        _stream_local.streamed = True
+        sink(event.task_name or "", event.chunk)
+
+
+class StreamingLLM(DelegatingLLM):
+    """
+    Garante que cada resposta chegue ao sink da thread: com streaming os
+    trechos vêm pelos eventos do CrewAI; sem ele (ou em acertos do cache) a
+    resposta inteira é enviada de uma vez.
+    """
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        sink = getattr(_stream_local, "sink", None)
+        if sink is None:
+            return super().call(messages, tools, callbacks, available_functions,
+                                from_task, from_agent, response_model)
+
+        _stream_local.streamed = False
+        response = super().call(messages, tools, callbacks, available_functions,
+                                from_task, from_agent, response_model)
+        if not _stream_local.streamed and isinstance(response, str):
+            sink(task_name_of(from_task, from_agent), response)
+        return response
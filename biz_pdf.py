@@ -0,0 +1,235 @@
+# biz_pdf.py
+# Renderização Markdown (ou estrutura validada) -> PDF com reportlab (importado só quando há exportação)
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.enums import TA_LEFT, TA_CENTER
+from reportlab.lib import colors
+from reportlab.platypus import (
+    SimpleDocTemplate, Paragraph, Spacer, ListFlowable, ListItem, Image,
+    Preformatted, Table, TableStyle, HRFlowable
+)
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+from datetime import datetime
+from functools import lru_cache
+import os
+
+from biz_utils import _RE_NEEDS_MARKUP, format_inline, tokenize_markdown
+
+
+# ==========================================================
+# 🎨 Fonte e estilos do PDF (montados uma vez por processo)
+# ==========================================================
+@lru_cache(maxsize=1)
+def _pdf_styles():
+    """Registra a fonte CID e cria os ParagraphStyle usados no PDF."""
+    pdfmetrics.registerFont(UnicodeCIDFont('HeiseiMin-W3'))
+    base = getSampleStyleSheet()
+    return {
+        "normal": ParagraphStyle('Normal', parent=base['Normal'], fontName='HeiseiMin-W3', fontSize=11, leading=16),
+        "h1": ParagraphStyle('Heading1', fontName='HeiseiMin-W3', textColor=colors.HexColor("#004085"), fontSize=18, spaceAfter=12),
+        "h2": ParagraphStyle('Heading2', fontName='HeiseiMin-W3', textColor=colors.HexColor("#007bff"), fontSize=14, spaceAfter=8),
+        "h3": ParagraphStyle('Heading3', fontName='HeiseiMin-W3', textColor=colors.HexColor("#0d6efd"), fontSize=12, spaceAfter=6),
+        "bullet": ParagraphStyle('Bullet', parent=base['Normal'], fontName='HeiseiMin-W3', fontSize=11, leftIndent=20, leading=14),
+        "subbullet": ParagraphStyle('SubBullet', parent=base['Normal'], fontName='HeiseiMin-W3', fontSize=10, leftIndent=40, leading=13),
+        "gray": ParagraphStyle('GrayText', fontName='HeiseiMin-W3', textColor=colors.gray, fontSize=9, alignment=TA_CENTER),
+        "code": ParagraphStyle('Code', fontName='Courier', fontSize=9, leading=12, leftIndent=12,
+                               backColor=colors.HexColor("#f4f4f4"), borderPadding=6, spaceBefore=4, spaceAfter=8),
+        "table_header": ParagraphStyle('TableHeader', fontName='HeiseiMin-W3', textColor=colors.white, fontSize=9, leading=11),
+        "table_cell": ParagraphStyle('TableCell', fontName='HeiseiMin-W3', fontSize=9, leading=11),
+    }
+
+
+# ==========================================================
+# 🧱 Blocos -> flowables do reportlab
+# ==========================================================
+@lru_cache(maxsize=8)
+def _list_style(depth):
+    """Estilo do item de lista por nível (recuo crescente)."""
+    styles = _pdf_styles()
+    parent = styles["bullet"] if depth == 0 else styles["subbullet"]
+    indent = 20 + 18 * depth
+    return ParagraphStyle(f"ListLevel{depth}", parent=parent, leftIndent=indent, bulletIndent=indent - 12,
+                          bulletFontName=parent.fontName)
+
+
+def markdown_to_flowables(lines, styles=None):
+    """Monta a lista de flowables a partir dos blocos do tokenizador."""
+    styles = styles or _pdf_styles()
+    headings = {1: styles["h1"], 2: styles["h2"]}
+    story = []
+    # Pilha de listas abertas: [recuo, ordenada, contador]; a profundidade define o estilo
+    stack = []
+
+    for token in tokenize_markdown(lines):
+        kind = token[0]
+
+        if kind == "list_item":
+            _, indent, ordered, text = token
+            while stack and stack[-1][0] > indent:
+                stack.pop()
+            if stack and stack[-1][0] == indent and stack[-1][1] != ordered:
+                stack.pop()  # mudou de marcador para numerada (ou vice-versa)
+            if not stack or stack[-1][0] < indent:
+                stack.append([indent, ordered, 0])
+            level = stack[-1]
+            level[2] += 1
+            bullet_text = f"{level[2]}." if ordered else "•"
+            story.append(Paragraph(format_inline(text), _list_style(len(stack) - 1), bulletText=bullet_text))
+            continue
+
+        if kind == "blank":
+            # Linha em branco entre itens não encerra a lista
+            if not stack:
+                story.append(Spacer(1, 8))
+            continue
+
+        stack.clear()
+        if kind == "heading":
+            story.append(Paragraph(format_inline(token[2]), headings.get(token[1], styles["h3"])))
+        elif kind == "paragraph":
+            story.append(Paragraph(format_inline(token[1]), styles["normal"]))
+        elif kind == "code":
+            story.append(Preformatted(token[1], styles["code"]))
+        elif kind == "table":
+            story.append(_make_table(token[1], token[2], styles))
+        elif kind == "hr":
+            story.append(HRFlowable(width="100%", color=colors.lightgrey, spaceBefore=4, spaceAfter=4))
+
+    return story
+
+
+def report_to_flowables(sections, styles=None):
+    """Flowables direto das seções validadas (biz_report.Section), sem passar pelo Markdown."""
+    from biz_report import BulletList, Code, Paragraph as TextBlock, Table as TableBlock, numbered
+
+    styles = styles or _pdf_styles()
+    headings = {1: styles["h1"], 2: styles["h2"]}
+    story = []
+    for section in sections:
+        if section.title:
+            story.append(Paragraph(format_inline(section.title), headings.get(section.level, styles["h3"])))
+        for block in section.blocks:
+            if isinstance(block, TextBlock):
+                story.append(Paragraph(format_inline(block.text), styles["normal"]))
+            elif isinstance(block, BulletList):
+                for item, number in numbered(block.items):
+                    story.append(Paragraph(format_inline(item.text), _list_style(item.depth),
+                                           bulletText=f"{number}." if number else "•"))
+            elif isinstance(block, TableBlock):
+                story.append(_make_table(block.header, block.rows, styles))
+            elif isinstance(block, Code):
+                story.append(Preformatted(block.text, styles["code"]))
+            else:
+                story.append(HRFlowable(width="100%", color=colors.lightgrey, spaceBefore=4, spaceAfter=4))
+            # Mesmo respiro das linhas em branco entre blocos do Markdown
+            story.append(Spacer(1, 8))
+    return story
+
+
+def _make_table(header, rows, styles):
+    ncols = len(header)
+    cell = styles["table_cell"]
+
+    def make_cell(text):
+        # Célula curta e sem marcação vira texto simples (evita o parser do Paragraph)
+        if len(text) <= 40 and not _RE_NEEDS_MARKUP.search(text):
+            return text
+        return Paragraph(format_inline(text), cell)
+
+    data = [[Paragraph(format_inline(c), styles["table_header"]) for c in header]]
+    for row in rows:
+        row = (row + [""] * ncols)[:ncols]
+        data.append([make_cell(c) for c in row])
+    # Larguras fixas evitam o cálculo automático de colunas (caro em tabelas longas)
+    width = (A4[0] - 100) / max(ncols, 1)
+    table = Table(data, colWidths=[width] * ncols, repeatRows=1, hAlign="LEFT")
+    table.setStyle(TableStyle([
+        ("FONTNAME", (0, 1), (-1, -1), cell.fontName),
+        ("FONTSIZE", (0, 1), (-1, -1), cell.fontSize),
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#004085")),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f1f5fb")]),
+        ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#b8c4d6")),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ]))
+    return table
+
+
+# Cabeçalho e Rodapé
+def _header_footer(canvas, doc):
+    canvas.saveState()
+    width, height = A4
+
+    logo_path = os.path.join("Img", "logoAI.png")
+    if os.path.exists(logo_path):
+        canvas.drawImage(logo_path, 40, height - 70, width=60, height=60, mask='auto')
+
+    canvas.setFont("Helvetica-Bold", 12)
+    canvas.setFillColor(colors.HexColor("#004085"))
+    canvas.drawString(120, height - 40, "AgentAI Biz - Plano de Negócio")
+
+    canvas.setFont("Helvetica", 9)
+    canvas.setFillColor(colors.black)
+    data_str = datetime.now().strftime("%d/%m/%Y - %H:%M")
+    canvas.drawRightString(width - 50, height - 40, f"Gerado em: {data_str}")
+
+    canvas.setFont("Helvetica-Oblique", 8)
+    canvas.setFillColor(colors.gray)
+    canvas.drawCentredString(width / 2, 30, f"Página {doc.page} • AgentAI Biz © 2025")
+    canvas.restoreState()
+
+
+# ==========================================================
+# 📄 Função: Converter Markdown para PDF (formatação completa)
+# ==========================================================
+def convert_md_to_pdf(md_path, pdf_path):
+    """
+    Converte Markdown (.md) para PDF com layout hierárquico e visual aprimorado.
+    Suporta:
+    - Cabeçalho e rodapé com logo
+    - Títulos coloridos (#, ##, ###)
+    - Listas e sublistas aninhadas (com marcador ou numeradas)
+    - Tabelas e blocos de código
+    - Texto em negrito, itálico e código inline
+    """
+    return _convert(md_path, pdf_path, markdown_to_flowables)
+
+
+def convert_report_to_pdf(json_path, pdf_path):
+    """Converte a estrutura validada de um documento (.json, biz_report.Document) para PDF."""
+    from biz_report import Document
+
+    return _convert(json_path, pdf_path,
+                    lambda f, styles: report_to_flowables(Document.model_validate_json(f.read()).sections, styles))
+
+
+def _convert(source_path, pdf_path, make_story):
+    """Monta o PDF com cabeçalho/rodapé a partir de `make_story(arquivo, estilos)`."""
+    try:
+        if not os.path.exists(source_path):
+            print(f"[ERRO] Arquivo não encontrado: {source_path}")
+            return False
+
+        doc = SimpleDocTemplate(
+            pdf_path,
+            pagesize=A4,
+            rightMargin=50,
+            leftMargin=50,
+            topMargin=80,
+            bottomMargin=60
+        )
+        styles = _pdf_styles()
+
+        with open(source_path, "r", encoding="utf-8") as f:
+            story = make_story(f, styles)
+
+        story.append(Spacer(1, 20))
+        story.append(Paragraph("🧠 Relatório gerado automaticamente pelo AgentAI Biz", styles["gray"]))
+
+        doc.build(story, onFirstPage=_header_footer, onLaterPages=_header_footer)
+        print(f"[OK] PDF gerado com sucesso: {pdf_path}")
+        return True
+
+    except Exception as e:
+        print(f"[ERRO] Falha ao converter {source_path} para PDF: {e}")
+        return False
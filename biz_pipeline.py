@@ -0,0 +1,381 @@
+# biz_pipeline.py
+# Montagem e execução do pipeline de agentes (usado pelo app e pelos jobs)
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
+
+# crewai e reportlab são importados dentro das funções: o app lê as constantes
+# abaixo já na tela de login e não deve pagar pela pilha de agentes/PDF.
+
+EXECUTION_MODE = os.getenv("BIZ_EXECUTION_MODE", "parallel")  # "parallel" | "sequential"
+MAX_PARALLEL_TASKS = int(os.getenv("BIZ_MAX_PARALLEL_TASKS", "3"))
+
+TASK_ORDER = ["market", "finance", "brand", "pitch"]
+TASK_LABELS = {
+    "market": "Análise de mercado",
+    "finance": "Projeção financeira",
+    "brand": "Marca e posicionamento",
+    "pitch": "Pitch deck",
+}
+EXPECTED_FILES = {
+    "plano_negocios.md": "plano_negocios.pdf",
+    "resumo_executivo.md": "resumo_executivo.pdf",
+    "pitch_deck.md": "pitch_deck.pdf",
+}
+
+# Dependências reais de dados (viram o `context` das tarefas em build_tasks)
+TASK_DEPENDENCIES = {
+    "market": [],
+    "finance": [],
+    "brand": ["market"],
+    "pitch": ["market", "finance", "brand"],
+}
+# Saída bruta de cada tarefa, guardada no diretório da execução (base da regeneração parcial)
+TASK_OUTPUT_DIR = "tasks"
+
+
+# ==========================================================
+# 🧩 Montagem das tarefas
+# ==========================================================
+def build_tasks(profile_data, agents=None, market_reference=None):
+    """
+    Cria agentes e tarefas. O `context` de cada tarefa declara só as
+    dependências reais de dados: a projeção financeira usa apenas o perfil,
+    a marca parte da análise de mercado e o pitch reúne tudo.
+    `market_reference` é a análise de um perfil semelhante (ponto de partida).
+    """
+    from biz_components import BizAgents, BizTasks
+
+    agents = agents or BizAgents()
+    tasks = BizTasks()
+    built = {}
+
+    def upstream(name):
+        return [built[dep] for dep in TASK_DEPENDENCIES[name]]
+
+    built["market"] = tasks.market_task(agents.market_agent(), profile_data, market_reference)
+    built["finance"] = tasks.finance_task(upstream("finance"), agents.finance_agent(), profile_data)
+    built["brand"] = tasks.brand_task(upstream("brand"), agents.brand_agent(), profile_data)
+    built["pitch"] = tasks.pitch_task(upstream("pitch"), agents.pitch_agent(), profile_data)
+
+    return [built[name] for name in TASK_ORDER]
+
+
+def task_graph(task_list):
+    """Deriva o DAG {tarefa: [dependências]} a partir do `context` das tarefas."""
+    return {
+        task.name: [dep.name for dep in task.context] if isinstance(task.context, list) else []
+        for task in task_list
+    }
+
+
+def downstream(names, graph=TASK_DEPENDENCIES):
+    """`names` e todas as tarefas que dependem delas (direta ou indiretamente), na ordem do pipeline."""
+    affected = set(names)
+    changed = True
+    while changed:
+        changed = False
+        for name, deps in graph.items():
+            if name not in affected and affected & set(deps):
+                affected.add(name)
+                changed = True
+    return [name for name in TASK_ORDER if name in affected]
+
+
+# ==========================================================
+# 💾 Saídas por tarefa
+# ==========================================================
+def task_output_path(run_dir, name, ext="md"):
+    return os.path.join(run_dir, TASK_OUTPUT_DIR, f"{name}.{ext}")
+
+
+def save_task_output(run_dir, name, text, report=None):
+    """
+    Grava a saída da tarefa: o Markdown (contexto da regeneração) e a estrutura
+    validada (biz_report.Report) em JSON, lida pelo app e pelo PDF. Sem `report`
+    (ex.: análise reaproveitada), o texto é convertido aqui.
+    """
+    from biz_report import parse_report
+
+    report = report if report is not None else parse_report(name, text)
+    path = task_output_path(run_dir, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    with open(task_output_path(run_dir, name, "json"), "w", encoding="utf-8") as f:
+        f.write(report.model_dump_json())
+
+
+def load_task_outputs(run_dir):
+    """{tarefa: saída bruta} das tarefas já concluídas nesta execução."""
+    outputs = {}
+    for name in TASK_ORDER:
+        try:
+            with open(task_output_path(run_dir, name), "r", encoding="utf-8") as f:
+                outputs[name] = f.read()
+        except OSError:
+            continue
+    return outputs
+
+
+def load_task_reports(run_dir):
+    """{tarefa: Report} das tarefas concluídas; execuções antigas (só .md) são convertidas."""
+    from biz_report import Report, parse_report
+
+    reports = {}
+    for name in TASK_ORDER:
+        try:
+            with open(task_output_path(run_dir, name, "json"), "r", encoding="utf-8") as f:
+                reports[name] = Report.model_validate_json(f.read())
+        except OSError:
+            pass
+    for name, text in load_task_outputs(run_dir).items():
+        reports.setdefault(name, parse_report(name, text))
+    return reports
+
+
+def write_documents(run_dir):
+    """
+    Monta os documentos entregues a partir das estruturas das tarefas: para
+    cada um, o .json (app e PDF) e o .md (histórico, pacote .zip). Retorna os
+    avisos das seções que ficaram faltando.
+    """
+    from biz_report import DOCUMENTS, build_document, sections_to_markdown
+
+    reports = load_task_reports(run_dir)
+    for name in DOCUMENTS:
+        document = build_document(name, reports)
+        if not document.tasks:
+            continue
+        with open(os.path.join(run_dir, f"{name}.json"), "w", encoding="utf-8") as f:
+            f.write(document.model_dump_json())
+        with open(os.path.join(run_dir, f"{name}.md"), "w", encoding="utf-8") as f:
+            f.write(sections_to_markdown(document.sections))
+    return [f"{TASK_LABELS[name]}: {issue}" for name, report in reports.items() for issue in report.issues]
+
+
+# ==========================================================
+# ⚡ Execução por grafo de dependências
+# ==========================================================
+def run_dag(task_list, max_workers=MAX_PARALLEL_TASKS, on_task_start=None, on_task_done=None,
+            on_chunk=None, only=None):
+    """
+    Executa as tarefas assim que suas dependências terminam, em um pool de
+    threads; tarefas independentes rodam em paralelo. Retorna os tempos por
+    tarefa e o ganho de tempo de parede em relação à soma sequencial.
+    `on_chunk(tarefa, trecho)` recebe o texto dos agentes enquanto é gerado.
+    Com `only`, as demais tarefas contam como prontas (com `task.output` já preenchido).
+    Se uma tarefa falha, nenhuma outra começa, mas as que já rodavam terminam
+    e passam por `on_task_done` (checkpoint) antes de o erro subir.
+    """
+    from biz_context import compact_context
+    from biz_llm import stream_to
+
+    by_name = {task.name: task for task in task_list}
+    graph = task_graph(task_list)
+    done = set(graph) - set(only) if only is not None else set()
+    pending = {name: deps for name, deps in graph.items() if name not in done}
+    seconds, context_tokens = {}, {}
+    started = time.perf_counter()
+
+    def execute(task):
+        t0 = time.perf_counter()
+        if on_task_start:
+            on_task_start(task.name)
+        context = None
+        if graph[task.name]:
+            # Resumo das dependências no lugar das saídas completas
+            upstream = [(dep.name, TASK_LABELS.get(dep.name, dep.name), dep.output.raw)
+                        for dep in task.context if dep.output]
+            context, tokens = compact_context(task.name, upstream)
+            context_tokens[task.name] = tokens
+            logger.debug("%s: contexto %d -> %d tokens", task.name, tokens["before"], tokens["after"])
+        with stream_to(on_chunk):
+            output = task.execute_sync(agent=task.agent, context=context)
+        return task.name, output, time.perf_counter() - t0
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="biz-task") as pool:
+        running, error = set(), None
+        while (pending and error is None) or running:
+            ready = [name for name, deps in pending.items() if set(deps) <= done] if error is None else []
+            for name in ready:
+                del pending[name]
+                running.add(pool.submit(execute, by_name[name]))
+            if not running:
+                raise RuntimeError(f"Dependências circulares entre tarefas: {sorted(pending)}")
+
+            finished, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                try:
+                    name, output, elapsed = future.result()
+                except Exception as e:
+                    error = error or e
+                    continue
+                done.add(name)
+                seconds[name] = round(elapsed, 2)
+                if on_task_done:
+                    on_task_done(name, output, elapsed)
+        if error is not None:
+            raise error
+
+    timings = _timings("parallel", seconds, time.perf_counter() - started)
+    timings["context"] = context_tokens
+    return timings
+
+
+def _timings(mode, seconds, wall):
+    sequential = sum(seconds.values())
+    return {
+        "mode": mode,
+        "tasks": seconds,
+        "wall": round(wall, 2),
+        "sequential": round(sequential, 2),
+        "saved": round(max(sequential - wall, 0.0), 2),
+    }
+
+
+# ==========================================================
+# 📦 Pós-processamento: documentos da execução e PDFs
+# ==========================================================
+def collect_outputs(run_dir):
+    """
+    Exporta para PDF os documentos da execução (reaproveitando PDFs de conteúdo
+    idêntico). O PDF sai da estrutura (.json) quando ela existe; execuções
+    antigas usam o .md. As conversões correm juntas no pool de processos do
+    biz_utils. Retorna (avisos, exportações).
+    """
+    from biz_utils import export_many
+
+    warnings, jobs = [], {}
+    for md_name, pdf_name in EXPECTED_FILES.items():
+        md_path = os.path.join(run_dir, md_name)
+        json_path = os.path.splitext(md_path)[0] + ".json"
+        if os.path.exists(json_path):
+            jobs[os.path.join(run_dir, pdf_name)] = json_path
+        elif os.path.exists(md_path):
+            jobs[os.path.join(run_dir, pdf_name)] = md_path
+        else:
+            warnings.append(f"Atenção: {md_name} não foi gerado pelos agentes.")
+
+    exports = {}
+    for pdf_path, future in export_many((md, pdf) for pdf, md in jobs.items()).items():
+        pdf_name = os.path.basename(pdf_path)
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"[ERRO] Falha ao converter {pdf_name}: {e}")
+            result = {"status": "failed", "seconds": 0.0}
+        exports[pdf_name] = {"status": result["status"], "seconds": result["seconds"]}
+        if result["status"] == "failed":
+            warnings.append(f"Falha ao converter {os.path.basename(jobs[pdf_path])} para PDF.")
+    return warnings, exports
+
+
+def run_pipeline(profile_data, run_dir, on_task_start=None, on_task_done=None, mode=None, agents=None,
+                 on_chunk=None, only=None, username=None, refresh=None):
+    """
+    Executa as quatro tarefas gravando tudo em `run_dir` (um diretório por
+    execução) e converte os arquivos gerados. Retorna (avisos, tempos).
+    `agents` permite injetar um BizAgents já configurado (ex.: com limite de RPM).
+    `only` refaz só essas tarefas (e as dependentes), reaproveitando as saídas guardadas.
+    `refresh` diz quais delas o usuário pediu para regenerar (ignoram o cache do
+    LLM); por padrão todas de `only`. As demais são retomadas de uma falha.
+    Em execuções completas, a análise de mercado de um perfil quase idêntico
+    (biz_similarity) é reaproveitada ou vira ponto de partida do agente.
+    """
+    from biz_components import BizAgents
+    from biz_similarity import ENABLED as SIMILARITY_ENABLED, find_market_reference, get_similarity_index
+
+    mode = mode or EXECUTION_MODE
+    requested = list(only or ())
+    regenerate = requested if refresh is None else list(refresh)
+    # Regeneração: as tarefas refeitas não podem sair do cache do LLM
+    agents = agents or BizAgents(refresh=regenerate)
+
+    reference = None
+    if SIMILARITY_ENABLED and not requested:
+        reference = find_market_reference(profile_data, username)
+        if reference and reference["mode"] == "reuse":
+            save_task_output(run_dir, "market", reference["text"])
+            only = [name for name in TASK_ORDER if name != "market"]
+
+    repaired = {}
+
+    def task_done(name, output, seconds):
+        # Com o guardrail, output.pydantic já é o Report validado (e corrigido)
+        report = getattr(output, "pydantic", None)
+        if report is not None and getattr(report, "repaired", None):
+            repaired[name] = list(report.repaired)
+        save_task_output(run_dir, name, output.raw, report)
+        if on_task_done:
+            on_task_done(name, output, seconds)
+
+    market_context = reference["text"] if reference and reference["mode"] == "context" else None
+    if reference and reference["mode"] == "reuse":
+        from crewai.tasks.task_output import TaskOutput
+
+        # Quem acompanha o progresso vê a análise reaproveitada como tarefa pronta
+        if on_task_start:
+            on_task_start("market")
+        if on_task_done:
+            on_task_done("market", TaskOutput(name="market", description=TASK_LABELS["market"],
+                                              raw=reference["text"], agent="biz_similarity"), 0.0)
+    if only:
+        timings = _regenerate(profile_data, run_dir, only, on_task_start, task_done, agents, on_chunk, mode)
+    else:
+        # "sequential" é o mesmo DAG com um único worker: uma tarefa por vez, na
+        # ordem do pipeline, com o mesmo contexto compactado entre as tarefas
+        sequential = mode == "sequential"
+        timings = run_dag(build_tasks(profile_data, agents, market_context),
+                          max_workers=1 if sequential else MAX_PARALLEL_TASKS,
+                          on_task_start=on_task_start, on_task_done=task_done, on_chunk=on_chunk)
+        if sequential:
+            timings["mode"] = "sequential"
+    if requested:
+        rerun = [name for name in TASK_ORDER if name in timings["tasks"]]
+        if regenerate:
+            timings["regenerated"] = [name for name in rerun if name in downstream(regenerate)]
+        resumed = [name for name in rerun if name not in timings.get("regenerated", ())]
+        if resumed:
+            timings["resumed"] = resumed
+    if reference:
+        timings["market_reference"] = {k: reference[k] for k in ("mode", "score", "nome_empresa")}
+    if SIMILARITY_ENABLED and "market" in timings["tasks"]:
+        # Só análises feitas pelo agente entram no índice (cópias reaproveitadas não)
+        get_similarity_index().add(os.path.abspath(task_output_path(run_dir, "market")), username,
+                                   profile_data)
+    if repaired:
+        timings["repaired"] = repaired
+    timings["llm"] = agents.meter.snapshot()
+    warnings = write_documents(run_dir)
+    pdf_warnings, timings["pdf"] = collect_outputs(run_dir)
+    return warnings + pdf_warnings, timings
+
+
+def _regenerate(profile_data, run_dir, only, on_task_start, on_task_done, agents, on_chunk, mode=None):
+    """
+    Refaz `only` (e o que depende delas) usando como contexto as saídas
+    guardadas das demais tarefas desta execução. No modo "sequential" o DAG
+    roda com um único worker (uma tarefa por vez, na ordem do pipeline).
+    """
+    from crewai.tasks.task_output import TaskOutput
+
+    task_list = build_tasks(profile_data, agents)
+    graph = task_graph(task_list)
+    stored = load_task_outputs(run_dir)
+    # Execuções anteriores a este recurso não têm as saídas guardadas: refaz também
+    rerun = downstream(set(only) | {name for name in graph if name not in stored}, graph)
+    for task in task_list:
+        if task.name not in rerun:
+            task.output = TaskOutput(name=task.name, description=task.description,
+                                     raw=stored[task.name], agent=task.agent.role)
+
+    sequential = mode == "sequential"
+    timings = run_dag(task_list, max_workers=1 if sequential else MAX_PARALLEL_TASKS,
+                      on_task_start=on_task_start, on_task_done=on_task_done, on_chunk=on_chunk, only=rerun)
+    if sequential:
+        timings["mode"] = "sequential"
+    return timings
@@ -0,0 +1,456 @@
+# biz_report.py
+# Saídas das tarefas como estrutura validada (seções, listas, tabelas) usada pelo app e pelo PDF
+import os
+import re
+from typing import Annotated, List, Literal, Union
+
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from biz_similarity import normalize
+from biz_utils import tokenize_markdown
+
+MAX_REASKS = int(os.getenv("BIZ_REPORT_REASKS", "3"))  # seções pedidas de novo ao LLM, por tarefa
+REASK_BUDGET = 600  # tokens do relatório atual enviados junto com o pedido da seção
+
+_RE_OUTER_FENCE = re.compile(r"^\s*```[\w-]*\s*\n(.*)\n\s*```\s*$", re.DOTALL)
+_RE_BOLD_TITLE = re.compile(r"^(?:\*\*|__)([^*_]{1,80}?)(?:\*\*|__):?$")
+_RE_EMPHASIS = re.compile(r"(\*\*|__|`)")
+
+
+# ==========================================================
+# 🧱 Esquema
+# ==========================================================
+class Paragraph(BaseModel):
+    kind: Literal["paragraph"] = "paragraph"
+    text: str
+
+
+class ListItem(BaseModel):
+    text: str
+    depth: int = 0
+    ordered: bool = False
+
+
+class BulletList(BaseModel):
+    kind: Literal["list"] = "list"
+    items: List[ListItem] = Field(min_length=1)
+
+
+class Table(BaseModel):
+    kind: Literal["table"] = "table"
+    header: List[str] = Field(min_length=1)
+    rows: List[List[str]] = []
+
+    @model_validator(mode="after")
+    def _rectangular(self):
+        # Linhas com células a mais ou a menos ficam com a largura do cabeçalho
+        width = len(self.header)
+        self.rows = [(row + [""] * width)[:width] for row in self.rows]
+        return self
+
+
+class Code(BaseModel):
+    kind: Literal["code"] = "code"
+    text: str
+
+
+class Rule(BaseModel):
+    kind: Literal["rule"] = "rule"
+
+
+Block = Annotated[Union[Paragraph, BulletList, Table, Code, Rule], Field(discriminator="kind")]
+
+
+class Section(BaseModel):
+    title: str = ""  # vazio: texto antes do primeiro título
+    level: int = 2
+    blocks: List[Block] = []
+
+    @field_validator("level")
+    @classmethod
+    def _level(cls, v):
+        return min(max(v, 0), 6)
+
+    def size(self):
+        """Tamanho aproximado em caracteres (para paginar sem gerar o Markdown)."""
+        total = len(self.title)
+        for block in self.blocks:
+            if isinstance(block, BulletList):
+                total += sum(len(item.text) + 4 for item in block.items)
+            elif isinstance(block, Table):
+                total += sum(len(cell) + 3 for row in [block.header, *block.rows] for cell in row)
+            else:
+                total += len(getattr(block, "text", "")) + 2
+        return total
+
+
+class Report(BaseModel):
+    """Saída de uma tarefa: seções na ordem do texto, o que foi completado e o que ainda falta."""
+    task: str
+    sections: List[Section] = []
+    repaired: List[str] = []
+    issues: List[str] = []
+
+
+class Document(BaseModel):
+    """Documento entregue (plano, resumo, pitch): as seções das tarefas que o compõem."""
+    name: str
+    tasks: List[str]
+    sections: List[Section] = []
+
+
+# Seções obrigatórias por tarefa: (título usado no pedido, palavras que o reconhecem no título)
+REPORT_SPECS = {
+    "market": {
+        "sections": [
+            ("Sumário do mercado", ("mercado", "sumario", "visao geral")),
+            ("Principais concorrentes", ("concorren", "competi")),
+            ("Tendências e oportunidades", ("tendencia", "oportunidade")),
+        ],
+    },
+    "finance": {
+        "sections": [
+            ("Receita estimada (12 meses)", ("receita", "faturamento")),
+            ("Custos estimados e margem", ("custo", "margem")),
+            ("Ponto de equilíbrio (breakeven)", ("equilibrio", "breakeven", "break-even")),
+            ("Leitura dos cenários e recomendações", ("cenario", "recomenda")),
+        ],
+        "tables": True,
+    },
+    "brand": {
+        "sections": [
+            ("Proposta de valor", ("proposta", "valor")),
+            ("Público-alvo detalhado", ("publico", "persona")),
+            ("Principais mensagens", ("mensage", "comunicacao", "tom de voz")),
+        ],
+    },
+    "pitch": {
+        "sections": [
+            ("Capa", ("capa",)),
+            ("Problema", ("problema",)),
+            ("Solução", ("solucao",)),
+            ("Modelo de negócio", ("modelo de negocio", "monetiza")),
+            ("Projeções", ("projec", "financeir")),
+            ("Time", ("time", "equipe")),
+            ("Call to Action", ("call to action", "cta", "proximos passos", "chamada")),
+        ],
+    },
+}
+
+# Documento -> tarefas que o compõem, na ordem
+DOCUMENTS = {
+    "plano_negocios": ["market", "brand"],
+    "resumo_executivo": ["finance"],
+    "pitch_deck": ["pitch"],
+}
+
+
+# ==========================================================
+# 🔎 Markdown -> estrutura (uma passada do tokenizador)
+# ==========================================================
+def _unwrap(text):
+    # Modelos às vezes devolvem o relatório inteiro dentro de ```markdown ... ```
+    m = _RE_OUTER_FENCE.match(text or "")
+    return m.group(1) if m else (text or "")
+
+
+def parse_sections(markdown):
+    """Seções [Section] do Markdown; cada título (de qualquer nível) abre uma seção."""
+    sections = [Section(title="", level=0)]
+    items, indents = None, []  # lista aberta e pilha de recuos (profundidade dos itens)
+
+    for token in tokenize_markdown(_unwrap(markdown).splitlines()):
+        kind = token[0]
+        if kind == "list_item":
+            _, indent, ordered, text = token
+            if items is None:
+                items, indents = [], []
+                sections[-1].blocks.append(BulletList.model_construct(kind="list", items=items))
+            while indents and indents[-1] > indent:
+                indents.pop()
+            if not indents or indents[-1] < indent:
+                indents.append(indent)
+            items.append(ListItem(text=text, depth=len(indents) - 1, ordered=ordered))
+            continue
+        if kind == "blank":
+            continue  # linha em branco entre itens não encerra a lista
+        items = None
+
+        if kind == "paragraph" and _RE_BOLD_TITLE.match(token[1]):
+            # Linha inteira em negrito faz papel de título (ex.: "**Problema**")
+            kind, token = "heading", ("heading", 3, _RE_BOLD_TITLE.match(token[1]).group(1).strip())
+        if kind == "heading":
+            sections.append(Section(title=token[2].strip(), level=token[1]))
+        elif kind == "paragraph":
+            sections[-1].blocks.append(Paragraph(text=token[1]))
+        elif kind == "code":
+            sections[-1].blocks.append(Code(text=token[1]))
+        elif kind == "table":
+            sections[-1].blocks.append(Table(header=token[1], rows=token[2]))
+        elif kind == "hr":
+            sections[-1].blocks.append(Rule())
+
+    return [s for s in sections if s.title or s.blocks]
+
+
+def parse_report(task, markdown):
+    return Report(task=task, sections=parse_sections(markdown))
+
+
+# ==========================================================
+# ✅ Validação
+# ==========================================================
+def _matches(section, keywords):
+    title = normalize(section.title)
+    return any(k in title for k in keywords)
+
+
+def _has_content(sections, i):
+    """A seção `i` tem blocos próprios ou nas subseções logo abaixo dela."""
+    level = sections[i].level
+    for section in sections[i:]:
+        if section is not sections[i] and section.level <= level:
+            break
+        if section.blocks:
+            return True
+    return False
+
+
+def find_section(sections, keywords, min_level=0):
+    """
+    Índice da primeira seção (de nível >= `min_level`) cujo título tem uma das
+    palavras; None se não houver.
+    """
+    for i, section in enumerate(sections):
+        if section.level >= min_level and _matches(section, keywords):
+            return i
+    return None
+
+
+def validate_report(report):
+    """
+    Problemas encontrados: [(título da seção, motivo)], com motivo "ausente",
+    "vazia" ou "sem tabela". Lista vazia: relatório completo.
+    """
+    spec = REPORT_SPECS.get(report.task, {})
+    problems = []
+    # O título do relatório ("# Análise de mercado") não conta como a seção "Sumário do mercado"
+    level = _body_level(report.sections)
+    for title, keywords in spec.get("sections", ()):
+        i = find_section(report.sections, keywords, level)
+        if i is None:
+            problems.append((title, "ausente"))
+        elif not _has_content(report.sections, i):
+            problems.append((title, "vazia"))
+    if spec.get("tables") and not any(isinstance(b, Table) and b.rows
+                                      for s in report.sections for b in s.blocks):
+        problems.append(("Tabelas da projeção", "sem tabela"))
+    return problems
+
+
+# ==========================================================
+# 📝 Estrutura -> Markdown
+# ==========================================================
+def numbered(items):
+    """(item, número) dos itens da lista; número None nos itens com marcador."""
+    counters = {}  # profundidade -> (ordenada, contador)
+    for item in items:
+        counters = {d: c for d, c in counters.items() if d <= item.depth}
+        ordered, count = counters.get(item.depth, (item.ordered, 0))
+        # Troca de marcador para numerada (ou vice-versa) recomeça a contagem
+        count = count + 1 if ordered == item.ordered else 1
+        counters[item.depth] = (item.ordered, count)
+        yield item, count if item.ordered else None
+
+
+def block_to_markdown(block):
+    if isinstance(block, Paragraph):
+        return block.text
+    if isinstance(block, BulletList):
+        return "\n".join(f"{'  ' * item.depth}{f'{n}.' if n else '-'} {item.text}"
+                         for item, n in numbered(block.items))
+    if isinstance(block, Table):
+        rows = [block.header, ["---"] * len(block.header), *block.rows]
+        return "\n".join("| " + " | ".join(row) + " |" for row in rows)
+    if isinstance(block, Code):
+        return f"```\n{block.text}\n```"
+    return "---"
+
+
+def sections_to_markdown(sections):
+    parts = []
+    for section in sections:
+        if section.title:
+            parts.append(f"{'#' * max(section.level, 1)} {section.title}")
+        parts.extend(block_to_markdown(block) for block in section.blocks)
+    return "\n\n".join(parts) + "\n"
+
+
+def plain_text(text):
+    """Texto sem marcas de ênfase (células de tabela exibidas fora do Markdown)."""
+    return _RE_EMPHASIS.sub("", text)
+
+
+# ==========================================================
+# 🩹 Guardrail: valida a saída e pede de novo só o que faltou
+# ==========================================================
+class ReportGuardrail:
+    """
+    Guardrail da tarefa (CrewAI): converte a resposta do agente em Report e,
+    para cada seção ausente ou vazia, faz uma chamada curta ao LLM pedindo só
+    aquela seção, em vez de repetir a tarefa inteira. Tabelas calculadas
+    (`tables`, Markdown) entram direto, sem LLM. Sempre aprova: o que não se
+    resolveu fica em `Report.issues` e vira aviso da execução.
+    A Task recebe o método `check` (o CrewAI lê o código-fonte do guardrail
+    para os eventos, o que não funciona com a instância).
+    """
+
+    def __init__(self, task_name, llm, tables=None, max_reasks=MAX_REASKS):
+        self.task_name = task_name
+        self.llm = llm
+        self.tables = tables
+        self.max_reasks = max_reasks
+        self.task = None  # preenchido depois de criar a Task (origem das chamadas de correção)
+
+    def check(self, output):
+        report = self.repair(parse_report(self.task_name, output.raw))
+        return True, output.model_copy(update={"raw": sections_to_markdown(report.sections), "pydantic": report})
+
+    def repair(self, report):
+        spec = dict(REPORT_SPECS.get(self.task_name, {}).get("sections", ()))
+        order = list(spec)
+        reasks = 0
+        for title, reason in validate_report(report):
+            if reason == "sem tabela":
+                if self.tables:
+                    report.sections.extend(self._table_sections(report))
+                    report.repaired.append(title)
+                else:
+                    report.issues.append(f"{title}: {reason}")
+                continue
+            if reasks >= self.max_reasks:
+                report.issues.append(f"Seção '{title}' {reason}")
+                continue
+            reasks += 1
+            sections = self._reask(report, title, reason)
+            if sections is None:
+                report.issues.append(f"Seção '{title}' {reason}")
+                continue
+            _place(report.sections, sections, spec, order, title)
+            report.repaired.append(title)
+        return report
+
+    def _table_sections(self, report):
+        # As tabelas calculadas viram uma seção no nível das demais, com os subtítulos abaixo dela
+        level = _body_level(report.sections)
+        parsed = parse_sections(self.tables)
+        head = Section(title="Projeção de 12 meses", level=level,
+                       blocks=parsed[0].blocks if parsed and not parsed[0].title else [])
+        return [head] + [s.model_copy(update={"level": level + 1}) for s in parsed if s.title]
+
+    def _reask(self, report, title, reason):
+        from biz_context import compact_output
+
+        level = _body_level(report.sections)
+        description = getattr(self.task, "description", "") or ""
+        prompt = (
+            f"{description.strip()}\n\n"
+            f"O relatório abaixo está incompleto: a seção \"{title}\" está {reason}.\n"
+            f"Escreva SOMENTE essa seção, em markdown, começando pelo título "
+            f"\"{'#' * max(level, 1)} {title}\". Não repita as demais seções.\n\n"
+            f"Relatório atual (resumido):\n"
+            f"{compact_output(sections_to_markdown(report.sections), REASK_BUDGET)}"
+        )
+        try:
+            answer = self.llm.call([{"role": "user", "content": prompt}], from_task=self.task,
+                                   from_agent=getattr(self.task, "agent", None))
+        except Exception as e:
+            print(f"[ERRO] Correção da seção '{title}' ({self.task_name}) falhou: {e}")
+            return None
+        if not isinstance(answer, str):
+            return None
+        # Alguns modelos mantêm o formato do agente mesmo fora dele
+        answer = answer.split("Final Answer:", 1)[-1]
+
+        keywords = dict(REPORT_SPECS[self.task_name]["sections"])[title]
+        sections = parse_sections(answer)
+        i = find_section(sections, keywords)
+        if i is not None and _has_content(sections, i):
+            picked = [sections[i]] + [s for s in sections[i + 1:] if s.level > sections[i].level]
+        else:
+            # Resposta sem o título pedido: o conteúdo vira a seção
+            blocks = [b for s in sections for b in s.blocks]
+            if not blocks:
+                return None
+            picked = [Section(title=title, level=level, blocks=blocks)]
+        shift = level - picked[0].level
+        return [s.model_copy(update={"level": s.level + shift}) for s in picked]
+
+
+def _body_level(sections):
+    """Nível dos títulos das seções do corpo (um único "#" costuma ser o título do relatório)."""
+    levels = [s.level for s in sections if s.title]
+    if levels.count(1) > 1:
+        return 1
+    deeper = [level for level in levels if level >= 2]
+    return min(deeper) if deeper else 2
+
+
+def _place(sections, new, spec, order, title):
+    """Coloca as seções `new` no lugar da vazia ou antes da próxima seção obrigatória presente."""
+    level = _body_level(sections)
+    i = find_section(sections, spec[title], level)
+    if i is not None:
+        # Vazia: sai ela (e as subseções sem conteúdo)
+        end = i + 1
+        while end < len(sections) and sections[end].level > sections[i].level:
+            end += 1
+        sections[i:end] = new
+        return
+    for later in order[order.index(title) + 1:]:
+        j = find_section(sections, spec[later], level)
+        if j is not None:
+            sections[j:j] = new
+            return
+    sections.extend(new)
+
+
+# ==========================================================
+# 📚 Documentos entregues
+# ==========================================================
+def build_document(name, reports):
+    """Documento `name` a partir dos Report {tarefa: Report} disponíveis."""
+    tasks = [t for t in DOCUMENTS[name] if t in reports]
+    return Document(name=name, tasks=tasks, sections=[s for t in tasks for s in reports[t].sections])
+
+
+def paginate_sections(sections, max_chars):
+    """
+    Páginas [(título, [Section])]: seções de nível <= 2 abrem um grupo (com as
+    subseções) e grupos consecutivos são juntados até ~`max_chars`.
+    """
+    groups = []
+    for section in sections:
+        if not groups or 0 < section.level <= 2:
+            groups.append([section])
+        else:
+            groups[-1].append(section)
+
+    def title(group):
+        return group[0].title or "Introdução"
+
+    pages, current, size = [], [], 0
+    for group in groups:
+        group_size = sum(s.size() for s in group)
+        if current and size + group_size > max_chars:
+            pages.append(current)
+            current, size = [], 0
+        current.append(group)
+        size += group_size
+    if current:
+        pages.append(current)
+    return [
+        (title(page[0]) if len(page) == 1 else f"{title(page[0])} … {title(page[-1])}",
+         [s for group in page for s in group])
+        for page in pages
+    ]
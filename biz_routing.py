@@ -0,0 +1,118 @@
+# biz_routing.py
+# Rotas de modelo por agente (qualquer endpoint compatível com a OpenAI) e limite de concorrência por rota
+import json
+import os
+import threading
+from functools import lru_cache
+
+# BIZ_LLM_ROUTES: JSON (texto ou caminho de um arquivo .json). Exemplo:
+# {
+#   "routes": {
+#     "forte": {"model": "gpt-4o", "max_concurrency": 4},
+#     "local": {"model": "llama3.1:8b", "base_url": "http://localhost:11434/v1",
+#               "api_key": "ollama", "max_concurrency": 2}
+#   },
+#   "agents": {"finance": "forte", "brand": "local"}
+# }
+# Agentes sem rota usam a "default" (BIZ_LLM_MODEL / BIZ_LLM_BASE_URL, como antes).
+# Prazo, novas tentativas e duplicata (biz_llm.ResilientLLM) valem para todas as
+# rotas, com os padrões abaixo; cada rota pode sobrescrever ("deadline": 60, ...).
+DEFAULT_ROUTE = "default"
+ROUTE_KEYS = ("model", "base_url", "api_key", "provider", "max_concurrency", "temperature", "timeout",
+              "deadline", "max_retries", "hedge")
+# Mesmo modelo em outro endpoint (ou com outra temperatura) não divide respostas em cache
+CACHE_KEYS = ("base_url", "provider", "temperature")
+
+
+def _resilience_defaults():
+    return {
+        "deadline": float(os.getenv("BIZ_LLM_DEADLINE", "180")),  # segundos por tentativa
+        "max_retries": int(os.getenv("BIZ_LLM_RETRIES", "2")),
+        "hedge": os.getenv("BIZ_LLM_HEDGE", "0") != "0",  # duplica chamadas acima do p95 (gasta mais tokens)
+    }
+
+
+def _default_route():
+    return {
+        **_resilience_defaults(),
+        "model": os.getenv("BIZ_LLM_MODEL", "gpt-4o-mini"),
+        "base_url": os.getenv("BIZ_LLM_BASE_URL") or None,
+        "max_concurrency": int(os.getenv("BIZ_LLM_MAX_CONCURRENCY", "0")),
+    }
+
+
+@lru_cache(maxsize=1)
+def load_routes():
+    """{"routes": {nome: spec}, "agents": {agente: nome}} lido uma vez por processo."""
+    raw = os.getenv("BIZ_LLM_ROUTES", "").strip()
+    if raw and not raw.startswith("{"):
+        with open(raw, "r", encoding="utf-8") as f:
+            raw = f.read()
+    config = json.loads(raw) if raw else {}
+
+    routes = {DEFAULT_ROUTE: _default_route()}
+    for name, spec in config.get("routes", {}).items():
+        unknown = set(spec) - set(ROUTE_KEYS)
+        if unknown:
+            raise ValueError(f"Rota '{name}': chaves desconhecidas {sorted(unknown)}")
+        if "model" not in spec:
+            raise ValueError(f"Rota '{name}': 'model' é obrigatório")
+        routes[name] = {**_resilience_defaults(), **routes.get(name, {}), **spec}
+
+    agents = config.get("agents", {})
+    missing = {route for route in agents.values() if route not in routes}
+    if missing:
+        raise ValueError(f"Rotas não definidas em BIZ_LLM_ROUTES: {sorted(missing)}")
+    return {"routes": routes, "agents": agents}
+
+
+def route_for(agent_name):
+    """(nome da rota, spec) usada pelo agente."""
+    config = load_routes()
+    name = config["agents"].get(agent_name, DEFAULT_ROUTE)
+    return name, config["routes"][name]
+
+
+def cache_params(spec):
+    """Campos da rota que mudam a resposta (além do modelo): entram na chave do cache do LLM."""
+    return {key: spec[key] for key in CACHE_KEYS if spec.get(key) is not None}
+
+
+def llm_kwargs(spec, stream):
+    """Argumentos do `crewai.LLM` para a rota."""
+    kwargs = {
+        "model": spec["model"],
+        "api_key": spec.get("api_key") or os.getenv("OPENAI_API_KEY"),
+        "base_url": spec.get("base_url") or None,
+        "stream": stream,
+    }
+    if spec.get("base_url") or spec.get("provider"):
+        # Modelos locais têm nomes fora do catálogo da OpenAI: força o cliente nativo
+        kwargs["provider"] = spec.get("provider", "openai")
+    for key in ("temperature", "timeout"):
+        if spec.get(key) is not None:
+            kwargs[key] = spec[key]
+    if spec.get("deadline"):
+        # Novas tentativas ficam com o ResilientLLM; o cliente HTTP só fecha a
+        # conexão de uma tentativa abandonada, em vez de segurá-la por 10 minutos
+        kwargs.setdefault("timeout", spec["deadline"])
+        kwargs["max_retries"] = 0
+    return kwargs
+
+
+# ==========================================================
+# 🚦 Limite de chamadas simultâneas por rota (processo inteiro)
+# ==========================================================
+_semaphores = {}
+_semaphores_lock = threading.Lock()
+
+
+def route_semaphore(name, limit):
+    """Semáforo compartilhado por todas as crews do processo; None sem limite."""
+    if not limit or limit <= 0:
+        return None
+    with _semaphores_lock:
+        sem = _semaphores.get(name)
+        if sem is None:
+            sem = _semaphores[name] = threading.BoundedSemaphore(limit)
+        return sem
@@ -0,0 +1,166 @@
+# biz_scheduler.py
+# Controle de admissão das execuções: limite global de crews simultâneas e fila justa por usuário
+import os
+import threading
+import time
+from collections import deque
+
+MAX_RUNNING = int(os.getenv("BIZ_JOB_WORKERS", "2"))  # crews rodando ao mesmo tempo no processo
+MAX_PER_USER = int(os.getenv("BIZ_SCHED_PER_USER", "1"))  # por usuário, enquanto outros esperam
+AGING_SECONDS = float(os.getenv("BIZ_SCHED_AGING", "300"))  # espera que iguala um usuário comum a um admin
+
+PRIORITY_ADMIN, PRIORITY_USER = 0, 1
+HISTORY_SIZE = 200
+
+
+def priority_for(role):
+    return PRIORITY_ADMIN if role == "admin" else PRIORITY_USER
+
+
+class FairScheduler:
+    """
+    Fila única do processo para as execuções. No máximo `max_running` rodam ao
+    mesmo tempo; a próxima a sair da fila é escolhida por:
+      1. prioridade (admin antes; quem espera mais que AGING_SECONDS sobe de classe);
+      2. usuário com menos execuções rodando;
+      3. usuário atendido há mais tempo (rodízio: dez pedidos de um usuário
+         não passam na frente do único pedido de outro);
+      4. pedido mais antigo.
+    Um usuário só passa de `per_user` execuções simultâneas se ninguém abaixo
+    desse limite estiver esperando; sozinho, usa todas as vagas livres.
+    """
+
+    def __init__(self, max_running=MAX_RUNNING, per_user=MAX_PER_USER, aging=AGING_SECONDS):
+        self.max_running = max(1, max_running)
+        self.per_user = max(1, per_user)
+        self.aging = aging
+        self._cond = threading.Condition()
+        self._queued = []  # [{"id", "username", "priority", "fn", "enqueued"}]
+        self._running = {}  # id -> {"username", "priority", "started"}
+        self._waits = deque(maxlen=HISTORY_SIZE)  # (prioridade, segundos na fila)
+        self._durations = deque(maxlen=HISTORY_SIZE)
+        self._counts = {"submitted": 0, "started": 0, "finished": 0}
+        self._served = {}  # usuário -> número da última admissão (rodízio)
+        for i in range(self.max_running):
+            threading.Thread(target=self._worker, daemon=True, name=f"biz-job-{i}").start()
+
+    # ------------------------------------------------------
+    # Escolha da próxima execução
+    # ------------------------------------------------------
+    def _effective_priority(self, item, now):
+        return PRIORITY_ADMIN if now - item["enqueued"] >= self.aging else item["priority"]
+
+    def _pick(self, queued, running_by_user, served, now):
+        """Índice em `queued` da próxima execução (None com a fila vazia)."""
+        best, best_key = None, None
+        for i, item in enumerate(queued):
+            running = running_by_user.get(item["username"], 0)
+            # Acima do limite por usuário só entra se ninguém abaixo dele estiver esperando
+            key = (running >= self.per_user, self._effective_priority(item, now), running,
+                   served.get(item["username"], -1), item["enqueued"])
+            if best_key is None or key < best_key:
+                best, best_key = i, key
+        return best
+
+    def _running_by_user(self):
+        counts = {}
+        for info in self._running.values():
+            counts[info["username"]] = counts.get(info["username"], 0) + 1
+        return counts
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while len(self._running) >= self.max_running or not self._queued:
+                    self._cond.wait()
+                item = self._queued.pop(self._pick(self._queued, self._running_by_user(), self._served,
+                                                   time.monotonic()))
+                self._served[item["username"]] = self._counts["started"]
+                started = time.monotonic()
+                wait = started - item["enqueued"]
+                self._running[item["id"]] = {"username": item["username"], "priority": item["priority"],
+                                             "started": started}
+                self._waits.append((item["priority"], wait))
+                self._counts["started"] += 1
+            try:
+                item["fn"](wait)
+            except Exception as e:
+                print(f"[ERRO] Execução {item['id']} terminou com erro fora do job: {e}")
+            finally:
+                with self._cond:
+                    self._running.pop(item["id"], None)
+                    self._durations.append(time.monotonic() - started)
+                    self._counts["finished"] += 1
+                    self._cond.notify_all()
+
+    # ------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------
+    def submit(self, job_id, username, priority, fn):
+        """Enfileira `fn(segundos_na_fila)`; um id já na fila ou rodando é ignorado."""
+        with self._cond:
+            if job_id in self._running or any(item["id"] == job_id for item in self._queued):
+                return False
+            self._queued.append({"id": job_id, "username": username, "priority": priority, "fn": fn,
+                                 "enqueued": time.monotonic()})
+            self._counts["submitted"] += 1
+            self._cond.notify()
+            return True
+
+    def _dispatch_order(self):
+        """Ordem em que a fila atual seria atendida, se ninguém mais chegasse."""
+        queued = list(self._queued)
+        running_by_user, served = self._running_by_user(), dict(self._served)
+        now, order = time.monotonic(), []
+        while queued:
+            item = queued.pop(self._pick(queued, running_by_user, served, now))
+            running_by_user[item["username"]] = running_by_user.get(item["username"], 0) + 1
+            served[item["username"]] = self._counts["started"] + len(order)
+            order.append(item["id"])
+        return order
+
+    def position(self, job_id):
+        """
+        (posição na fila a partir de 1, tamanho da fila, espera estimada em
+        segundos ou None) de um job ainda na fila; None se já saiu dela.
+        """
+        with self._cond:
+            order = self._dispatch_order()
+            if job_id not in order:
+                return None
+            position = order.index(job_id) + 1
+            eta = None
+            if self._durations:
+                average = sum(self._durations) / len(self._durations)
+                # Cada "onda" de max_running execuções leva uma duração média
+                eta = average * ((position - 1) // self.max_running + 1)
+            return position, len(order), eta
+
+    def snapshot(self):
+        """Estado e métricas da fila para a página de Métricas."""
+        def stats(values):
+            values = sorted(values)
+            if not values:
+                return {"p50": None, "p95": None}
+            return {"p50": round(values[len(values) // 2], 2),
+                    "p95": round(values[int(0.95 * (len(values) - 1))], 2)}
+
+        with self._cond:
+            now = time.monotonic()
+            users = {}
+            for item in self._queued:
+                users.setdefault(item["username"], {"queued": 0, "running": 0})["queued"] += 1
+            for info in self._running.values():
+                users.setdefault(info["username"], {"queued": 0, "running": 0})["running"] += 1
+            return {
+                "max_running": self.max_running,
+                "per_user": self.per_user,
+                "running": len(self._running),
+                "queued": len(self._queued),
+                "oldest_wait": round(max((now - i["enqueued"] for i in self._queued), default=0.0), 1),
+                "users": users,
+                **self._counts,
+                "wait": stats(w for _, w in self._waits),
+                "wait_admin": stats(w for p, w in self._waits if p == PRIORITY_ADMIN),
+                "run": stats(self._durations),
+            }
@@ -0,0 +1,278 @@
+# biz_similarity.py
+# Índice de similaridade entre perfis para reaproveitar análises de mercado (vetores de n-gramas com hash)
+import os
+import re
+import threading
+import unicodedata
+import zlib
+from datetime import datetime
+
+from biz_db import DB_PATH, connection
+
+ENABLED = os.getenv("BIZ_SIMILARITY", "1") != "0"
+DIM = 256  # 256 float32 = 1 KiB por execução; 50 mil execuções cabem em ~50 MB
+REUSE_THRESHOLD = float(os.getenv("BIZ_SIMILARITY_REUSE", "0.97"))      # reaproveita a análise inteira
+CONTEXT_THRESHOLD = float(os.getenv("BIZ_SIMILARITY_CONTEXT", "0.85"))  # vira ponto de partida do agente
+# "user": só as análises do próprio usuário (cópia ou contexto); "global": as de
+# outros usuários também entram, mas só como contexto (a cópia exige o mesmo dono)
+SCOPE = os.getenv("BIZ_SIMILARITY_SCOPE", "user")
+
+# Campos que aproximam perfis; nome da empresa e números ficam de fora do vetor
+PROFILE_FIELDS = ("segmento", "publico_alvo", "modelo_receita")
+# O agente também recebe os números (profile_brief): a cópia literal só vale se forem iguais
+NUMBER_FIELDS = ("ticket_medio", "custo_medio_mensal", "meta_12m")
+
+_RE_WORD = re.compile(r"\w+")
+
+
+# ==========================================================
+# 🔤 Vetorização
+# ==========================================================
+def normalize(text):
+    """Minúsculas e sem acentos ("Alimentação" == "alimentacao")."""
+    text = unicodedata.normalize("NFKD", str(text or "").lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def profile_text(profile_data):
+    return " | ".join(normalize(profile_data.get(field, "")) for field in PROFILE_FIELDS)
+
+
+def profile_numbers(profile_data):
+    """Números do perfil em forma canônica (100 == "100.0"; texto livre normalizado)."""
+    parts = []
+    for field in NUMBER_FIELDS:
+        value = profile_data.get(field, "")
+        try:
+            parts.append(f"{float(value):.2f}")
+        except (TypeError, ValueError):
+            parts.append(" ".join(normalize(value).split()))
+    return "|".join(parts)
+
+
+def _features(text):
+    # Palavras (peso 2) + trigramas de caracteres de cada palavra (tolera plural, typos)
+    for word in _RE_WORD.findall(text):
+        yield f"w:{word}", 2.0
+        padded = f"<{word}>"
+        for i in range(len(padded) - 2):
+            yield padded[i:i + 3], 1.0
+
+
+def vectorize(text, dim=DIM):
+    """Vetor float32 L2-normalizado (hashing trick com sinal; crc32 é estável entre processos)."""
+    import numpy as np
+
+    vec = np.zeros(dim, dtype=np.float32)
+    for feature, weight in _features(text):
+        h = zlib.crc32(feature.encode("utf-8"))
+        vec[h % dim] += weight if h & 0x80000000 else -weight
+    norm = float(np.linalg.norm(vec))
+    return vec / norm if norm else vec
+
+
+# ==========================================================
+# 🗂️ Índice em memória (matrizes NumPy) espelhado no SQLite
+# ==========================================================
+def segment_key(text):
+    """Segmento normalizado de um `profile_text` (o balde onde o perfil é procurado)."""
+    return " ".join(text.split(" | ", 1)[0].split())
+
+
+class _Bucket:
+    """Perfis de um mesmo (dono, segmento): matriz contígua que cresce dobrando."""
+
+    def __init__(self, dim):
+        import numpy as np
+
+        self.matrix = np.zeros((16, dim), dtype=np.float32)
+        self.meta = []  # (caminho, nome da empresa, usuário, números) por linha
+        self.rows = {}  # texto normalizado -> linha
+        self.size = 0
+
+    def append(self, vec, text, meta):
+        import numpy as np
+
+        row = self.rows.get(text)
+        if row is not None:
+            self.meta[row] = meta
+            return
+        if self.size == len(self.matrix):
+            # Capacidade dobra: inserções em O(1) amortizado
+            matrix = np.zeros((len(self.matrix) * 2, self.matrix.shape[1]), dtype=np.float32)
+            matrix[:self.size] = self.matrix[:self.size]
+            self.matrix = matrix
+        self.matrix[self.size] = vec
+        self.meta.append(meta)
+        self.rows[text] = self.size
+        self.size += 1
+
+    def remove(self, paths):
+        """Tira as linhas cujas análises estão em `paths`, compactando a matriz."""
+        keep = [i for i in range(self.size) if self.meta[i][0] not in paths]
+        if len(keep) == self.size:
+            return
+        moved = {old: new for new, old in enumerate(keep)}
+        self.matrix[:len(keep)] = self.matrix[keep]
+        self.meta = [self.meta[i] for i in keep]
+        self.rows = {text: moved[row] for text, row in self.rows.items() if row in moved}
+        self.size = len(keep)
+
+
+class SimilarityIndex:
+    """
+    Perfis já analisados e onde está a análise de mercado de cada um. Os
+    vetores ficam em memória, separados por (dono, segmento normalizado): a
+    busca é um produto matriz×vetor só no balde do perfil consultado, em vez
+    da base inteira (perfis de segmentos diferentes não passam dos limiares).
+    Perfis com o mesmo texto normalizado (ex.: só o nome da empresa muda)
+    ocupam uma única linha, apontando para a análise mais recente (por
+    usuário, se `per_user`).
+    """
+
+    def __init__(self, db_path=DB_PATH, dim=DIM, per_user=SCOPE == "user"):
+        import numpy as np
+
+        self.db_path = db_path
+        self.dim = dim
+        self.per_user = per_user
+        self._lock = threading.Lock()
+        with connection(db_path) as conn:
+            rows = conn.execute(
+                "SELECT output_path, username, nome_empresa, profile_text, numbers, vector FROM market_index "
+                "ORDER BY created_at"
+            ).fetchall()
+        self._owner_codes = {}
+        self._buckets = {}  # (dono, segmento) -> _Bucket
+        for r in rows:
+            self._append(np.frombuffer(r["vector"], dtype=np.float32), r["output_path"], r["username"],
+                         r["nome_empresa"], r["profile_text"], r["numbers"])
+
+    def _owner(self, username, create=False):
+        if not self.per_user:
+            return 0
+        if create:
+            return self._owner_codes.setdefault(username, len(self._owner_codes) + 1)
+        return self._owner_codes.get(username, -1)
+
+    def _append(self, vec, output_path, username, nome, text, numbers):
+        key = (self._owner(username, create=True), segment_key(text))
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket(self.dim)
+        bucket.append(vec, text, (output_path, nome, username, numbers))
+
+    def __len__(self):
+        return sum(bucket.size for bucket in self._buckets.values())
+
+    def add(self, output_path, username, profile_data):
+        """Indexa a análise de mercado gravada em `output_path` para o perfil."""
+        text = profile_text(profile_data)
+        numbers = profile_numbers(profile_data)
+        vec = vectorize(text, self.dim)
+        nome = profile_data.get("nome_empresa", "")
+        with connection(self.db_path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO market_index (output_path, username, nome_empresa, profile_text, numbers, "
+                "vector, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (output_path, username, nome, text, numbers, vec.tobytes(), datetime.utcnow().isoformat()),
+            )
+        with self._lock:
+            self._append(vec, output_path, username, nome, text, numbers)
+
+    def remove(self, paths):
+        """Esquece (só em memória) as análises gravadas em `paths`."""
+        paths = set(paths)
+        with self._lock:
+            for key, bucket in list(self._buckets.items()):
+                bucket.remove(paths)
+                if not bucket.size:
+                    del self._buckets[key]
+
+    def nearest(self, profile_data, username=None, min_score=CONTEXT_THRESHOLD):
+        """
+        Perfil mais parecido (com a análise ainda em disco) acima de `min_score`:
+        {"output_path", "nome_empresa", "username", "numbers", "score"} ou None.
+        Só perfis do mesmo segmento; com `per_user`, só os do `username`.
+        """
+        import numpy as np
+
+        text = profile_text(profile_data)
+        vec = vectorize(text, self.dim)
+        with self._lock:
+            bucket = self._buckets.get((self._owner(username), segment_key(text)))
+            if bucket is None or not bucket.size:
+                return None
+            scores = bucket.matrix[:bucket.size] @ vec
+            meta = bucket.meta
+        # Quase sempre o primeiro candidato serve; os seguintes só se a análise foi apagada
+        for _ in range(8):
+            i = int(np.argmax(scores))
+            if scores[i] < min_score:
+                break
+            path, nome, owner, numbers = meta[i]
+            if os.path.exists(path):
+                return {"output_path": path, "nome_empresa": nome, "username": owner, "numbers": numbers,
+                        "score": round(float(scores[i]), 4)}
+            scores[i] = -1.0
+        return None
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_similarity_index(db_path=DB_PATH):
+    """Índice único por processo (carregado do SQLite no primeiro uso)."""
+    key = os.path.abspath(db_path)
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = SimilarityIndex(db_path)
+        return _indexes[key]
+
+
+def forget_runs(username, run_dirs, db_path=DB_PATH):
+    """
+    Tira do índice (SQLite e, se já carregado, memória) as análises do usuário
+    gravadas dentro de `run_dirs`: execuções apagadas pelo Limpar.
+    """
+    prefixes = tuple(os.path.join(os.path.abspath(d), "") for d in run_dirs)
+    if not prefixes:
+        return 0
+    with connection(db_path) as conn:
+        rows = conn.execute("SELECT output_path FROM market_index WHERE username=?", (username,)).fetchall()
+        paths = [r["output_path"] for r in rows if r["output_path"].startswith(prefixes)]
+        conn.executemany("DELETE FROM market_index WHERE output_path=?", [(p,) for p in paths])
+    with _indexes_lock:
+        index = _indexes.get(os.path.abspath(db_path))
+    if index is not None and paths:
+        index.remove(paths)
+    return len(paths)
+
+
+def find_market_reference(profile_data, username=None):
+    """
+    Análise de mercado reaproveitável para o perfil: {"mode": "reuse" | "context",
+    "text", "nome_empresa", "score"} ou None. A cópia literal ("reuse") exige
+    análise do próprio usuário, com os mesmos números e similaridade acima de
+    REUSE_THRESHOLD; nos demais casos ela só orienta o agente ("context").
+    Análises de outros usuários só aparecem com BIZ_SIMILARITY_SCOPE=global.
+    """
+    match = get_similarity_index().nearest(profile_data, username)
+    if not match:
+        return None
+    try:
+        with open(match["output_path"], "r", encoding="utf-8") as f:
+            text = f.read()
+    except OSError:
+        # Execução apagada (Limpar) entre a busca e a leitura: segue sem referência
+        return None
+    reuse = (match["score"] >= REUSE_THRESHOLD and username is not None and match["username"] == username
+             and match["numbers"] == profile_numbers(profile_data))
+    novo = profile_data.get("nome_empresa", "")
+    if reuse and match["nome_empresa"] and novo:
+        # Só o nome inteiro ("Alfa" não vira nada dentro de "Alfabeto")
+        text = re.sub(rf"(?<!\w){re.escape(match['nome_empresa'])}(?!\w)", lambda _: novo, text)
+    match["text"] = text
+    match["mode"] = "reuse" if reuse else "context"
+    return match
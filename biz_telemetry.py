@@ -0,0 +1,120 @@
+# biz_telemetry.py
+# Telemetria por execução: tempo, chamadas ao LLM, tokens, custo e conversão de PDF (SQLite)
+import json
+import os
+from datetime import datetime, timedelta
+
+from biz_db import DB_PATH, connection
+
+# US$ por 1M de tokens (entrada, saída); BIZ_MODEL_PRICES='{"modelo": [in, out]}' sobrescreve
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+}
+MODEL_PRICES.update({k: tuple(v) for k, v in json.loads(os.getenv("BIZ_MODEL_PRICES", "{}")).items()})
+
+INSERT_SQL = (
+    "INSERT INTO metrics (run_id, username, kind, name, seconds, llm_calls, prompt_tokens, "
+    "completion_tokens, retries, cost_usd, status, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    """Custo estimado em US$ (0 para modelos sem preço conhecido)."""
+    price_in, price_out = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * price_in + completion_tokens * price_out) / 1e6
+
+
+# ==========================================================
+# 📝 Gravação
+# ==========================================================
+def record_run(run_id, username, timings, status="done", db_path=DB_PATH):
+    """
+    Grava uma linha por tarefa (tempo + LLM), uma por PDF, uma da espera na
+    fila e uma da execução inteira a partir do dicionário `timings` devolvido
+    por run_pipeline.
+    """
+    now = datetime.utcnow().isoformat()
+    llm = timings.get("llm", {})
+    rows, totals = [], {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "retries": 0, "cost": 0.0}
+
+    for name, seconds in timings.get("tasks", {}).items():
+        m = llm.get(name, {})
+        cost = estimate_cost(m.get("model", ""), m.get("prompt_tokens", 0), m.get("completion_tokens", 0))
+        rows.append((run_id, username, "task", name, seconds, m.get("calls", 0), m.get("prompt_tokens", 0),
+                     m.get("completion_tokens", 0), m.get("retries", 0), cost, status, now))
+        for key in ("calls", "prompt_tokens", "completion_tokens", "retries"):
+            totals[key] += m.get(key, 0)
+        totals["cost"] += cost
+
+    for name, pdf in timings.get("pdf", {}).items():
+        rows.append((run_id, username, "pdf", name, pdf.get("seconds", 0.0), 0, 0, 0, 0, 0.0,
+                     pdf.get("status"), now))
+
+    queue = timings.get("queue")
+    if queue:
+        # Espera até o FairScheduler admitir a execução, por classe de prioridade
+        rows.append((run_id, username, "queue", queue["priority"], queue["wait"], 0, 0, 0, 0, 0.0, status, now))
+
+    rows.append((run_id, username, "run", "pipeline", timings.get("wall", 0.0), totals["calls"],
+                 totals["prompt_tokens"], totals["completion_tokens"], totals["retries"], totals["cost"],
+                 status, now))
+    with connection(db_path) as conn:
+        conn.executemany(INSERT_SQL, rows)
+
+
+# ==========================================================
+# 📊 Consultas para a página de métricas
+# ==========================================================
+def _percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    pos = (len(ordered) - 1) * q
+    low = int(pos)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+
+
+def summary(kind, days=30, db_path=DB_PATH):
+    """
+    Por nome (tarefa, PDF, classe da fila ou "pipeline"): amostras, p50/p95 de segundos e
+    médias de chamadas, tokens, tentativas refeitas e custo nos últimos `days` dias.
+    """
+    since = (datetime.utcnow() - timedelta(days=days)).isoformat()
+    with connection(db_path) as conn:
+        rows = conn.execute(
+            "SELECT name, seconds, llm_calls, prompt_tokens, completion_tokens, retries, cost_usd "
+            "FROM metrics WHERE kind=? AND created_at >= ? ORDER BY name", (kind, since)
+        ).fetchall()
+
+    groups = {}
+    for row in rows:
+        groups.setdefault(row["name"], []).append(row)
+    result = []
+    for name, items in groups.items():
+        n = len(items)
+        seconds = [r["seconds"] for r in items]
+        result.append({
+            "name": name,
+            "runs": n,
+            "p50": round(_percentile(seconds, 0.50), 3),
+            "p95": round(_percentile(seconds, 0.95), 3),
+            "llm_calls": round(sum(r["llm_calls"] for r in items) / n, 1),
+            "prompt_tokens": round(sum(r["prompt_tokens"] for r in items) / n),
+            "completion_tokens": round(sum(r["completion_tokens"] for r in items) / n),
+            "retries": round(sum(r["retries"] for r in items) / n, 2),
+            "cost_usd": round(sum(r["cost_usd"] for r in items) / n, 5),
+        })
+    return result
+
+
+def recent_runs(limit=20, db_path=DB_PATH):
+    """Últimas execuções (linha "pipeline") com totais de tokens e custo."""
+    with connection(db_path) as conn:
+        rows = conn.execute(
+            "SELECT run_id, username, seconds, llm_calls, prompt_tokens, completion_tokens, retries, "
+            "cost_usd, status, created_at FROM metrics WHERE kind='run' ORDER BY created_at DESC LIMIT ?",
+            (limit,)
+        ).fetchall()
+    return [dict(r) for r in rows]
@@ -1,4 +1,7 @@
 # biz_tools.py
+import math
+
+
 def safe_float(x):
     try:
         return float(x)
@@ -10,3 +13,137 @@ def format_currency(value, symbol="R$"):
         return f"{symbol} {float(value):,.2f}"
     except Exception:
         return f"{symbol} 0.00"
+
+
+# ==========================================================
+# 📈 Projeção financeira determinística (NumPy)
+# ==========================================================
+# Grade padrão de cenários: crescimento mensal da base de clientes,
+# churn mensal e fator aplicado ao ticket médio.
+GROWTH_RATES = (0.05, 0.10, 0.20)
+CHURN_RATES = (0.02, 0.05)
+PRICE_FACTORS = (0.9, 1.0, 1.1)
+
+
+def project_financials(ticket_medio, custo_medio_mensal, growth_rates=GROWTH_RATES,
+                       churn_rates=CHURN_RATES, price_factors=PRICE_FACTORS,
+                       months=12, clientes_iniciais=None, custo_variavel_pct=0.0):
+    """
+    Calcula, em uma única chamada vetorizada, a projeção mensal de todos os
+    cenários da grade crescimento × churn × preço.
+
+    Modelo: clientes(t) = clientes_iniciais · (1 + crescimento − churn)^(t−1);
+    receita = clientes · ticket · fator_preço; custo = custo fixo mensal +
+    custo_variavel_pct · receita. Se `clientes_iniciais` não for informado,
+    parte-se de metade dos clientes necessários para o breakeven no preço base.
+
+    Retorna um dicionário com a grade de cenários (S × 3) e matrizes S × meses
+    de clientes, receita, custo, margem e caixa acumulado, além do mês de
+    breakeven operacional e de payback de cada cenário (0 = não atingido).
+    """
+    import numpy as np  # só quem projeta paga o import (o login usa apenas safe_float)
+
+    ticket = max(safe_float(ticket_medio), 0.0)
+    custo_fixo = max(safe_float(custo_medio_mensal), 0.0)
+
+    if clientes_iniciais is None:
+        clientes_iniciais = math.ceil(0.5 * custo_fixo / ticket) if ticket > 0 else 0
+
+    g, c, p = np.meshgrid(
+        np.asarray(growth_rates, dtype=float),
+        np.asarray(churn_rates, dtype=float),
+        np.asarray(price_factors, dtype=float),
+        indexing="ij",
+    )
+    cenarios = np.column_stack([g.ravel(), c.ravel(), p.ravel()])
+
+    t = np.arange(months, dtype=float)
+    fator = np.maximum(1.0 + cenarios[:, 0] - cenarios[:, 1], 0.0)
+    clientes = float(clientes_iniciais) * fator[:, None] ** t[None, :]
+    receita = clientes * (ticket * cenarios[:, 2])[:, None]
+    custo = custo_fixo + custo_variavel_pct * receita
+    margem = receita - custo
+    caixa = np.cumsum(margem, axis=1)
+
+    def primeiro_mes(mask):
+        # argmax devolve o primeiro True; linhas sem True ficam com 0
+        return np.where(mask.any(axis=1), mask.argmax(axis=1) + 1, 0)
+
+    return {
+        "meses": months,
+        "ticket_medio": ticket,
+        "custo_medio_mensal": custo_fixo,
+        "clientes_iniciais": int(clientes_iniciais),
+        "cenarios": cenarios,
+        "clientes": clientes,
+        "receita": receita,
+        "custo": custo,
+        "margem": margem,
+        "caixa_acumulado": caixa,
+        "breakeven_mes": primeiro_mes(margem >= 0),
+        "payback_mes": primeiro_mes(caixa >= 0),
+    }
+
+
+def base_scenario_index(projection):
+    """Índice do cenário base: crescimento mediano, menor churn e preço 1.0."""
+    import numpy as np
+
+    cenarios = projection["cenarios"]
+    growth = np.unique(cenarios[:, 0])
+    target = np.array([growth[len(growth) // 2], cenarios[:, 1].min(), 1.0])
+    return int(np.abs(cenarios - target).sum(axis=1).argmin())
+
+
+def _mes_label(mes):
+    return f"Mês {mes}" if mes else "Não atingido"
+
+
+def projection_to_markdown(projection):
+    """
+    Formata a projeção em tabelas Markdown: resumo de todos os cenários e o
+    detalhamento mensal do cenário base.
+    """
+    cenarios = projection["cenarios"]
+    receita_total = projection["receita"].sum(axis=1)
+    custo_total = projection["custo"].sum(axis=1)
+    margem_total = projection["margem"].sum(axis=1)
+    caixa_final = projection["caixa_acumulado"][:, -1]
+
+    linhas = [
+        f"Premissas: ticket médio {format_currency(projection['ticket_medio'])}, "
+        f"custo mensal {format_currency(projection['custo_medio_mensal'])}, "
+        f"{projection['clientes_iniciais']} clientes no mês 1.",
+        "",
+        f"#### Cenários ({projection['meses']} meses)",
+        "",
+        "| Crescimento | Churn | Preço | Receita | Custos | Margem | Margem % | Breakeven | Payback |",
+        "|---|---|---|---|---|---|---|---|---|",
+    ]
+    for i, (g, c, p) in enumerate(cenarios):
+        margem_pct = margem_total[i] / receita_total[i] * 100 if receita_total[i] else 0.0
+        linhas.append(
+            f"| {g:.0%} | {c:.0%} | {p:.0%} | {format_currency(receita_total[i])} | "
+            f"{format_currency(custo_total[i])} | {format_currency(margem_total[i])} | "
+            f"{margem_pct:.1f}% | {_mes_label(projection['breakeven_mes'][i])} | "
+            f"{_mes_label(projection['payback_mes'][i])} |"
+        )
+
+    base = base_scenario_index(projection)
+    g, c, p = cenarios[base]
+    linhas += [
+        "",
+        f"#### Cenário base mês a mês (crescimento {g:.0%}, churn {c:.0%}, preço {p:.0%})",
+        "",
+        "| Mês | Clientes | Receita | Custos | Margem | Caixa acumulado |",
+        "|---|---|---|---|---|---|",
+    ]
+    for m in range(projection["meses"]):
+        linhas.append(
+            f"| {m + 1} | {projection['clientes'][base, m]:.0f} | "
+            f"{format_currency(projection['receita'][base, m])} | "
+            f"{format_currency(projection['custo'][base, m])} | "
+            f"{format_currency(projection['margem'][base, m])} | "
+            f"{format_currency(projection['caixa_acumulado'][base, m])} |"
+        )
+    return "\n".join(linhas)
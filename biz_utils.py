@@ -1,16 +1,16 @@
 # biz_utils.py
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
-from reportlab.lib.enums import TA_LEFT, TA_CENTER
-from reportlab.lib import colors
-from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, ListFlowable, ListItem, Image
-)
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.cidfonts import UnicodeCIDFont
-from datetime import datetime
+# Arquivos, tokenizador de Markdown e exportação memorizada (sem reportlab no import)
+import hashlib
 import os
 import re
+import shutil
+import threading
+import time
+
+# Alterar sempre que o layout do PDF mudar: invalida os PDFs memorizados
+TEMPLATE_VERSION = "2"
+PDF_CACHE_DIR = os.path.join("biz_output", ".pdf_cache")
+PDF_CACHE_MAX_BYTES = int(os.getenv("BIZ_PDF_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
 
 
 # ==========================================================
@@ -45,120 +45,398 @@ def save_markdown(file_path, content):
         return False
 
 
+# ==========================================================
+# 🔎 Tokenizador de Markdown (uma única passada)
+# ==========================================================
+_RE_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_RE_LIST_ITEM = re.compile(r"^([ \t]*)([-*+]|\d{1,3}[.)])\s+(.*)$")
+_RE_FENCE = re.compile(r"^\s*(```|~~~)")
+_RE_TABLE_SEP = re.compile(r"^\s*\|?\s*:?-{2,}:?\s*(\|\s*:?-{2,}:?\s*)*\|?\s*$")
+_RE_HRULE = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+_RE_INLINE = re.compile(
+    r"(\*\*|__)(?=\S)(.+?)(?<=\S)\1"                      # negrito
+    r"|(?<![\w*])([*_])(?=[^\s*_])(.+?)(?<=[^\s*_])\3(?![\w*])"  # itálico (não quebra snake_case)
+    r"|`([^`]+)`"                                         # código inline
+)
+_RE_NEEDS_MARKUP = re.compile(r"[*_`\\&<>]")
+_RE_LATEX = re.compile(
+    r"\\text\{([^}]*)\}|\\frac\{([^}]*)\}\{([^}]*)\}|\\times|\\[\[\]()]|\\"
+)
+
+
+def _latex_sub(m):
+    if m.group(1) is not None:
+        return m.group(1)
+    if m.group(2) is not None:
+        return f"({m.group(2)} / {m.group(3)})"
+    return "×" if m.group(0) == "\\times" else ""
+
+
+def _inline_sub(m):
+    if m.group(2) is not None:
+        return f"<b>{m.group(2)}</b>"
+    if m.group(4) is not None:
+        return f"<i>{m.group(4)}</i>"
+    return f'<font face="Courier">{m.group(5)}</font>'
+
+
+def format_inline(text):
+    """Escapa o texto para o reportlab e aplica negrito/itálico/código e limpeza de LaTeX."""
+    text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return _RE_INLINE.sub(_inline_sub, _RE_LATEX.sub(_latex_sub, text))
+
+
+def _split_row(line):
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|"):
+        line = line[:-1]
+    return [cell.strip() for cell in line.split("|")]
+
+
+def tokenize_markdown(lines):
+    """
+    Converte linhas de Markdown em blocos, em uma única passada:
+    ("heading", nível, texto), ("list_item", recuo, ordenada, texto),
+    ("paragraph", texto), ("code", texto), ("table", cabeçalho, linhas),
+    ("hr",) e ("blank",). O texto dos blocos ainda não tem formatação inline.
+    """
+    para, code, table = [], None, None
+    pending = None  # possível cabeçalho de tabela aguardando a linha separadora
+
+    def flush_para():
+        if para:
+            text = " ".join(para)
+            para.clear()
+            return ("paragraph", text)
+        return None
+
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+
+        # Bloco de código cercado
+        if code is not None:
+            if _RE_FENCE.match(line):
+                yield ("code", "\n".join(code))
+                code = None
+            else:
+                code.append(line)
+            continue
+
+        stripped = line.strip()
+
+        # Tabela em andamento
+        if table is not None:
+            if stripped.startswith("|") or ("|" in stripped and stripped):
+                table[1].append(_split_row(stripped))
+                continue
+            yield ("table", table[0], table[1])
+            table = None
+
+        if pending is not None:
+            if _RE_TABLE_SEP.match(stripped):
+                table = (_split_row(pending), [])
+                pending = None
+                continue
+            para.append(pending)
+            pending = None
+
+        if not stripped:
+            block = flush_para()
+            if block:
+                yield block
+            yield ("blank",)
+            continue
+
+        if _RE_FENCE.match(line):
+            block = flush_para()
+            if block:
+                yield block
+            code = []
+            continue
+
+        m = _RE_HEADING.match(stripped)
+        if m:
+            block = flush_para()
+            if block:
+                yield block
+            yield ("heading", len(m.group(1)), m.group(2))
+            continue
+
+        if _RE_HRULE.match(stripped):
+            block = flush_para()
+            if block:
+                yield block
+            yield ("hr",)
+            continue
+
+        m = _RE_LIST_ITEM.match(line)
+        if m:
+            block = flush_para()
+            if block:
+                yield block
+            indent = len(m.group(1).expandtabs(4))
+            yield ("list_item", indent, m.group(2)[0].isdigit(), m.group(3))
+            continue
+
+        if "|" in stripped:
+            block = flush_para()
+            if block:
+                yield block
+            pending = stripped
+            continue
+
+        para.append(stripped)
+
+    if pending is not None:
+        para.append(pending)
+    if code is not None:
+        yield ("code", "\n".join(code))
+    if table is not None:
+        yield ("table", table[0], table[1])
+    block = flush_para()
+    if block:
+        yield block
+
+
 # ==========================================================
 # 📄 Função: Converter Markdown para PDF (formatação completa)
 # ==========================================================
 def convert_md_to_pdf(md_path, pdf_path):
+    """Converte Markdown (.md) para PDF; o reportlab só é importado aqui (ver biz_pdf)."""
+    from biz_pdf import convert_md_to_pdf as _convert
+    return _convert(md_path, pdf_path)
+
+
+def convert_to_pdf(source_path, pdf_path):
+    """Estrutura validada (.json, biz_report.Document) ou Markdown (.md) -> PDF."""
+    if source_path.endswith(".json"):
+        from biz_pdf import convert_report_to_pdf
+        return convert_report_to_pdf(source_path, pdf_path)
+    return convert_md_to_pdf(source_path, pdf_path)
+
+
+# ==========================================================
+# ♻️ Exportação memorizada por hash do conteúdo
+# ==========================================================
+_export_lock = threading.Lock()
+_export_stats = {"converted": 0, "reused": 0, "failed": 0, "seconds": 0.0}
+
+
+_RE_DIGEST = re.compile(r"[0-9a-f]{64}")
+
+
+def _hash_sidecar(pdf_path):
+    folder, name = os.path.split(pdf_path)
+    return os.path.join(folder, f".{name}.sha256")
+
+
+def _read_sidecar(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def _write_sidecar(path, digest):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(digest)
+
+
+def export_pdf(md_path, pdf_path, cache_dir=PDF_CACHE_DIR, force=False):
     """
-    Converte Markdown (.md) para PDF com layout hierárquico e visual aprimorado.
-    Suporta:
-    - Cabeçalho e rodapé com logo
-    - Títulos coloridos (#, ##, ###)
-    - Listas e sublistas aninhadas
-    - Texto em negrito e itálico
+    Gera o PDF apenas se o Markdown (+ versão do template) mudou.
+    O hash do conteúdo fica ao lado do PDF e os PDFs já gerados ficam em
+    `cache_dir/<hash>.pdf`, então o mesmo Markdown nunca é convertido duas vezes.
+    `md_path` também pode ser a estrutura do documento (.json, ver convert_to_pdf).
+
+    Retorna {"status": "reused" | "converted" | "failed", "seconds": float, "hash": str}.
     """
+    started = time.perf_counter()
+    result, digest = _try_reuse(md_path, pdf_path, cache_dir, force, started)
+    if result:
+        return result
+    result = _convert_and_store(md_path, pdf_path, digest, cache_dir)
+    return _record_export(result["status"], started, digest)
+
+
+def _try_reuse(md_path, pdf_path, cache_dir, force, started):
+    """(resultado, hash): resultado só vem preenchido se não há o que converter."""
     try:
-        if not os.path.exists(md_path):
-            print(f"[ERRO] Arquivo não encontrado: {md_path}")
-            return False
-
-        with open(md_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-
-        pdfmetrics.registerFont(UnicodeCIDFont('HeiseiMin-W3'))
-
-        doc = SimpleDocTemplate(
-            pdf_path,
-            pagesize=A4,
-            rightMargin=50,
-            leftMargin=50,
-            topMargin=80,
-            bottomMargin=60
-        )
-
-        styles = getSampleStyleSheet()
-        normal = ParagraphStyle('Normal', parent=styles['Normal'], fontName='HeiseiMin-W3', fontSize=11, leading=16)
-        h1 = ParagraphStyle('Heading1', fontName='HeiseiMin-W3', textColor=colors.HexColor("#004085"), fontSize=18, spaceAfter=12)
-        h2 = ParagraphStyle('Heading2', fontName='HeiseiMin-W3', textColor=colors.HexColor("#007bff"), fontSize=14, spaceAfter=8)
-        h3 = ParagraphStyle('Heading3', fontName='HeiseiMin-W3', textColor=colors.HexColor("#0d6efd"), fontSize=12, spaceAfter=6)
-        bullet = ParagraphStyle('Bullet', parent=styles['Normal'], fontName='HeiseiMin-W3', fontSize=11, leftIndent=20, leading=14)
-        subbullet = ParagraphStyle('SubBullet', parent=styles['Normal'], fontName='HeiseiMin-W3', fontSize=10, leftIndent=40, leading=13)
-        gray = ParagraphStyle('GrayText', fontName='HeiseiMin-W3', textColor=colors.gray, fontSize=9, alignment=TA_CENTER)
-
-        story = []
-
-        # Cabeçalho e Rodapé
-        def header_footer(canvas, doc):
-            canvas.saveState()
-            width, height = A4
-
-            logo_path = os.path.join("Img", "logoAI.png")
-            if os.path.exists(logo_path):
-                canvas.drawImage(logo_path, 40, height - 70, width=60, height=60, mask='auto')
-
-            canvas.setFont("Helvetica-Bold", 12)
-            canvas.setFillColor(colors.HexColor("#004085"))
-            canvas.drawString(120, height - 40, "AgentAI Biz - Plano de Negócio")
-
-            canvas.setFont("Helvetica", 9)
-            canvas.setFillColor(colors.black)
-            data_str = datetime.now().strftime("%d/%m/%Y - %H:%M")
-            canvas.drawRightString(width - 50, height - 40, f"Gerado em: {data_str}")
-
-            canvas.setFont("Helvetica-Oblique", 8)
-            canvas.setFillColor(colors.gray)
-            canvas.drawCentredString(width / 2, 30, f"Página {doc.page} • AgentAI Biz © 2025")
-            canvas.restoreState()
-
-        # Conversão de Markdown para elementos PDF
-        list_stack = []  # controla subníveis
-        for raw_line in lines:
-            line = raw_line.rstrip()
-
-            # Remove e converte negrito e itálico
-            line = re.sub(r"\*\*(.*?)\*\*", r"<b>\1</b>", line)
-            line = re.sub(r"_(.*?)_", r"<i>\1</i>", line)
-
-            if not line:
-                story.append(Spacer(1, 8))
-                continue
+        with open(md_path, "rb") as f:
+            digest = hashlib.sha256(TEMPLATE_VERSION.encode() + b"\0" + f.read()).hexdigest()
+    except OSError as e:
+        print(f"[ERRO] Arquivo não encontrado: {md_path} ({e})")
+        return _record_export("failed", started, ""), ""
 
-            # Títulos hierárquicos
-            if line.startswith("# "):
-                story.append(Paragraph(line[2:], h1))
-            elif line.startswith("## "):
-                story.append(Paragraph(line[3:], h2))
-            elif line.startswith("### "):
-                story.append(Paragraph(line[4:], h3))
-            elif re.match(r"^\s*-\s+", line) or re.match(r"^\s*\*\s+", line):
-                # Calcula nível de recuo
-                indent_level = len(line) - len(line.lstrip())
-                content = line.strip("-* ").strip()
-
-                # Determina estilo com base no recuo
-                style = bullet if indent_level < 4 else subbullet
-                story.append(Paragraph(f"• {content}", style))
-            else:
-                # Limpeza de expressões LaTeX (\[ ... \], \( ... \), \text{})
-                line = re.sub(r"\\\\\[|\\\\\]", "", line)  # remove \[ e \]
-                line = re.sub(r"\\\\\(|\\\\\)", "", line)  # remove \( e \)
-                line = re.sub(r"\\\\text\{(.*?)\}", r"\1", line)  # mantém apenas o texto dentro de \text{}
-                line = re.sub(r"\\times", "×", line)  # substitui \times pelo símbolo multiplicar
-                line = re.sub(r"\\frac\{(.*?)\}\{(.*?)\}", r"(\1 / \2)", line)  # converte frações básicas
-                line = re.sub(r"\\", "", line)  # remove barras invertidas restantes
+    if not force:
+        sidecar = _hash_sidecar(pdf_path)
+        if os.path.exists(pdf_path) and _read_sidecar(sidecar) == digest:
+            return _record_export("reused", started, digest), digest
+        cached_pdf = os.path.join(cache_dir, f"{digest}.pdf") if cache_dir else None
+        if cached_pdf and os.path.exists(cached_pdf):
+            try:
+                shutil.copyfile(cached_pdf, pdf_path)
+                os.utime(cached_pdf)  # mtime = último uso (base da poda em prune_pdf_cache)
+            except OSError:
+                # Podado (ou apagado pelo Limpar) entre a checagem e a cópia: converte
+                return None, digest
+            _write_sidecar(sidecar, digest)
+            return _record_export("reused", started, digest), digest
+    return None, digest
 
-                story.append(Paragraph(line, normal))
 
-        story.append(Spacer(1, 20))
-        story.append(Paragraph("🧠 Relatório gerado automaticamente pelo AgentAI Biz", gray))
+def _convert_and_store(md_path, pdf_path, digest, cache_dir):
+    """Converte e grava hash + cópia no cache. Roda no processo atual ou num worker do pool."""
+    started = time.perf_counter()
+    if not convert_to_pdf(md_path, pdf_path):
+        return {"status": "failed", "seconds": round(time.perf_counter() - started, 4), "hash": digest}
+    _write_sidecar(_hash_sidecar(pdf_path), digest)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        shutil.copyfile(pdf_path, os.path.join(cache_dir, f"{digest}.pdf"))
+        prune_pdf_cache(cache_dir)
+    return {"status": "converted", "seconds": round(time.perf_counter() - started, 4), "hash": digest}
 
-        doc.build(story, onFirstPage=header_footer, onLaterPages=header_footer)
-        print(f"[OK] PDF gerado com sucesso: {pdf_path}")
-        return True
 
-    except Exception as e:
-        print(f"[ERRO] Falha ao converter {md_path} para PDF: {e}")
-        return False
+def prune_pdf_cache(cache_dir=PDF_CACHE_DIR, max_bytes=PDF_CACHE_MAX_BYTES):
+    """
+    Mantém o cache de PDFs abaixo de `max_bytes`: saem primeiro os usados há
+    mais tempo (o reaproveitamento renova o mtime). Retorna quantos saíram.
+    """
+    files = []
+    try:
+        with os.scandir(cache_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".pdf"):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    files.append((st.st_mtime, st.st_size, entry.path))
+    except OSError:
+        return 0
+    total = sum(size for _, size, _ in files)
+    removed = 0
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError:
+            pass  # outro processo já podou
+        total -= size
+    return removed
+
+
+def forget_cached_pdfs(run_dir, cache_dir=PDF_CACHE_DIR):
+    """
+    Apaga do cache os PDFs desta execução (o hash de cada um está no
+    `.<pdf>.sha256` ao lado dele). Usado quando o usuário limpa as execuções.
+    """
+    removed = 0
+    try:
+        names = os.listdir(run_dir)
+    except OSError:
+        return 0
+    for name in names:
+        if not (name.startswith(".") and name.endswith(".pdf.sha256")):
+            continue
+        digest = _read_sidecar(os.path.join(run_dir, name))
+        if not _RE_DIGEST.fullmatch(digest):
+            continue
+        try:
+            os.remove(os.path.join(cache_dir, f"{digest}.pdf"))
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def _record_export(status, started, digest):
+    seconds = time.perf_counter() - started
+    with _export_lock:
+        _export_stats[status] += 1
+        _export_stats["seconds"] += seconds
+    return {"status": status, "seconds": round(seconds, 4), "hash": digest}
+
+
+def export_stats():
+    """Contadores acumulados do processo (conversões, reaproveitamentos, tempo)."""
+    with _export_lock:
+        return dict(_export_stats)
+
+
+# ==========================================================
+# 🏭 Exportação em paralelo (pool de processos)
+# ==========================================================
+# O layout do reportlab é CPU puro e segura o GIL: threads não ajudam. Cada
+# worker registra a fonte uma vez e atende todas as execuções (app e lote).
+PDF_WORKERS = int(os.getenv("BIZ_PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+
+def _init_pdf_worker():
+    from biz_pdf import _pdf_styles
+
+    _pdf_styles()
+
+
+def get_pdf_pool():
+    """Pool único por processo (criado no primeiro uso); None com BIZ_PDF_WORKERS <= 1."""
+    global _pdf_pool
+    if PDF_WORKERS <= 1:
+        return None
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            from multiprocessing import get_context
+
+            # spawn: o app tem threads (Streamlit, jobs) e fork copiaria locks presos
+            _pdf_pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=get_context("spawn"),
+                                            initializer=_init_pdf_worker)
+        return _pdf_pool
+
+
+def submit_export(md_path, pdf_path, cache_dir=PDF_CACHE_DIR, force=False):
+    """
+    Versão assíncrona de export_pdf: o reaproveitamento é decidido aqui e só
+    a conversão vai para o pool. Devolve um Future com o mesmo dicionário.
+    """
+    from concurrent.futures import Future
+
+    started = time.perf_counter()
+    result, digest = _try_reuse(md_path, pdf_path, cache_dir, force, started)
+    pool = None if result else get_pdf_pool()
+    if pool is None:
+        if not result:
+            result = _convert_and_store(md_path, pdf_path, digest, cache_dir)
+            _record_export(result["status"], started, digest)
+        future = Future()
+        future.set_result(result)
+        return future
+
+    def record(worker_future):
+        # Contadores do processo principal (os do worker ficam lá)
+        status = "failed" if worker_future.exception() else worker_future.result()["status"]
+        _record_export(status, started, digest)
+
+    future = pool.submit(_convert_and_store, md_path, pdf_path, digest, cache_dir)
+    future.add_done_callback(record)
+    return future
+
+
+def export_many(jobs, cache_dir=PDF_CACHE_DIR, force=False):
+    """
+    Envia [(md, pdf)] ao pool de uma vez; devolve {pdf: Future}. O tempo total
+    fica próximo ao do maior documento, não à soma.
+    """
+    return {pdf_path: submit_export(md_path, pdf_path, cache_dir, force) for md_path, pdf_path in jobs}
 
 
 # ==========================================================
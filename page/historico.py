@@ -0,0 +1,81 @@
+import streamlit as st
+
+from biz_files import paginate, split_sections
+from biz_history import get_plan, history_stats, search_plans
+
+DOCUMENT_LABELS = {
+    "plano_negocios.md": "📝 Plano de Negócios",
+    "resumo_executivo.md": "📄 Resumo Executivo",
+    "pitch_deck.md": "📊 Pitch Deck",
+}
+
+
+def _size(n):
+    return f"{n / 1024:.1f} KB" if n >= 1024 else f"{n} B"
+
+
+def _render_plan(plan):
+    profile = plan["profile"]
+    st.subheader(f"📂 {profile.get('nome_empresa', 'Plano')} — {plan['created_at'][:16].replace('T', ' ')}")
+    st.caption(f"Segmento: {profile.get('segmento', '-')} · Público: {profile.get('publico_alvo', '-')}")
+    if st.button("✖️ Fechar", key="hist_close"):
+        st.session_state.pop("hist_plan_id", None)
+        st.rerun()
+
+    names = [n for n in DOCUMENT_LABELS if n in plan["documents"]]
+    tabs = st.tabs([DOCUMENT_LABELS[n] for n in names])
+    for tab, name in zip(tabs, names):
+        with tab:
+            text = plan["documents"][name]
+            pages = paginate(split_sections(text))
+            if not pages:
+                st.info("Este documento foi arquivado vazio.")
+            else:
+                page = 0
+                if len(pages) > 1:
+                    page = st.selectbox(
+                        "Seção", range(len(pages)), key=f"hist_page_{plan['id']}_{name}",
+                        format_func=lambda i, pages=pages: f"{i + 1}/{len(pages)} — {pages[i][0]}",
+                    )
+                st.markdown(pages[page][1], unsafe_allow_html=True)
+            st.download_button(
+                "⬇️ Baixar Markdown", text.encode("utf-8"), file_name=name,
+                mime="text/markdown", key=f"hist_dl_{plan['id']}_{name}",
+            )
+
+
+def render_historico():
+    st.markdown("<h2 style='text-align: center; color: white;'>🕘 Histórico de planos</h2>", unsafe_allow_html=True)
+    username = st.session_state["username"]
+
+    stats = history_stats(username)
+    if not stats["plans"]:
+        st.info("Nenhum plano arquivado ainda. Cada execução concluída entra aqui (o botão Limpar não apaga o histórico).")
+        return
+    st.caption(f"{stats['plans']} plano(s) · {_size(stats['raw'])} de texto guardados em {_size(stats['stored'])}")
+
+    plan_id = st.session_state.get("hist_plan_id")
+    if plan_id:
+        plan = get_plan(plan_id, username)
+        if plan:
+            _render_plan(plan)
+            return
+        st.session_state.pop("hist_plan_id", None)
+
+    text = st.text_input("🔎 Buscar nos planos", placeholder="ex.: assinatura breakeven franq*", key="hist_query")
+    results = search_plans(username, text)
+    if not results:
+        st.warning("Nenhum plano encontrado para essa busca.")
+        return
+
+    for r in results:
+        with st.container(border=True):
+            col1, col2 = st.columns([5, 1])
+            with col1:
+                st.markdown(f"**{r['nome_empresa'] or 'Sem nome'}** · {r['segmento'] or '-'} · "
+                            f"{r['created_at'][:16].replace('T', ' ')}")
+                st.caption(r["snippet"])
+            with col2:
+                if st.button("📂 Abrir", key=f"hist_open_{r['id']}"):
+                    st.session_state["hist_plan_id"] = r["id"]
+                    st.rerun()
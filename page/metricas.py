@@ -0,0 +1,93 @@
+import streamlit as st
+
+from biz_pipeline import TASK_LABELS
+from biz_telemetry import recent_runs, summary
+
+
+def _chart(rows, label_of=lambda name: name):
+    import pandas as pd
+
+    df = pd.DataFrame([{"item": label_of(r["name"]), "p50 (s)": r["p50"], "p95 (s)": r["p95"]} for r in rows])
+    st.bar_chart(df, x="item", y=["p50 (s)", "p95 (s)"], stack=False, horizontal=True)
+
+
+def _seconds(value):
+    return "-" if value is None else f"{value:.1f}s"
+
+
+def _render_queue(queue):
+    st.subheader("🚦 Fila de execuções (agora)")
+    cols = st.columns(4)
+    cols[0].metric("Rodando", f"{queue['running']}/{queue['max_running']}")
+    cols[1].metric("Na fila", queue["queued"], help=f"Espera mais antiga: {queue['oldest_wait']:.0f}s")
+    cols[2].metric("Espera p50 / p95", f"{_seconds(queue['wait']['p50'])} / {_seconds(queue['wait']['p95'])}",
+                   help="Últimas execuções admitidas desde o início do servidor")
+    cols[3].metric("Execução p50 / p95", f"{_seconds(queue['run']['p50'])} / {_seconds(queue['run']['p95'])}")
+    if queue["users"]:
+        st.dataframe(
+            [{"Usuário": user, "Rodando": n["running"], "Na fila": n["queued"]}
+             for user, n in sorted(queue["users"].items())],
+            hide_index=True,
+        )
+    st.caption(f"{queue['submitted']} pedidos, {queue['started']} admitidos e {queue['finished']} concluídos "
+               f"desde o início do servidor; até {queue['per_user']} por usuário enquanto outros esperam.")
+
+
+def render_metricas(queue=None):
+    if st.session_state.get("role") != "admin":
+        st.warning("⚠️ Página restrita a administradores.")
+        return
+
+    st.markdown("<h2 style='text-align: center; color: white;'>📊 Métricas de execução</h2>", unsafe_allow_html=True)
+    if queue:
+        _render_queue(queue)
+    days = st.select_slider("Período (dias)", options=[1, 7, 30, 90], value=30)
+
+    waits = summary("queue", days)
+    if waits:
+        st.subheader("⏳ Espera na fila")
+        _chart(waits, lambda name: {"admin": "Administradores", "user": "Usuários"}.get(name, name))
+
+    tasks = summary("task", days)
+    if not tasks:
+        st.info("Nenhuma execução registrada no período.")
+        return
+
+    st.subheader("🤖 Tarefas dos agentes")
+    _chart(tasks, lambda name: TASK_LABELS.get(name, name))
+    st.dataframe(
+        [{
+            "Tarefa": TASK_LABELS.get(r["name"], r["name"]),
+            "Execuções": r["runs"],
+            "p50 (s)": r["p50"],
+            "p95 (s)": r["p95"],
+            "Chamadas LLM": r["llm_calls"],
+            "Tokens entrada": r["prompt_tokens"],
+            "Tokens saída": r["completion_tokens"],
+            "Tentativas refeitas": r["retries"],
+            "Custo (US$)": r["cost_usd"],
+        } for r in tasks],
+        hide_index=True,
+    )
+    st.caption("Médias por execução. Tokens contados localmente (estimativa); "
+               "chamadas atendidas pelo cache não entram.")
+
+    pdfs = summary("pdf", days)
+    if pdfs:
+        st.subheader("📄 Conversão para PDF")
+        _chart(pdfs)
+
+    st.subheader("🕒 Execuções recentes")
+    st.dataframe(
+        [{
+            "Execução": r["run_id"],
+            "Usuário": r["username"],
+            "Status": r["status"],
+            "Tempo (s)": r["seconds"],
+            "Chamadas LLM": r["llm_calls"],
+            "Tokens": r["prompt_tokens"] + r["completion_tokens"],
+            "Custo (US$)": round(r["cost_usd"], 5),
+            "Quando (UTC)": r["created_at"][:19].replace("T", " "),
+        } for r in recent_runs()],
+        hide_index=True,
+    )
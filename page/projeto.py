@@ -1,14 +1,13 @@
 import streamlit as st
-import os
+
+from biz_files import read_text
 
 # ======================================
 # 🔧 Configurações iniciais
 # ======================================
 st.set_page_config(page_title="AgentAI Biz - Sistema de IA para Negócios", page_icon="💼", layout="wide")
 
-if os.path.exists("style.css"):
-    with open("style.css") as f:
-        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+st.markdown(f"<style>{read_text('style.css')}</style>", unsafe_allow_html=True)
 
 
 # ======================================
@@ -1,9 +1,10 @@
 import streamlit as st
 import streamlit.components.v1 as components
 
+from biz_files import read_text
+
 # Style: CSS para esconder o menu hamburger (☰) e o footer
-with open('style.css')as f:
-    st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html = True)
+st.markdown(f"<style>{read_text('style.css')}</style>", unsafe_allow_html = True)
     
 
 
@@ -0,0 +1,54 @@
+# tests/test_artifacts.py
+# Limpeza das execuções de um usuário (biz_artifacts.ArtifactIndex.delete_runs)
+import json
+import os
+
+from biz_artifacts import ArtifactIndex
+from biz_db import connection
+
+
+def _job(db_path, job_id, username, status):
+    with connection(db_path) as conn:
+        conn.execute(
+            "INSERT INTO jobs (id, username, status, profile_json, created_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, username, status, json.dumps({}), "2026-01-01T00:00:00"),
+        )
+
+
+def test_limpar_mantem_jobs_na_fila_ou_rodando(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db_path = str(tmp_path / "biz.db")
+    index = ArtifactIndex(str(tmp_path / "out"), db_path=db_path)
+    for job_id, username, status in [("a", "ana", "running"), ("b", "ana", "done"), ("c", "ana", "queued"),
+                                     ("d", "ana", "failed"), ("e", "bia", "done")]:
+        index.create_run(job_id, username, {"nome_empresa": job_id})
+        _job(db_path, job_id, username, status)
+
+    assert index.delete_runs("ana") == 2
+    with connection(db_path) as conn:
+        runs = sorted(r["id"] for r in conn.execute("SELECT id FROM runs"))
+        jobs = sorted(r["id"] for r in conn.execute("SELECT id FROM jobs"))
+    assert runs == ["a", "c", "e"]
+    assert jobs == ["a", "c", "e"]  # concluídos/falhos apagados não podem ser retomados
+    assert sorted(os.listdir(tmp_path / "out")) == ["a", "c", "e"]
+
+
+def test_limpar_tira_as_analises_do_indice_de_similaridade(tmp_path, monkeypatch):
+    from biz_similarity import SimilarityIndex
+
+    monkeypatch.chdir(tmp_path)
+    db_path = str(tmp_path / "biz.db")
+    index = ArtifactIndex(str(tmp_path / "out"), db_path=db_path)
+    profile = {"segmento": "Cafeteria", "publico_alvo": "jovens", "modelo_receita": "assinatura"}
+    index.create_run("a", "ana", profile)
+    _job(db_path, "a", "ana", "done")
+    market = os.path.join(index.run_dir("a"), "tasks", "market.md")
+    os.makedirs(os.path.dirname(market))
+    with open(market, "w", encoding="utf-8") as f:
+        f.write("análise")
+    SimilarityIndex(db_path).add(os.path.abspath(market), "ana", profile)
+
+    index.delete_runs("ana")
+    similarity = SimilarityIndex(db_path)
+    assert len(similarity) == 0
+    assert similarity.nearest(profile, "ana") is None
@@ -0,0 +1,56 @@
+# tests/test_cache.py
+# Cache de respostas do LLM (biz_cache): chave, TTL e remoção LRU
+import biz_cache
+from biz_cache import LLMCache, make_key
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _cache(tmp_path, monkeypatch, **kwargs):
+    clock = _Clock()
+    monkeypatch.setattr(biz_cache.time, "time", clock)
+    return LLMCache(db_path=str(tmp_path / "cache.db"), **kwargs), clock
+
+
+def test_entrada_expira_apos_o_ttl(tmp_path, monkeypatch):
+    cache, clock = _cache(tmp_path, monkeypatch, ttl=10)
+    cache.set("k", "m", "market", "resposta")
+    clock.now += 5
+    assert cache.get("k") == "resposta"
+    clock.now += 6
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_acima_do_limite_sai_a_menos_usada(tmp_path, monkeypatch):
+    cache, clock = _cache(tmp_path, monkeypatch, max_entries=2)
+    cache.set("a", "m", "t", "A")
+    clock.now += 1
+    cache.set("b", "m", "t", "B")
+    clock.now += 1
+    assert cache.get("a") == "A"  # "b" passa a ser a menos usada
+    clock.now += 1
+    cache.set("c", "m", "t", "C")
+    assert [cache.get(k) for k in ("a", "b", "c")] == ["A", None, "C"]
+
+
+def test_limite_em_bytes(tmp_path, monkeypatch):
+    cache, clock = _cache(tmp_path, monkeypatch, max_bytes=10)
+    cache.set("a", "m", "t", "x" * 6)
+    clock.now += 1
+    cache.set("b", "m", "t", "y" * 6)
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 6
+
+
+def test_chave_separa_rotas_com_o_mesmo_modelo():
+    key = make_key("llama3", "oi", "market", {"base_url": "http://a/v1"})
+    assert key != make_key("llama3", "oi", "market", {"base_url": "http://b/v1"})
+    assert key != make_key("llama3", "oi", "market", {"base_url": "http://a/v1", "temperature": 0.2})
+    assert make_key("llama3", " oi ", "market", {"base_url": "http://a/v1"}) == key
@@ -0,0 +1,25 @@
+# tests/test_context.py
+# Compactação extrativa (biz_context): tabelas viram "coluna: valor"
+from biz_context import _facts
+
+
+def test_tabelas_separadas_por_titulo_usam_o_proprio_cabecalho():
+    text = "\n".join([
+        "| Crescimento | Churn |",
+        "|---|---|",
+        "| 5% | 2% |",
+        "",
+        "#### Cenário base",
+        "",
+        "| Mês | Clientes |",
+        "|---|---|",
+        "| 1 | 25 |",
+    ])
+    rows = [line for _, _, line in _facts(text) if ":" in line]
+    assert rows == ["- Crescimento: 5%; Churn: 2%", "- Mês: 1; Clientes: 25"]
+
+
+def test_tabelas_separadas_por_linha_em_branco():
+    text = "| A | B |\n|---|---|\n| 1 | 2 |\n\n| C | D |\n|---|---|\n| 3 | 4 |"
+    rows = [line for _, _, line in _facts(text) if ":" in line]
+    assert rows == ["- A: 1; B: 2", "- C: 3; D: 4"]
@@ -0,0 +1,47 @@
+# tests/test_db.py
+# Migrações do esquema (biz_db.migrate)
+import sqlite3
+
+from biz_db import MIGRATIONS, _open, migrate
+
+LATEST = MIGRATIONS[-1][0]
+
+
+def _columns(conn, table):
+    return {r["name"] for r in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def test_banco_novo_chega_a_ultima_versao(tmp_path):
+    conn = _open(str(tmp_path / "novo.db"))
+    assert migrate(conn) == LATEST
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == LATEST
+    assert "numbers" in _columns(conn, "market_index")
+
+
+def test_migrar_de_novo_nao_muda_nada(tmp_path):
+    conn = _open(str(tmp_path / "novo.db"))
+    migrate(conn)
+    schema = conn.execute("SELECT name, sql FROM sqlite_master ORDER BY name").fetchall()
+    assert migrate(conn) == LATEST
+    assert conn.execute("SELECT name, sql FROM sqlite_master ORDER BY name").fetchall() == schema
+
+
+def test_passos_podem_ser_reaplicados(tmp_path):
+    # Dois processos migrando o mesmo banco antigo: cada passo tolera o esquema já aplicado
+    conn = _open(str(tmp_path / "novo.db"))
+    migrate(conn)
+    conn.execute("PRAGMA user_version = 0")
+    assert migrate(conn) == LATEST
+
+
+def test_banco_anterior_as_migracoes_mantem_os_usuarios(tmp_path):
+    path = str(tmp_path / "antigo.db")
+    legacy = sqlite3.connect(path)
+    legacy.execute("CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE NOT NULL, "
+                   "password_hash TEXT NOT NULL, salt TEXT NOT NULL, role TEXT NOT NULL DEFAULT 'user')")
+    legacy.execute("INSERT INTO users (username, password_hash, salt) VALUES ('ana', 'h', 's')")
+    legacy.commit()
+    legacy.close()
+    conn = _open(path)
+    assert migrate(conn) == LATEST
+    assert conn.execute("SELECT username FROM users").fetchall()[0]["username"] == "ana"
@@ -0,0 +1,54 @@
+# tests/test_llm.py
+# Disjuntor por rota (biz_llm.CircuitBreaker)
+import pytest
+
+from biz_llm import CircuitBreaker, CircuitOpenError
+
+
+def _open_breaker(cooldown):
+    breaker = CircuitBreaker(failures=2, cooldown=cooldown)
+    breaker.record(False)
+    breaker.record(False)
+    return breaker
+
+
+def test_abre_apos_falhas_seguidas_e_recusa_chamadas():
+    breaker = _open_breaker(cooldown=60)
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_sucesso_zera_a_contagem():
+    breaker = CircuitBreaker(failures=2, cooldown=60)
+    breaker.record(False)
+    breaker.record(True)
+    breaker.record(False)
+    assert breaker.state == "closed"
+
+
+def test_meio_aberto_deixa_passar_uma_chamada_de_teste():
+    breaker = _open_breaker(cooldown=0)
+    assert breaker.state == "half-open"
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # a segunda espera o resultado da primeira
+    breaker.record(True)
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+
+def test_falha_no_teste_reabre():
+    breaker = _open_breaker(cooldown=0)
+    breaker.before_call()
+    breaker.record(False)
+    breaker.cooldown = 60
+    assert breaker.state == "open"
+
+
+def test_release_libera_o_teste_sem_contar_resultado():
+    breaker = _open_breaker(cooldown=0)
+    breaker.before_call()
+    breaker.release()
+    assert breaker.state == "half-open"
+    breaker.before_call()  # nova chamada de teste liberada
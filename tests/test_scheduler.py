@@ -0,0 +1,37 @@
+# tests/test_scheduler.py
+# Escolha da próxima execução na fila (biz_scheduler.FairScheduler._pick)
+from biz_scheduler import PRIORITY_ADMIN, PRIORITY_USER, FairScheduler
+
+
+def _item(username, priority=PRIORITY_USER, enqueued=0.0):
+    return {"id": f"{username}-{enqueued}", "username": username, "priority": priority, "enqueued": enqueued}
+
+
+def _scheduler():
+    return FairScheduler(max_running=1, per_user=1, aging=300)
+
+
+def test_admin_antes_de_usuario_comum():
+    queued = [_item("ana", enqueued=1.0), _item("root", PRIORITY_ADMIN, enqueued=2.0)]
+    assert _scheduler()._pick(queued, {}, {}, now=10.0) == 1
+
+
+def test_espera_longa_sobe_para_a_prioridade_de_admin():
+    queued = [_item("root", PRIORITY_ADMIN, enqueued=400.0), _item("ana", enqueued=0.0)]
+    assert _scheduler()._pick(queued, {}, {}, now=301.0) == 1
+    assert _scheduler()._pick(queued, {}, {}, now=299.0) == 0
+
+
+def test_rodizio_atende_primeiro_quem_foi_servido_ha_mais_tempo():
+    queued = [_item("ana", enqueued=1.0), _item("ana", enqueued=2.0), _item("bia", enqueued=3.0)]
+    assert _scheduler()._pick(queued, {}, {"ana": 5, "bia": 2}, now=10.0) == 2
+
+
+def test_limite_por_usuario_so_vale_com_outros_esperando():
+    queued = [_item("ana", enqueued=1.0), _item("bia", enqueued=2.0)]
+    assert _scheduler()._pick(queued, {"ana": 1}, {}, now=10.0) == 1
+    assert _scheduler()._pick(queued[:1], {"ana": 1}, {}, now=10.0) == 0
+
+
+def test_fila_vazia():
+    assert _scheduler()._pick([], {}, {}, now=0.0) is None